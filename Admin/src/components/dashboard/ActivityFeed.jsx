@@ -1,11 +1,12 @@
 import React from 'react';
-import { UserPlus, ShoppingCart, DollarSign, LogIn, Clock } from 'lucide-react';
+import { UserPlus, ShoppingCart, DollarSign, LogIn, Clock, MessageSquare } from 'lucide-react';
 
 const actionIcons = {
     signup: UserPlus,
     purchase: ShoppingCart,
     transaction: DollarSign,
-    login: LogIn
+    login: LogIn,
+    sms_ingest: MessageSquare
 };
 
 const ActivityFeed = ({ activities }) => {
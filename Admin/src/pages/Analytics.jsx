@@ -65,6 +65,7 @@ const Analytics = () => {
     };
 
     const getRetentionColor = (value) => {
+        if (value === null || value === undefined) return 'bg-white/5';
         if (value >= 80) return 'bg-green-500';
         if (value >= 60) return 'bg-yellow-500';
         if (value >= 40) return 'bg-orange-500';
@@ -158,15 +159,15 @@ const Analytics = () => {
                 <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
                     <div className="glass-card p-4 rounded-xl">
                         <p className="text-gray-400 text-sm mb-1">Week 1 Retention</p>
-                        <p className="text-2xl font-bold text-white">{cohorts?.summary?.avg_retention_week_1}%</p>
+                        <p className="text-2xl font-bold text-white">{cohorts?.summary?.avg_retention_week_1 ?? '–'}%</p>
                     </div>
                     <div className="glass-card p-4 rounded-xl">
                         <p className="text-gray-400 text-sm mb-1">Week 4 Retention</p>
-                        <p className="text-2xl font-bold text-white">{cohorts?.summary?.avg_retention_week_4}%</p>
+                        <p className="text-2xl font-bold text-white">{cohorts?.summary?.avg_retention_week_4 ?? '–'}%</p>
                     </div>
                     <div className="glass-card p-4 rounded-xl">
                         <p className="text-gray-400 text-sm mb-1">Week 12 Retention</p>
-                        <p className="text-2xl font-bold text-white">{cohorts?.summary?.avg_retention_week_12}%</p>
+                        <p className="text-2xl font-bold text-white">{cohorts?.summary?.avg_retention_week_12 ?? '–'}%</p>
                     </div>
                     <div className="glass-card p-4 rounded-xl">
                         <p className="text-gray-400 text-sm mb-1">Avg Premium Conv.</p>
@@ -197,7 +198,7 @@ const Analytics = () => {
                                             key={i}
                                             className={`h-10 rounded flex items-center justify-center text-white text-xs font-semibold ${getRetentionColor(value)}`}
                                         >
-                                            {value}%
+                                            {value === null ? '–' : `${value}%`}
                                         </div>
                                     ))}
                                 </React.Fragment>
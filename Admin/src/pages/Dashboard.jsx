@@ -258,21 +258,20 @@ const Dashboard = () => {
                     endDate = new Date(customEndDate).toISOString();
                 }
 
-                const [statsData, quickStatsData, activityData, performersData, alertsData, revenueData] = await Promise.all([
+                const [statsData, dashboardData, activityData, performersData, alertsData] = await Promise.all([
                     adminService.getStats(startDate, endDate),
-                    adminService.getQuickStats(),
+                    adminService.getDashboard(),
                     adminService.getActivityFeed(20),
                     adminService.getTopPerformers(),
-                    adminService.getAlerts(),
-                    adminService.getRevenueBreakdown()
+                    adminService.getAlerts()
                 ]);
 
                 setStats(statsData);
-                setQuickStats(quickStatsData.stats || []);
+                setQuickStats(dashboardData.quick_stats || []);
                 setActivityFeed(activityData || []);
                 setTopPerformers(performersData);
                 setAlerts(alertsData || []);
-                setRevenueBreakdown(revenueData);
+                setRevenueBreakdown(dashboardData.revenue_breakdown);
             } catch (error) {
                 console.error('Failed to fetch dashboard data:', error);
             } finally {
@@ -282,6 +281,19 @@ const Dashboard = () => {
         fetchData();
     }, [dateRange, customStartDate, customEndDate]);
 
+    // Live metrics: a full snapshot on connect, then only the values that changed
+    useEffect(() => {
+        const source = new EventSource(adminService.getStreamUrl());
+        let metrics = {};
+        const update = (next) => {
+            metrics = next;
+            if (metrics.quick_stats) setQuickStats(metrics.quick_stats);
+        };
+        source.addEventListener('snapshot', (event) => update(JSON.parse(event.data).metrics));
+        source.addEventListener('delta', (event) => update({ ...metrics, ...JSON.parse(event.data).changes }));
+        return () => source.close();
+    }, []);
+
     const handleDismissAlert = (alertId) => {
         setAlerts(alerts.filter(alert => alert.id !== alertId));
     };
@@ -5,11 +5,14 @@ import { DollarSign, Calendar, Tag, ArrowUpRight, ArrowDownRight } from 'lucide-
 const Transactions = () => {
     const [transactions, setTransactions] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [search, setSearch] = useState('');
 
     useEffect(() => {
         const fetchTransactions = async () => {
             try {
-                const data = await adminService.getTransactions();
+                const data = search.trim()
+                    ? (await adminService.search(search, 'transactions')).results
+                    : await adminService.getTransactions();
                 setTransactions(data);
             } catch (error) {
                 console.error('Failed to fetch transactions:', error);
@@ -17,8 +20,10 @@ const Transactions = () => {
                 setLoading(false);
             }
         };
-        fetchTransactions();
-    }, []);
+        // Debounce typing; the search endpoint matches each word as a prefix
+        const timer = setTimeout(fetchTransactions, search ? 250 : 0);
+        return () => clearTimeout(timer);
+    }, [search]);
 
     if (loading) return <div className="text-white">Loading transactions...</div>;
 
@@ -27,11 +32,30 @@ const Transactions = () => {
             <div className="flex justify-between items-center mb-6">
                 <h2 className="text-2xl font-bold text-white">Transactions</h2>
                 <div className="flex gap-2">
+                    <input
+                        type="search"
+                        value={search}
+                        onChange={(e) => setSearch(e.target.value)}
+                        placeholder="Search merchant or note..."
+                        className="bg-white/5 border border-white/10 rounded-lg px-3 py-2 text-sm text-gray-300 focus:outline-none"
+                    />
                     <select className="bg-white/5 border border-white/10 rounded-lg px-3 py-2 text-sm text-gray-300 focus:outline-none">
                         <option>All Types</option>
                         <option>Income</option>
                         <option>Expense</option>
                     </select>
+                    <a
+                        href={adminService.getTransactionsExportUrl('csv')}
+                        className="bg-white/5 border border-white/10 rounded-lg px-3 py-2 text-sm text-gray-300 hover:bg-white/10"
+                    >
+                        Export CSV
+                    </a>
+                    <a
+                        href={adminService.getTransactionsExportUrl('parquet')}
+                        className="bg-white/5 border border-white/10 rounded-lg px-3 py-2 text-sm text-gray-300 hover:bg-white/10"
+                    >
+                        Export Parquet
+                    </a>
                 </div>
             </div>
 
@@ -56,7 +80,7 @@ const Transactions = () => {
                                         </div>
                                     </td>
                                     <td className="px-6 py-4 whitespace-nowrap">
-                                        <div className="text-sm font-medium text-white">{tx.note}</div>
+                                        <div className="text-sm font-medium text-white">{tx.merchant || tx.note}</div>
                                     </td>
                                     <td className="px-6 py-4 whitespace-nowrap">
                                         <span className="px-3 py-1 inline-flex items-center text-xs leading-5 font-semibold rounded-full bg-blue-500/20 text-blue-400 border border-blue-500/20">
@@ -17,13 +17,19 @@ const Users = () => {
         is_premium_member: false
     });
 
+    const [search, setSearch] = useState('');
+
     useEffect(() => {
-        fetchUsers();
-    }, []);
+        // Debounce typing; the search endpoint matches each word as a prefix
+        const timer = setTimeout(fetchUsers, search ? 250 : 0);
+        return () => clearTimeout(timer);
+    }, [search]);
 
     const fetchUsers = async () => {
         try {
-            const data = await adminService.getUsers();
+            const data = search.trim()
+                ? (await adminService.search(search, 'users')).results
+                : await adminService.getUsers();
             setUsers(data);
         } catch (error) {
             console.error('Failed to fetch users:', error);
@@ -92,13 +98,22 @@ const Users = () => {
         <div>
             <div className="flex justify-between items-center mb-6">
                 <h2 className="text-2xl font-bold text-white">User Management</h2>
-                <button
-                    onClick={handleCreate}
-                    className="px-4 py-2 bg-blue-600 hover:bg-blue-700 rounded-lg text-white font-medium transition-colors flex items-center gap-2"
-                >
-                    <Plus className="w-4 h-4" />
-                    Add User
-                </button>
+                <div className="flex gap-2">
+                    <input
+                        type="search"
+                        value={search}
+                        onChange={(e) => setSearch(e.target.value)}
+                        placeholder="Search name or email..."
+                        className="bg-white/5 border border-white/10 rounded-lg px-3 py-2 text-sm text-gray-300 focus:outline-none"
+                    />
+                    <button
+                        onClick={handleCreate}
+                        className="px-4 py-2 bg-blue-600 hover:bg-blue-700 rounded-lg text-white font-medium transition-colors flex items-center gap-2"
+                    >
+                        <Plus className="w-4 h-4" />
+                        Add User
+                    </button>
+                </div>
             </div>
 
             <div className="glass-card rounded-2xl overflow-hidden">
@@ -26,6 +26,20 @@ export const adminService = {
         const response = await api.get('/admin/transactions');
         return response.data;
     },
+    // Streamed download: open the URL directly instead of buffering it through axios
+    getTransactionsExportUrl: (format = 'csv', filters = {}) => {
+        const params = new URLSearchParams({ format });
+        Object.entries(filters).forEach(([key, value]) => {
+            if (value !== undefined && value !== null && value !== '') params.append(key, value);
+        });
+        return `${api.defaults.baseURL}/admin/transactions/export?${params.toString()}`;
+    },
+    search: async (q, type = null, limit = 20) => {
+        const params = { q, limit };
+        if (type) params.type = type;
+        const response = await api.get('/admin/search', { params });
+        return response.data;
+    },
     getRevenueChart: async () => {
         const response = await api.get('/admin/revenue-chart');
         return response.data;
@@ -51,10 +65,15 @@ export const adminService = {
         const response = await api.get('/admin/revenue-breakdown');
         return response.data;
     },
+    getDashboard: async () => {
+        const response = await api.get('/admin/dashboard');
+        return response.data;
+    },
     getQuickStats: async () => {
         const response = await api.get('/admin/quick-stats');
         return response.data;
     },
+    getStreamUrl: () => `${api.defaults.baseURL}/admin/stream`,
     // Analytics Page
     getAnalyticsForecast: async () => {
         const response = await api.get('/admin/analytics/forecast');
@@ -120,3 +120,167 @@ CREATE TABLE IF NOT EXISTS subscriptions (
     FOREIGN KEY (category_id) REFERENCES categories(id),
     FOREIGN KEY (payment_method_id) REFERENCES payment_methods(id)
 );
+
+-- SMS Ingest Queue (asynchronous /mobile/sms/queue ingestion)
+CREATE TABLE IF NOT EXISTS sms_ingest_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id TEXT UNIQUE NOT NULL,
+    user_id INTEGER NOT NULL,
+    sender TEXT,
+    sms_text TEXT NOT NULL,
+    status TEXT CHECK(status IN ('queued', 'processing', 'done', 'ignored', 'failed')) DEFAULT 'queued',
+    claim_token TEXT,
+    claimed_at DATETIME,
+    attempts INTEGER DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    processed_at DATETIME,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+CREATE INDEX IF NOT EXISTS idx_sms_ingest_queue_status ON sms_ingest_queue(status, id);
+
+-- Transaction Leaks (written in bulk by the nightly scan_leaks.py job)
+CREATE TABLE IF NOT EXISTS transaction_leaks (
+    transaction_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    severity TEXT CHECK(severity IN ('medium', 'high')),
+    reason TEXT,
+    detected_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (transaction_id) REFERENCES transactions(id),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+CREATE INDEX IF NOT EXISTS idx_transaction_leaks_user ON transaction_leaks(user_id);
+
+-- Recurring Payment Scan State (per-user watermark for detect_recurring.py)
+CREATE TABLE IF NOT EXISTS recurring_scan_state (
+    user_id INTEGER PRIMARY KEY,
+    last_transaction_id INTEGER DEFAULT 0,
+    scanned_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+CREATE INDEX IF NOT EXISTS idx_recurring_scan_state_last_transaction ON recurring_scan_state(last_transaction_id);
+
+-- Monthly Category Rollups (maintained on every transaction write; rebuild with rebuild_rollups.py)
+CREATE TABLE IF NOT EXISTS user_category_monthly (
+    user_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category_id INTEGER NOT NULL DEFAULT 0,
+    total_amount REAL DEFAULT 0,
+    transaction_count INTEGER DEFAULT 0,
+    PRIMARY KEY (user_id, month, type, category_id),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Coin Rules Table
+CREATE TABLE IF NOT EXISTS coin_rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    description TEXT,
+    action_type TEXT,
+    coins_awarded INTEGER,
+    is_active BOOLEAN DEFAULT 1,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Coin Transactions Table
+CREATE TABLE IF NOT EXISTS coin_transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    amount INTEGER,
+    transaction_type TEXT,
+    description TEXT,
+    rule_id INTEGER,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (rule_id) REFERENCES coin_rules(id)
+);
+
+-- Notifications Table
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    title TEXT,
+    message TEXT,
+    notification_type TEXT,
+    is_read BOOLEAN DEFAULT 0,
+    link TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Keyset pagination indexes (SQLite appends the rowid, so these also cover the id tie-breaker)
+CREATE INDEX IF NOT EXISTS ix_users_created_at ON users(created_at);
+CREATE INDEX IF NOT EXISTS ix_transactions_date ON transactions(date);
+CREATE INDEX IF NOT EXISTS ix_transactions_user_date ON transactions(user_id, date);
+CREATE INDEX IF NOT EXISTS ix_subscriptions_created_at ON subscriptions(created_at);
+CREATE INDEX IF NOT EXISTS ix_coin_transactions_created_at ON coin_transactions(created_at);
+CREATE INDEX IF NOT EXISTS ix_coin_transactions_user_created_at ON coin_transactions(user_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_notifications_created_at ON notifications(created_at);
+CREATE INDEX IF NOT EXISTS ix_notifications_user_created_at ON notifications(user_id, created_at);
+
+-- User Statistics (maintained on every transaction/subscription write; rebuild with rebuild_rollups.py)
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY,
+    transaction_count INTEGER DEFAULT 0,
+    total_spent REAL DEFAULT 0,
+    active_subscriptions INTEGER DEFAULT 0,
+    subscription_cost REAL DEFAULT 0,
+    last_activity_at DATETIME,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Daily Stats (per-day dashboard counters, maintained on write; check with reconcile_daily_stats.py)
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day TEXT PRIMARY KEY,
+    signups INTEGER DEFAULT 0,
+    premium_signups INTEGER DEFAULT 0,
+    transaction_count INTEGER DEFAULT 0,
+    expense_volume REAL DEFAULT 0,
+    new_subscriptions INTEGER DEFAULT 0
+);
+
+-- User Daily Activity (per-user daily totals behind the rolling leaderboards, maintained on write)
+CREATE TABLE IF NOT EXISTS user_daily_activity (
+    user_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    transaction_count INTEGER DEFAULT 0,
+    total_spent REAL DEFAULT 0,
+    PRIMARY KEY (user_id, day),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+CREATE INDEX IF NOT EXISTS ix_user_daily_activity_day ON user_daily_activity(day);
+CREATE INDEX IF NOT EXISTS ix_user_stats_transaction_count ON user_stats(transaction_count);
+CREATE INDEX IF NOT EXISTS ix_user_stats_total_spent ON user_stats(total_spent);
+
+-- Full-text search (FTS5 external content indexes, kept in sync by triggers; served by /admin/search)
+CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(email, full_name, content='users', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3');
+CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users
+BEGIN
+    INSERT INTO users_fts(rowid, email, full_name) VALUES (new.id, new.email, new.full_name);
+END;
+CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users
+BEGIN
+    INSERT INTO users_fts(users_fts, rowid, email, full_name) VALUES ('delete', old.id, old.email, old.full_name);
+END;
+CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF email, full_name ON users
+BEGIN
+    INSERT INTO users_fts(users_fts, rowid, email, full_name) VALUES ('delete', old.id, old.email, old.full_name);
+    INSERT INTO users_fts(rowid, email, full_name) VALUES (new.id, new.email, new.full_name);
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(merchant_name, note, content='transactions', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3');
+CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO transactions_fts(rowid, merchant_name, note) VALUES (new.id, new.merchant_name, new.note);
+END;
+CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions
+BEGIN
+    INSERT INTO transactions_fts(transactions_fts, rowid, merchant_name, note) VALUES ('delete', old.id, old.merchant_name, old.note);
+END;
+CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF merchant_name, note ON transactions
+BEGIN
+    INSERT INTO transactions_fts(transactions_fts, rowid, merchant_name, note) VALUES ('delete', old.id, old.merchant_name, old.note);
+    INSERT INTO transactions_fts(rowid, merchant_name, note) VALUES (new.id, new.merchant_name, new.note);
+END;
@@ -1,20 +1,32 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from typing import List, Optional
 
 from datetime import datetime, timedelta
-import random
 import hashlib
-import secrets
 
 from . import models as schemas # Pydantic models
 from . import sql_models as models # SQLAlchemy models
-from .database import engine, get_db
-from .services import SMSParser, LeakDetector, AlternativeSuggester
+from .database import engine, get_db, SessionLocal
+from .services import SMSParser, LeakDetector, AlternativeSuggester, leak_state
+from .services.daily_stats import seed_daily_stats
+from .services.cohorts import cohort_analysis
+from .services.forecasting import analytics_forecast
+from .services.leaderboard import leaderboards
+from .services.activity_log import activity_logger, stored_activity, ACTIVITY_FEED_SIZE, ACTIVITY_FEED_FROM_DB
+from .services.live_metrics import MetricsBroadcaster
+from .services.dashboard import dashboard_bundle
+from .services.search_index import ensure_search_index
+from .services.rollups import seed_empty_rollups
+from .services.schema_upgrade import add_missing_columns
 
 # Create tables if they don't exist
 models.Base.metadata.create_all(bind=engine)
+# create_all skips indexes added to tables that already exist
+for table in models.Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
 
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import auth, users, admin, mobile, coins, notifications, payment_methods, profile
@@ -48,23 +60,38 @@ app.include_router(profile.router)
 parser = SMSParser()
 detector = LeakDetector()
 suggester = AlternativeSuggester()
+# One metrics producer shared by every /admin/stream client
+metrics_broadcaster = MetricsBroadcaster(SessionLocal)
 
 # --- Helper Functions ---
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
-def create_session_token() -> str:
-    return secrets.token_urlsafe(32)
-
-
-
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
 @app.on_event("startup")
 def startup_event():
-    # Ensure default user exists for demo purposes
+    # Add columns mapped since the database was created (e.g. transactions.merchant_name)
+    added = add_missing_columns(engine, models.Base.metadata)
+    if added:
+        print(f"Added columns: {', '.join(added)}")
+
     db = next(get_db())
+    # Fill rollup tables added to a database that already held data, before
+    # any write below starts feeding them incrementally
+    seed_empty_rollups(db)
+    seed_daily_stats(db)
+    db.commit()
+
+    # Full-text search indexes (FTS5 virtual tables, kept in sync by triggers).
+    # Search is optional: a failure here must not keep the API from starting.
+    try:
+        ensure_search_index(engine)
+    except Exception as e:
+        print(f"Search index setup failed: {e}")
+
+    # Ensure default user exists for demo purposes
     user = get_user_by_email(db, "milton.raj@example.com")
     if not user:
         user = models.User(
@@ -77,74 +104,22 @@ def startup_event():
         db.add(user)
         db.commit()
 
+    # Start draining the asynchronous SMS ingest queue
+    mobile.ingest_pool.start()
+    # Start the batched activity log writer
+    activity_logger.start(SessionLocal)
+
+@app.on_event("shutdown")
+def shutdown_event():
+    mobile.ingest_pool.stop()
+    activity_logger.stop()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Smart Spend API"}
 
 # --- Authentication Endpoints ---
 
-@app.post("/auth/register")
-def register(name: str, email: str, password: str, db: Session = Depends(get_db)):
-    # Check if user exists
-    existing_user = get_user_by_email(db, email)
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    # Create user
-    user = models.User(
-        email=email,
-        full_name=name,
-        password_hash=hash_password(password)
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    
-    # Create session
-    session_token = create_session_token()
-    session = models.AuthSession(
-        user_id=user.id,
-        session_token=session_token,
-        expires_at=datetime.utcnow() + timedelta(days=30)
-    )
-    db.add(session)
-    db.commit()
-    
-    return {
-        "session_token": session_token,
-        "user": {
-            "id": user.id,
-            "name": user.full_name,
-            "email": user.email
-        }
-    }
-
-@app.post("/auth/login")
-def login(email: str, password: str, db: Session = Depends(get_db)):
-    user = get_user_by_email(db, email)
-    if not user or user.password_hash != hash_password(password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    # Create session
-    session_token = create_session_token()
-    session = models.AuthSession(
-        user_id=user.id,
-        session_token=session_token,
-        expires_at=datetime.utcnow() + timedelta(days=30)
-    )
-    db.add(session)
-    db.commit()
-    
-    return {
-        "session_token": session_token,
-        "user": {
-            "id": user.id,
-            "name": user.full_name,
-            "email": user.email,
-            "is_premium": user.is_premium_member
-        }
-    }
-
 @app.post("/auth/logout")
 def logout(session_token: str, db: Session = Depends(get_db)):
     session = db.query(models.AuthSession).filter(
@@ -164,13 +139,10 @@ def logout(session_token: str, db: Session = Depends(get_db)):
 @app.post("/parse-sms")
 def parse_sms(sender: str, body: str, timestamp: int, db: Session = Depends(get_db)):
     try:
-        parsed_data = parser.parse(sender, body)
+        parsed_data = parser.parse(body, sender=sender)
         
-        # Fetch history from DB
-        history = db.query(models.Transaction).filter(models.Transaction.user_id == 1).limit(10).all()
-        mock_history = [{"merchant": t.note, "amount": t.amount, "category": t.category.name if t.category else "Uncategorized"} for t in history]
-        
-        leak_info = detector.detect(parsed_data, mock_history)
+        # Leak rules run against the user's rolling state instead of a history scan
+        leak_info = detector.detect(parsed_data, user_id=1, db=db)
         parsed_data.update(leak_info)
         
         return parsed_data
@@ -205,6 +177,12 @@ def create_transaction(
     )
     db.add(transaction)
     db.commit()
+    leak_state.record(user_id, {
+        "merchant": merchant,
+        "category": category,
+        "amount": amount,
+        "date": transaction.date
+    })
     
     return {"status": "success", "data": {"amount": amount, "merchant": merchant}}
 
@@ -216,39 +194,6 @@ def get_suggestion(category: str):
 # ADMIN PANEL ENDPOINTS
 # ==========================================
 
-@app.get("/admin/stats")
-def get_admin_stats(db: Session = Depends(get_db)):
-    try:
-        total_users = db.query(models.User).count()
-        premium_users = db.query(models.User).filter(models.User.is_premium_member == True).count()
-        total_transactions = db.query(models.Transaction).count()
-        
-        # Calculate total revenue (assuming $5 per premium user)
-        total_revenue = premium_users * 5.0
-        
-        # Active sessions (mocked for now)
-        active_sessions = db.query(models.AuthSession).filter(models.AuthSession.expires_at > datetime.utcnow()).count()
-
-        return {
-            "total_users": total_users,
-            "premium_users": premium_users,
-            "total_transactions": total_transactions,
-            "total_revenue": total_revenue,
-            "active_sessions": active_sessions
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/admin/users")
-def get_admin_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
-
-@app.get("/admin/transactions")
-def get_admin_transactions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    transactions = db.query(models.Transaction).order_by(models.Transaction.date.desc()).offset(skip).limit(limit).all()
-    return transactions
-
 @app.get("/admin/revenue-chart")
 def get_revenue_chart(db: Session = Depends(get_db)):
     # Mock data for the chart
@@ -267,55 +212,31 @@ def get_revenue_chart(db: Session = Depends(get_db)):
 # ==========================================
 
 @app.get("/admin/activity-feed")
-def get_activity_feed(limit: int = 50, db: Session = Depends(get_db)):
-    """Get recent activity feed for dashboard"""
+def get_activity_feed(limit: int = 50, action_type: Optional[str] = None, db: Session = Depends(get_db)):
+    """Get recent activity feed for dashboard, served from the in-memory ring buffer (single process) or activity_logs"""
     try:
-        activities = db.query(models.ActivityLog).order_by(
-            models.ActivityLog.created_at.desc()
-        ).limit(limit).all()
-        
-        # If no activities, generate some mock data
-        if not activities:
-            return [
-                {"id": 1, "user_id": 1, "action_type": "signup", "description": "New user registered", "created_at": datetime.utcnow().isoformat()},
-                {"id": 2, "user_id": 2, "action_type": "purchase", "description": "Premium theme purchased", "created_at": datetime.utcnow().isoformat()},
-                {"id": 3, "user_id": 3, "action_type": "transaction", "description": "Added $500 expense", "created_at": datetime.utcnow().isoformat()},
-            ]
-        
-        return activities
+        limit = max(1, min(limit, ACTIVITY_FEED_SIZE))
+        if ACTIVITY_FEED_FROM_DB:
+            return stored_activity(db, limit=limit, action_type=action_type)
+        return activity_logger.recent(limit=limit, action_type=action_type)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/admin/activity-feed/stats")
+def get_activity_log_stats():
+    """Buffered activity log writer counters"""
+    return activity_logger.stats()
+
 @app.get("/admin/top-performers")
-def get_top_performers(db: Session = Depends(get_db)):
-    """Get top users and products"""
+def get_top_performers(limit: int = 5, db: Session = Depends(get_db)):
+    """Get top users by transaction count and spend over 7 days, 30 days and all time"""
     try:
-        # Top users by transaction count
-        top_users = db.query(
-            models.User.id,
-            models.User.full_name,
-            models.User.email,
-            models.User.profile_image,
-            models.User.is_premium_member
-        ).join(models.Transaction).group_by(models.User.id).order_by(
-            func.count(models.Transaction.id).desc()
-        ).limit(5).all()
-        
-        # Mock data if no users
-        if not top_users:
-            top_users = [
-                {"id": 1, "full_name": "John Doe", "email": "john@example.com", "total_spent": 5000, "rank": 1},
-                {"id": 2, "full_name": "Jane Smith", "email": "jane@example.com", "total_spent": 4500, "rank": 2},
-                {"id": 3, "full_name": "Bob Johnson", "email": "bob@example.com", "total_spent": 3800, "rank": 3},
-            ]
-        
+        boards = leaderboards(db, limit=limit)
         return {
-            "top_users": top_users,
-            "top_products": [
-                {"id": 1, "name": "Premium Theme Pack", "sales": 234, "revenue": 117000},
-                {"id": 2, "name": "Ad-Free Experience", "sales": 189, "revenue": 56700},
-                {"id": 3, "name": "Export to CSV", "sales": 156, "revenue": 15600},
-            ]
+            "top_users": boards["all_time"]["transactions"],
+            "leaderboards": boards,
+            # No product sales are recorded yet
+            "top_products": []
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -379,18 +300,7 @@ def dismiss_alert(alert_id: int, db: Session = Depends(get_db)):
 def get_revenue_breakdown(db: Session = Depends(get_db)):
     """Get revenue breakdown by source"""
     try:
-        # Calculate actual revenue from premium users
-        premium_count = db.query(models.User).filter(models.User.is_premium_member == True).count()
-        premium_revenue = premium_count * 5.0  # $5 per premium user
-        
-        return {
-            "sources": [
-                {"name": "Premium Subscriptions", "value": premium_revenue, "percentage": 65, "color": "#60a5fa"},
-                {"name": "Product Sales", "value": 15000, "percentage": 25, "color": "#34d399"},
-                {"name": "Advertisements", "value": 6000, "percentage": 10, "color": "#fbbf24"}
-            ],
-            "total": premium_revenue + 15000 + 6000
-        }
+        return dashboard_bundle(db)["revenue_breakdown"]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -398,100 +308,49 @@ def get_revenue_breakdown(db: Session = Depends(get_db)):
 def get_quick_stats(db: Session = Depends(get_db)):
     """Get quick stats for ticker"""
     try:
-        total_users = db.query(models.User).count()
-        premium_users = db.query(models.User).filter(models.User.is_premium_member == True).count()
-        total_transactions = db.query(models.Transaction).count()
-        
-        return {
-            "stats": [
-                {"label": "Total Users", "value": total_users, "icon": "users"},
-                {"label": "Premium Members", "value": premium_users, "icon": "star"},
-                {"label": "Transactions Today", "value": total_transactions, "icon": "activity"},
-                {"label": "Revenue This Month", "value": "$45,231", "icon": "dollar"},
-                {"label": "Active Sessions", "value": "1,234", "icon": "zap"},
-                {"label": "Conversion Rate", "value": "12.5%", "icon": "trending-up"}
-            ]
-        }
+        return {"stats": dashboard_bundle(db)["quick_stats"]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/admin/dashboard")
+def get_admin_dashboard(db: Session = Depends(get_db)):
+    """Get all-time stats, ticker, revenue breakdown and goals in one response"""
+    try:
+        return dashboard_bundle(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/admin/stream")
+async def stream_admin_metrics(request: Request):
+    """Live dashboard metrics as Server-Sent Events: a snapshot, then deltas when values change"""
+    return StreamingResponse(
+        metrics_broadcaster.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/admin/stream/stats")
+def get_stream_stats():
+    """Get live metrics producer counters"""
+    return metrics_broadcaster.stats()
+
 # ==========================================
 # ANALYTICS PAGE ENDPOINTS
 # ==========================================
 
 @app.get("/admin/analytics/forecast")
-def get_analytics_forecast(db: Session = Depends(get_db)):
-    """Get predictive analytics and forecasts"""
+def get_analytics_forecast(days: int = 30, db: Session = Depends(get_db)):
+    """Get revenue, signup and transaction forecasts with 95% prediction intervals"""
     try:
-        # Generate 30-day revenue forecast
-        base_revenue = 45000
-        revenue_forecast = []
-        for i in range(30):
-            trend = base_revenue * (1 + (i * 0.02))  # 2% daily growth
-            variance = trend * 0.1  # 10% variance
-            revenue_forecast.append({
-                "day": i + 1,
-                "predicted": round(trend + (random.random() - 0.5) * variance, 2),
-                "lower_bound": round(trend - variance, 2),
-                "upper_bound": round(trend + variance, 2)
-            })
-        
-        # User growth projection
-        current_users = db.query(models.User).count()
-        user_forecast = []
-        for i in range(30):
-            growth = current_users * (1 + (i * 0.015))  # 1.5% daily growth
-            user_forecast.append({
-                "day": i + 1,
-                "predicted": int(growth),
-                "confidence": round(95 - (i * 0.5), 1)  # Decreasing confidence
-            })
-        
-        return {
-            "revenue_forecast": revenue_forecast,
-            "user_growth": user_forecast,
-            "insights": [
-                {"type": "positive", "message": "Revenue trending upward with 95% confidence"},
-                {"type": "info", "message": "Expected to reach $60K by end of month"},
-                {"type": "warning", "message": "User growth may slow down in week 3"}
-            ]
-        }
+        return analytics_forecast(db, days=max(1, min(days, 90)))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/analytics/cohorts")
-def get_cohort_analysis(db: Session = Depends(get_db)):
-    """Get cohort analysis data"""
+def get_cohort_analysis(months: int = 12, db: Session = Depends(get_db)):
+    """Get signup-month cohorts with weekly retention, premium conversion and LTV"""
     try:
-        # Generate cohort retention data
-        cohorts = []
-        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun"]
-        
-        for i, month in enumerate(months):
-            retention = []
-            for week in range(12):
-                # Simulate retention decay
-                base_retention = 100 - (week * 8)
-                retention.append(max(10, base_retention + random.randint(-10, 10)))
-            
-            cohorts.append({
-                "cohort": month,
-                "size": random.randint(100, 500),
-                "retention": retention,
-                "premium_conversion": round(random.uniform(10, 25), 1),
-                "ltv": round(random.uniform(50, 150), 2)
-            })
-        
-        return {
-            "cohorts": cohorts,
-            "summary": {
-                "avg_retention_week_1": 92,
-                "avg_retention_week_4": 68,
-                "avg_retention_week_12": 45,
-                "best_cohort": "March",
-                "avg_premium_conversion": 17.5
-            }
-        }
+        return cohort_analysis(db, months=max(1, min(months, 36)))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -499,59 +358,7 @@ def get_cohort_analysis(db: Session = Depends(get_db)):
 def get_goals(db: Session = Depends(get_db)):
     """Get business goals and progress"""
     try:
-        total_users = db.query(models.User).count()
-        premium_users = db.query(models.User).filter(models.User.is_premium_member == True).count()
-        
-        return {
-            "goals": [
-                {
-                    "id": 1,
-                    "name": "Monthly Revenue",
-                    "target": 50000,
-                    "current": 45231,
-                    "unit": "$",
-                    "progress": 90.5,
-                    "status": "on_track",
-                    "deadline": "2025-11-30"
-                },
-                {
-                    "id": 2,
-                    "name": "New Users",
-                    "target": 1000,
-                    "current": total_users,
-                    "unit": "users",
-                    "progress": (total_users / 1000) * 100,
-                    "status": "on_track",
-                    "deadline": "2025-11-30"
-                },
-                {
-                    "id": 3,
-                    "name": "Premium Conversions",
-                    "target": 200,
-                    "current": premium_users,
-                    "unit": "users",
-                    "progress": (premium_users / 200) * 100,
-                    "status": "ahead",
-                    "deadline": "2025-11-30"
-                },
-                {
-                    "id": 4,
-                    "name": "User Engagement",
-                    "target": 75,
-                    "current": 68,
-                    "unit": "%",
-                    "progress": 90.7,
-                    "status": "at_risk",
-                    "deadline": "2025-11-30"
-                }
-            ],
-            "achievements": [
-                {"name": "First 1000 Users", "unlocked": True, "date": "2025-10-15"},
-                {"name": "$10K Revenue", "unlocked": True, "date": "2025-10-20"},
-                {"name": "100 Premium Users", "unlocked": True, "date": "2025-11-01"},
-                {"name": "$50K Revenue", "unlocked": False, "date": None}
-            ]
-        }
+        return dashboard_bundle(db)["goals"]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
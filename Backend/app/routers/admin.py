@@ -1,13 +1,23 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
 from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 import hashlib
 
-from ..database import get_db
-from ..sql_models import User, Transaction, Subscription, Category
+from ..database import get_db, SessionLocal
+from ..sql_models import User, Transaction, Subscription, Category, UserStats
+from ..services.transaction_queries import (
+    list_transactions, serialize_transaction, transaction_listing_query, filter_transactions
+)
+from ..services.transaction_export import (
+    EXPORT_FORMATS, CSV_BATCH_SIZE, PARQUET_BATCH_SIZE,
+    iter_export_batches, stream_csv, stream_parquet, parquet_available
+)
+from ..services.pagination import keyset_page
+from ..services.daily_stats import range_totals
+from ..services.search_index import SEARCH_ENTITIES, search_all
 
 router = APIRouter(
     prefix="/admin",
@@ -38,6 +48,11 @@ class UserListItem(BaseModel):
     created_at: str
     total_transactions: int
     total_spent: float
+    last_activity: Optional[str] = None
+
+class UserListPage(BaseModel):
+    items: List[UserListItem]
+    next_cursor: Optional[str] = None
 
 class DashboardStats(BaseModel):
     total_users: int
@@ -47,92 +62,194 @@ class DashboardStats(BaseModel):
     active_subscriptions: int
 
 # --- Endpoints ---
-@router.get("/users", response_model=List[UserListItem])
+@router.get("/users", response_model=Union[List[UserListItem], UserListPage])
 def get_all_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get all users for admin panel
+    Get all users for admin panel. Pass `cursor` (empty for the first page, then
+    the returned `next_cursor`) for keyset pagination, newest first.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
-    
-    result = []
-    for user in users:
-        # Get transaction count and total spent
-        tx_count = db.query(func.count(Transaction.id)).filter(
-            Transaction.user_id == user.id
-        ).scalar() or 0
-        
-        total_spent = db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user.id,
-            Transaction.type == 'expense'
-        ).scalar() or 0.0
-        
-        result.append(UserListItem(
-            id=user.id,
-            email=user.email,
-            full_name=user.full_name or "Unknown",
-            is_premium_member=user.is_premium_member or False,
-            created_at=user.created_at.isoformat() if user.created_at else datetime.now().isoformat(),
-            total_transactions=tx_count,
-            total_spent=total_spent
-        ))
-    
-    return result
+    query = _user_list_query(db)
+    if cursor is not None:
+        try:
+            rows, next_cursor = keyset_page(query, User.created_at, User.id, cursor, limit, "created_at")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return UserListPage(items=[_user_list_item(row) for row in rows], next_cursor=next_cursor)
+
+    rows = query.order_by(User.id).offset(skip).limit(limit).all()
+    return [_user_list_item(row) for row in rows]
+
+def _user_list_query(db: Session):
+    # Counts come from the materialized user_stats table in the same query
+    return db.query(
+        User.id,
+        User.email,
+        User.full_name,
+        User.is_premium_member,
+        User.created_at,
+        UserStats.transaction_count,
+        UserStats.total_spent,
+        UserStats.last_activity_at
+    ).outerjoin(UserStats, UserStats.user_id == User.id)
+
+def _user_list_item(row) -> UserListItem:
+    return UserListItem(
+        id=row.id,
+        email=row.email,
+        full_name=row.full_name or "Unknown",
+        is_premium_member=row.is_premium_member or False,
+        created_at=row.created_at.isoformat() if row.created_at else datetime.now().isoformat(),
+        total_transactions=row.transaction_count or 0,
+        total_spent=row.total_spent or 0.0,
+        last_activity=row.last_activity_at.isoformat() if row.last_activity_at else None
+    )
+
+def _transaction_filters(
+    user_id: Optional[int] = None,
+    category: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> dict:
+    """Filters shared by the transaction list and export endpoints"""
+    return {"user_id": user_id, "category": category, "start_date": start_date, "end_date": end_date}
 
 @router.get("/transactions")
 def get_all_transactions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: Optional[str] = None,
+    filters: dict = Depends(_transaction_filters),
     db: Session = Depends(get_db)
 ):
     """
-    Get all transactions for admin panel
+    Get all transactions for admin panel, optionally filtered by user, category
+    name and date range. Pass `cursor` (empty for the first page, then the
+    returned `next_cursor`) for keyset pagination.
     """
-    transactions = db.query(Transaction).order_by(desc(Transaction.date)).offset(skip).limit(limit).all()
-    
-    result = []
-    for tx in transactions:
-        result.append({
-            "id": tx.id,
-            "user_id": tx.user_id,
-            "amount": tx.amount,
-            "merchant": tx.merchant_name,
-            "category": tx.category.name if tx.category else "Uncategorized",
-            "type": tx.type,
-            "date": tx.date.isoformat() if tx.date else None,
-            "created_at": tx.created_at.isoformat() if tx.created_at else None
-        })
-    
-    return result
+    if cursor is not None:
+        try:
+            rows, next_cursor = keyset_page(
+                filter_transactions(transaction_listing_query(db), **filters),
+                Transaction.date, Transaction.id, cursor, limit, "date"
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": [serialize_transaction(row) for row in rows], "next_cursor": next_cursor}
+
+    return [serialize_transaction(row) for row in list_transactions(db, skip=skip, limit=limit, **filters)]
+
+@router.get("/transactions/export")
+def export_transactions(
+    format: str = "csv",
+    filters: dict = Depends(_transaction_filters)
+):
+    """
+    Download every transaction matching the list filters as CSV or Parquet.
+    Rows are streamed from a server-side cursor, so memory use does not grow
+    with the size of the export.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    filename = f"transactions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    if format == "parquet":
+        if not parquet_available():
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow on the server")
+        body = stream_parquet(iter_export_batches(SessionLocal, filters, PARQUET_BATCH_SIZE))
+        media_type = "application/vnd.apache.parquet"
+    else:
+        body = stream_csv(iter_export_batches(SessionLocal, filters, CSV_BATCH_SIZE))
+        media_type = "text/csv"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/search")
+def search(
+    q: str,
+    type: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Ranked full-text search over user emails and names and transaction
+    merchants and notes. Every word in `q` matches as a prefix. Pass `type`
+    (users or transactions) to search one entity. Each result carries a
+    `kind` (user or transaction) next to the entity's own fields. Entities
+    whose index is missing are listed in `unavailable` (503 if all are).
+    """
+    if type is not None and type not in SEARCH_ENTITIES:
+        raise HTTPException(status_code=400, detail=f"type must be one of: {', '.join(SEARCH_ENTITIES)}")
+
+    entities = [type] if type else list(SEARCH_ENTITIES)
+    hits = search_all(db, q, entities, limit)
+    unavailable = [entity for entity in entities if entity not in hits]
+    if not hits:
+        raise HTTPException(status_code=503, detail=f"Search index unavailable for: {', '.join(unavailable)}")
+    results = []
+
+    user_scores = dict(hits.get("users", []))
+    if user_scores:
+        rows = _user_list_query(db).filter(User.id.in_(user_scores)).all()
+        for row in rows:
+            results.append((user_scores[row.id], {"kind": "user", **_user_list_item(row).dict()}))
+
+    transaction_scores = dict(hits.get("transactions", []))
+    if transaction_scores:
+        rows = transaction_listing_query(db).filter(Transaction.id.in_(transaction_scores)).all()
+        for row in rows:
+            results.append((transaction_scores[row.id], {"kind": "transaction", **serialize_transaction(row)}))
+
+    # bm25: lower is a better match
+    results.sort(key=lambda item: item[0])
+    return {
+        "query": q,
+        "results": [{**item, "score": round(-score, 4)} for score, item in results[:limit]],
+        "unavailable": unavailable
+    }
 
 @router.get("/subscriptions")
 def get_all_subscriptions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get all subscriptions for admin panel
+    Get all subscriptions for admin panel. Pass `cursor` (empty for the first page,
+    then the returned `next_cursor`) for keyset pagination, newest first.
     """
+    if cursor is not None:
+        try:
+            subscriptions, next_cursor = keyset_page(
+                db.query(Subscription), Subscription.created_at, Subscription.id, cursor, limit, "created_at"
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": [_subscription_item(sub) for sub in subscriptions], "next_cursor": next_cursor}
+
     subscriptions = db.query(Subscription).offset(skip).limit(limit).all()
-    
-    result = []
-    for sub in subscriptions:
-        result.append({
-            "id": sub.id,
-            "user_id": sub.user_id,
-            "name": sub.name,
-            "amount": sub.amount,
-            "billing_cycle": sub.billing_cycle,
-            "status": sub.status,
-            "next_billing_date": sub.next_billing_date.isoformat() if sub.next_billing_date else None,
-            "created_at": sub.created_at.isoformat() if sub.created_at else None
-        })
-    
-    return result
+    return [_subscription_item(sub) for sub in subscriptions]
+
+def _subscription_item(sub: Subscription) -> dict:
+    return {
+        "id": sub.id,
+        "user_id": sub.user_id,
+        "name": sub.name,
+        "amount": sub.amount,
+        "billing_cycle": sub.billing_cycle,
+        "status": sub.status,
+        "next_billing_date": sub.next_billing_date.isoformat() if sub.next_billing_date else None,
+        "created_at": sub.created_at.isoformat() if sub.created_at else None
+    }
 
 @router.get("/stats", response_model=DashboardStats)
 def get_dashboard_stats(
@@ -141,43 +258,17 @@ def get_dashboard_stats(
     db: Session = Depends(get_db)
 ):
     """
-    Get overall dashboard statistics with optional date filtering
+    Get overall dashboard statistics with optional date filtering.
+    Served from the daily_stats buckets rather than scanning the raw tables.
     """
-    # Base queries
-    user_query = db.query(func.count(User.id))
-    premium_query = db.query(func.count(User.id)).filter(User.is_premium_member == True)
-    tx_query = db.query(func.count(Transaction.id))
-    revenue_query = db.query(func.sum(Transaction.amount)).filter(Transaction.type == 'expense')
-    sub_query = db.query(func.count(Subscription.id)).filter(Subscription.status == 'active')
-
-    # Apply date filters if provided
-    if start_date:
-        user_query = user_query.filter(User.created_at >= start_date)
-        premium_query = premium_query.filter(User.created_at >= start_date)
-        tx_query = tx_query.filter(Transaction.date >= start_date)
-        revenue_query = revenue_query.filter(Transaction.date >= start_date)
-        sub_query = sub_query.filter(Subscription.created_at >= start_date)
-    
-    if end_date:
-        user_query = user_query.filter(User.created_at <= end_date)
-        premium_query = premium_query.filter(User.created_at <= end_date)
-        tx_query = tx_query.filter(Transaction.date <= end_date)
-        revenue_query = revenue_query.filter(Transaction.date <= end_date)
-        sub_query = sub_query.filter(Subscription.created_at <= end_date)
-
-    # Execute queries
-    total_users = user_query.scalar() or 0
-    premium_users = premium_query.scalar() or 0
-    total_transactions = tx_query.scalar() or 0
-    total_revenue = revenue_query.scalar() or 0.0
-    active_subs = sub_query.scalar() or 0
-    
+    totals = range_totals(db, start_date, end_date)
+
     return DashboardStats(
-        total_users=total_users,
-        premium_users=premium_users,
-        total_transactions=total_transactions,
-        total_revenue=total_revenue,
-        active_subscriptions=active_subs
+        total_users=totals["signups"],
+        premium_users=totals["premium_signups"],
+        total_transactions=totals["transaction_count"],
+        total_revenue=totals["expense_volume"],
+        active_subscriptions=totals["new_subscriptions"]
     )
 
 # --- User CRUD Endpoints ---
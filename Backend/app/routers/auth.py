@@ -7,6 +7,7 @@ import hashlib
 
 from ..database import get_db
 from ..sql_models import User, AuthSession
+from ..services.activity_log import activity_logger
 
 router = APIRouter(
     prefix="/auth",
@@ -83,6 +84,7 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
     
     db.add(auth_session)
     db.commit()
+    activity_logger.log("signup", f"New user registered: {new_user.email}", new_user.id)
     
     return AuthResponse(
         user_id=new_user.id,
@@ -126,6 +128,7 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
     
     db.add(auth_session)
     db.commit()
+    activity_logger.log("login", f"User logged in: {user.email}", user.id)
     
     return AuthResponse(
         user_id=user.id,
@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
 from ..database import get_db
 from ..sql_models import CoinRule, CoinTransaction, User
+from ..services.pagination import keyset_page
 
 router = APIRouter(
     prefix="/coins",
@@ -44,6 +45,10 @@ class CoinTransactionResponse(BaseModel):
     description: str
     created_at: str
 
+class CoinTransactionPage(BaseModel):
+    items: List[CoinTransactionResponse]
+    next_cursor: Optional[str] = None
+
 # --- Coin Rules Endpoints ---
 @router.get("/rules", response_model=List[CoinRuleResponse])
 def get_coin_rules(db: Session = Depends(get_db)):
@@ -121,32 +126,48 @@ def delete_coin_rule(rule_id: int, db: Session = Depends(get_db)):
     return {"message": "Coin rule deleted successfully"}
 
 # --- Coin Transactions Endpoints ---
-@router.get("/transactions", response_model=List[CoinTransactionResponse])
+@router.get("/transactions", response_model=Union[List[CoinTransactionResponse], CoinTransactionPage])
 def get_coin_transactions(
     user_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get coin transactions with optional user filter"""
+    """
+    Get coin transactions with optional user filter. Pass `cursor` (empty for the
+    first page, then the returned `next_cursor`) for keyset pagination.
+    """
     query = db.query(CoinTransaction)
     
     if user_id:
         query = query.filter(CoinTransaction.user_id == user_id)
     
+    if cursor is not None:
+        try:
+            transactions, next_cursor = keyset_page(
+                query, CoinTransaction.created_at, CoinTransaction.id, cursor, limit, "created_at"
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return CoinTransactionPage(
+            items=[_coin_transaction_response(tx) for tx in transactions],
+            next_cursor=next_cursor
+        )
+
     transactions = query.order_by(desc(CoinTransaction.created_at)).offset(skip).limit(limit).all()
     
-    return [
-        CoinTransactionResponse(
-            id=tx.id,
-            user_id=tx.user_id,
-            amount=tx.amount,
-            transaction_type=tx.transaction_type,
-            description=tx.description,
-            created_at=tx.created_at.isoformat() if tx.created_at else datetime.now().isoformat()
-        )
-        for tx in transactions
-    ]
+    return [_coin_transaction_response(tx) for tx in transactions]
+
+def _coin_transaction_response(tx: CoinTransaction) -> CoinTransactionResponse:
+    return CoinTransactionResponse(
+        id=tx.id,
+        user_id=tx.user_id,
+        amount=tx.amount,
+        transaction_type=tx.transaction_type,
+        description=tx.description,
+        created_at=tx.created_at.isoformat() if tx.created_at else datetime.now().isoformat()
+    )
 
 @router.post("/transactions", response_model=CoinTransactionResponse)
 def create_coin_transaction(request: CoinTransactionCreate, db: Session = Depends(get_db)):
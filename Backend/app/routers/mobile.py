@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 
-from ..database import get_db
-from ..sql_models import Transaction, Category, Subscription, PaymentMethod, User
+from ..database import get_db, SessionLocal
+from ..sql_models import Transaction, Category, Subscription, PaymentMethod, User, SMSIngestJob
 from ..services.sms_parser import SMSParser
+from ..services.sms_ingest import store_parsed_messages
+from ..services.ingest_queue import IngestWorkerPool, enqueue_sms, queue_depth
+from ..services.leak_detector import LeakDetector, leak_state
+from ..services.rollups import month_key, month_summary
+from ..services.home_cache import home_cache
+from ..services.transaction_queries import list_transactions
+from ..services.activity_log import log_sms_ingest
+from ..services.merchant_suggest import merchant_suggester, SUGGEST_LIMIT
+import json
 
 router = APIRouter(
     prefix="/mobile",
@@ -15,17 +24,45 @@ router = APIRouter(
 )
 
 sms_parser = SMSParser()
+leak_detector = LeakDetector()
+
+# Upper bound on messages accepted by a single /sms/process-batch call
+MAX_SMS_BATCH_SIZE = 5000
+
+# Background workers draining /sms/queue (started/stopped by the app lifecycle in main.py)
+ingest_pool = IngestWorkerPool(SessionLocal, sms_parser)
 
 # --- Pydantic Models ---
 class SMSRequest(BaseModel):
     sms_text: str
     user_id: int
+    sender: Optional[str] = None  # SMS sender ID, e.g. "VM-HDFCBK"
 
 class SMSResponse(BaseModel):
     status: str
     message: str
     data: Optional[dict] = None
 
+class SMSBatchItemResult(BaseModel):
+    index: int
+    status: str
+    message: str
+    data: Optional[dict] = None
+
+class SMSBatchResponse(BaseModel):
+    status: str
+    processed: int
+    ignored: int
+    results: List[SMSBatchItemResult]
+
+class SMSTicketResponse(BaseModel):
+    ticket_id: str
+    status: str
+    message: Optional[str] = None
+    data: Optional[dict] = None
+    created_at: Optional[str] = None
+    processed_at: Optional[str] = None
+
 class HomeDataResponse(BaseModel):
     total_monthly_expense: float
     top_categories: List[dict]
@@ -41,11 +78,14 @@ def process_sms(request: SMSRequest, db: Session = Depends(get_db)):
     """
     try:
         # 1. Parse SMS
-        parsed_data = sms_parser.parse(request.sms_text)
+        parsed_data = sms_parser.parse(request.sms_text, sender=request.sender)
         
         if parsed_data['amount'] == 0:
              return SMSResponse(status="ignored", message="Could not extract valid amount")
 
+        # Leak check against the user's rolling state, before this transaction is recorded
+        parsed_data.update(leak_detector.detect(parsed_data, request.user_id, db))
+
         # 2. Find or Create Category
         category_name = parsed_data['category']
         category = db.query(Category).filter(
@@ -121,6 +161,9 @@ def process_sms(request: SMSRequest, db: Session = Depends(get_db)):
         )
         db.add(new_transaction)
         db.commit()
+        leak_state.record(request.user_id, parsed_data)
+        merchant_suggester.record(request.user_id, parsed_data)
+        log_sms_ingest([(request.user_id, parsed_data)], "sms/process")
         
         return SMSResponse(
             status="success", 
@@ -133,56 +176,186 @@ def process_sms(request: SMSRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/sms/queue", response_model=SMSTicketResponse, status_code=202)
+def queue_sms(request: SMSRequest, db: Session = Depends(get_db)):
+    """
+    Asynchronous ingestion: stores the raw SMS in the durable queue and returns a
+    ticket right away. Background workers parse and store it in batches.
+    """
+    job = enqueue_sms(db, request.user_id, request.sms_text, request.sender)
+    ingest_pool.notify()
+    return SMSTicketResponse(
+        ticket_id=job.ticket_id,
+        status=job.status,
+        created_at=job.created_at.isoformat() if job.created_at else None
+    )
+
+
+@router.get("/sms/queue/metrics")
+def get_sms_queue_metrics(db: Session = Depends(get_db)):
+    """
+    Queue depth per status plus worker pool counters, for watching the backlog.
+    """
+    return {
+        "queue": queue_depth(db),
+        "workers": ingest_pool.stats()
+    }
+
+
+@router.get("/sms/queue/{ticket_id}", response_model=SMSTicketResponse)
+def get_sms_ticket(ticket_id: str, db: Session = Depends(get_db)):
+    """
+    Status of a queued SMS.
+    """
+    job = db.query(SMSIngestJob).filter(SMSIngestJob.ticket_id == ticket_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    return SMSTicketResponse(
+        ticket_id=job.ticket_id,
+        status=job.status,
+        message=job.error,
+        data=json.loads(job.result) if job.result else None,
+        created_at=job.created_at.isoformat() if job.created_at else None,
+        processed_at=job.processed_at.isoformat() if job.processed_at else None
+    )
+
+
+@router.post("/sms/process-batch", response_model=SMSBatchResponse)
+def process_sms_batch(requests: List[SMSRequest], db: Session = Depends(get_db)):
+    """
+    Receives a batch of SMS texts (e.g. the initial inbox sync), parses them all and
+    stores the transactions/subscriptions with bulk inserts in a single commit.
+    """
+    if len(requests) > MAX_SMS_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large, send at most {MAX_SMS_BATCH_SIZE} messages per request"
+        )
+
+    results: List[Optional[SMSBatchItemResult]] = [None] * len(requests)
+    parsed_items = []
+
+    # 1. Parse every SMS up front
+    for index, request in enumerate(requests):
+        try:
+            parsed_data = sms_parser.parse(request.sms_text, sender=request.sender)
+        except Exception as e:
+            results[index] = SMSBatchItemResult(index=index, status="error", message=str(e))
+            continue
+
+        if parsed_data['amount'] == 0:
+            results[index] = SMSBatchItemResult(
+                index=index, status="ignored", message="Could not extract valid amount"
+            )
+            continue
+
+        parsed_items.append((index, request.user_id, parsed_data))
+
+    try:
+        if parsed_items:
+            # 2. Resolve categories/payment methods once, bulk insert and commit once
+            items = [(user_id, data) for _, user_id, data in parsed_items]
+            store_parsed_messages(db, items)
+            db.commit()
+            leak_state.record_many(items)
+            merchant_suggester.record_many(items)
+            log_sms_ingest(items, "sms/process-batch")
+
+        for index, _, data in parsed_items:
+            results[index] = SMSBatchItemResult(
+                index=index,
+                status="success",
+                message="Transaction processed successfully",
+                data=data
+            )
+
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    processed = sum(1 for result in results if result.status == "success")
+    return SMSBatchResponse(
+        status="success",
+        processed=processed,
+        ignored=len(results) - processed,
+        results=results
+    )
+
+
+@router.get("/merchants/suggest")
+def suggest_merchants(user_id: int, prefix: str = "", limit: int = SUGGEST_LIMIT, db: Session = Depends(get_db)):
+    """
+    Merchant name completions for `prefix`: the user's own merchants first,
+    most used first, then the most used merchants across all users.
+    """
+    try:
+        return {"prefix": prefix, "suggestions": merchant_suggester.suggest(db, user_id, prefix, limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/merchants/suggest/stats")
+def get_merchant_suggest_stats():
+    """
+    Size of the in-memory merchant autocomplete index.
+    """
+    return merchant_suggester.stats()
+
+
 @router.get("/home", response_model=HomeDataResponse)
-def get_home_data(user_id: int, db: Session = Depends(get_db)):
+def get_home_data(user_id: int, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     """
-    Aggregates data for the Mobile Home Page.
+    Aggregates data for the Mobile Home Page. The serialized payload is cached per
+    user until one of their transactions or subscriptions changes (for at most
+    HOME_CACHE_TTL, which covers writes from other processes), and carries an
+    ETag so the app can revalidate with If-None-Match.
     """
-    # 1. Total Monthly Expense
-    today = datetime.now()
-    start_of_month = datetime(today.year, today.month, 1)
-    
-    total_expense = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == user_id,
-        Transaction.type == 'expense',
-        Transaction.date >= start_of_month
-    ).scalar() or 0.0
-
-    # 2. Spending by Category (Top 3)
-    # Group by category, sum amount, order by sum desc, limit 3
-    top_categories_query = db.query(
-        Category.name, 
-        Category.color,
-        func.sum(Transaction.amount).label('total')
-    ).join(Transaction).filter(
-        Transaction.user_id == user_id,
-        Transaction.type == 'expense',
-        Transaction.date >= start_of_month
-    ).group_by(Category.id).order_by(desc('total')).limit(3).all()
-    
-    top_categories = [
-        {"name": cat.name, "color": cat.color, "amount": cat.total} 
-        for cat in top_categories_query
-    ]
+    month = month_key(datetime.now())
+    cached = home_cache.get(user_id, month)
+    if cached is None:
+        token = home_cache.begin(user_id)
+        payload = build_home_data(db, user_id, month)
+        body = json.dumps(jsonable_encoder(payload)).encode("utf-8")
+        etag = home_cache.put(user_id, month, body, token)
+    else:
+        body, etag = cached
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")]:
+        home_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/home/cache-stats")
+def get_home_cache_stats():
+    """
+    Hit/miss counters of the home payload cache.
+    """
+    return home_cache.stats()
+
+
+def build_home_data(db: Session, user_id: int, month: str) -> HomeDataResponse:
+    # 1. Total Monthly Expense and 2. Spending by Category (Top 3),
+    # both read from the monthly rollup instead of scanning transactions
+    summary = month_summary(db, user_id, month)
+    total_expense = summary["total"]
+    top_categories = summary["top_categories"]
 
     # 3. Recent Transactions (Limit 2, Filter for 'Scan & Pay' / 'Wallet' context)
     # Note: The user asked for "camera scan and pay or wallet". 
     # In our schema, we can filter by payment_method type if available, or just show recent 2 expenses.
     # For now, showing recent 2 expenses.
-    recent_transactions_query = db.query(Transaction).filter(
-        Transaction.user_id == user_id,
-        Transaction.type == 'expense'
-    ).order_by(Transaction.date.desc()).limit(2).all()
-    
     recent_transactions = [
         {
             "id": tx.id,
             "merchant": tx.merchant_name or "Unknown",
             "amount": tx.amount,
             "date": tx.date.isoformat(),
-            "category": tx.category.name if tx.category else "Uncategorized"
+            "category": tx.category_name or "Uncategorized"
         }
-        for tx in recent_transactions_query
+        for tx in list_transactions(db, user_id=user_id, type_='expense', limit=2)
     ]
 
     # 4. Recent Subscriptions (Limit 2)
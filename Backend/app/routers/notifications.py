@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
 from ..database import get_db
 from ..sql_models import Notification, User
+from ..services.pagination import keyset_page
 
 router = APIRouter(
     prefix="/notifications",
@@ -31,35 +32,55 @@ class NotificationResponse(BaseModel):
     link: Optional[str]
     created_at: str
 
+class NotificationPage(BaseModel):
+    items: List[NotificationResponse]
+    next_cursor: Optional[str] = None
+
 # --- Endpoints ---
-@router.get("/", response_model=List[NotificationResponse])
+@router.get("/", response_model=Union[List[NotificationResponse], NotificationPage])
 def get_notifications(
     user_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all notifications, optionally filtered by user"""
+    """
+    Get all notifications, optionally filtered by user. Pass `cursor` (empty for
+    the first page, then the returned `next_cursor`) for keyset pagination.
+    """
     query = db.query(Notification)
     
     if user_id:
         query = query.filter(Notification.user_id == user_id)
     
+    if cursor is not None:
+        try:
+            notifications, next_cursor = keyset_page(
+                query, Notification.created_at, Notification.id, cursor, limit, "created_at"
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return NotificationPage(
+            items=[_notification_response(notif) for notif in notifications],
+            next_cursor=next_cursor
+        )
+
     notifications = query.order_by(desc(Notification.created_at)).offset(skip).limit(limit).all()
     
-    return [
-        NotificationResponse(
-            id=notif.id,
-            user_id=notif.user_id,
-            title=notif.title,
-            message=notif.message,
-            notification_type=notif.notification_type,
-            is_read=notif.is_read,
-            link=notif.link,
-            created_at=notif.created_at.isoformat() if notif.created_at else datetime.now().isoformat()
-        )
-        for notif in notifications
-    ]
+    return [_notification_response(notif) for notif in notifications]
+
+def _notification_response(notif: Notification) -> NotificationResponse:
+    return NotificationResponse(
+        id=notif.id,
+        user_id=notif.user_id,
+        title=notif.title,
+        message=notif.message,
+        notification_type=notif.notification_type,
+        is_read=notif.is_read,
+        link=notif.link,
+        created_at=notif.created_at.isoformat() if notif.created_at else datetime.now().isoformat()
+    )
 
 @router.get("/{notification_id}", response_model=NotificationResponse)
 def get_notification_detail(notification_id: int, db: Session = Depends(get_db)):
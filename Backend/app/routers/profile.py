@@ -7,6 +7,7 @@ import uuid
 
 from ..database import get_db
 from ..sql_models import User
+from ..services.activity_log import activity_logger
 
 router = APIRouter(
     prefix="/profile",
@@ -104,6 +105,7 @@ def upgrade_membership(user_id: int = 1, db: Session = Depends(get_db)):
     
     user.is_premium_member = True
     db.commit()
+    activity_logger.log("purchase", "Upgraded to premium membership", user.id)
     
     return {"status": "success", "message": "Membership upgraded"}
 
@@ -144,6 +146,10 @@ def verify_payment(
     if user:
         user.is_premium_member = True
         db.commit()
+        activity_logger.log(
+            "purchase", "Premium membership payment verified", user.id,
+            {"order_id": razorpay_order_id, "payment_id": razorpay_payment_id}
+        )
     
     return {
         "success": True,
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
 from ..database import get_db
-from ..sql_models import User, Transaction, Subscription
+from ..sql_models import User, UserStats
 
 router = APIRouter(
     prefix="/users",
@@ -106,32 +105,12 @@ def get_user_stats(user_id: int, db: Session = Depends(get_db)):
     """
     Get user statistics for admin panel
     """
-    # Total transactions
-    total_transactions = db.query(func.count(Transaction.id)).filter(
-        Transaction.user_id == user_id
-    ).scalar() or 0
-    
-    # Total spent
-    total_spent = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == user_id,
-        Transaction.type == 'expense'
-    ).scalar() or 0.0
-    
-    # Active subscriptions
-    active_subs = db.query(func.count(Subscription.id)).filter(
-        Subscription.user_id == user_id,
-        Subscription.status == 'active'
-    ).scalar() or 0
-    
-    # Total subscription cost
-    sub_cost = db.query(func.sum(Subscription.amount)).filter(
-        Subscription.user_id == user_id,
-        Subscription.status == 'active'
-    ).scalar() or 0.0
+    # All four figures are kept in the materialized user_stats row
+    stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
     
     return UserStatsResponse(
-        total_transactions=total_transactions,
-        total_spent=total_spent,
-        active_subscriptions=active_subs,
-        total_subscription_cost=sub_cost
+        total_transactions=stats.transaction_count if stats else 0,
+        total_spent=stats.total_spent if stats else 0.0,
+        active_subscriptions=stats.active_subscriptions if stats else 0,
+        total_subscription_cost=stats.subscription_cost if stats else 0.0
     )
@@ -1,8 +1,10 @@
 from .sms_parser import SMSParser
-
-class LeakDetector:
-    def detect(self, data, history):
-        return {}
+from .keyword_index import KeywordIndex
+from .bank_extractors import register_extractor, get_extractor
+from .leak_detector import LeakDetector, leak_state
+from . import rollups  # registers the transaction rollup hook
+from .home_cache import home_cache
+from .leaderboard import leaderboard  # applies committed writes to the rolling leaderboards
 
 class AlternativeSuggester:
     def suggest(self, context):
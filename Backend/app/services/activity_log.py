@@ -0,0 +1,243 @@
+import itertools
+import json
+import os
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..sql_models import ActivityLog
+
+# Flush when this many events are pending, or every interval, whichever comes first
+ACTIVITY_FLUSH_SIZE = 200
+ACTIVITY_FLUSH_INTERVAL = 2.0  # seconds
+ACTIVITY_FEED_SIZE = 500  # recent events kept in memory for the admin feed
+# Pending events kept while the database is unavailable; the oldest are dropped beyond this
+ACTIVITY_BUFFER_LIMIT = 50000
+# The ring buffer only sees this process's events. Under several server
+# processes (uvicorn/gunicorn read WEB_CONCURRENCY as their worker count) the
+# feed is read from activity_logs instead, lagging by up to one flush interval.
+ACTIVITY_FEED_FROM_DB = int(os.environ.get("WEB_CONCURRENCY", "1")) > 1
+
+
+def _stored_event(row: ActivityLog) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "action_type": row.action_type,
+        "description": row.description,
+        "meta_data": row.meta_data,
+        "created_at": row.created_at or datetime.utcnow()
+    }
+
+
+def _feed_item(event: Dict[str, Any]) -> Dict[str, Any]:
+    # Timestamps are UTC; the suffix keeps browsers from reading them as local time
+    return {**event, "created_at": event["created_at"].isoformat() + "Z"}
+
+
+class ActivityLogger:
+    """
+    Records activity events without a database write per request. Events go
+    to an in-memory buffer that a background thread inserts into
+    activity_logs in batches, and to a bounded ring buffer that serves the
+    recent-activity feed.
+
+    The ring buffer and its ids are per process: with more than one server
+    process each would show only its own events, with overlapping ids. Use
+    `stored_activity` (see ACTIVITY_FEED_FROM_DB) for the feed in that case.
+    """
+
+    def __init__(self, flush_size: int = ACTIVITY_FLUSH_SIZE, flush_interval: float = ACTIVITY_FLUSH_INTERVAL,
+                 feed_size: int = ACTIVITY_FEED_SIZE, buffer_limit: int = ACTIVITY_BUFFER_LIMIT):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.buffer_limit = buffer_limit
+        self.session_factory = None
+
+        self._pending: List[Dict[str, Any]] = []
+        self._recent: deque = deque(maxlen=feed_size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.logged = 0
+        self.written = 0
+        self.flushes = 0
+        self.dropped = 0
+        self.flush_errors = 0
+
+    def log(self, action_type: str, description: str, user_id: Optional[int] = None,
+            meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Buffers one event and returns it as the feed shows it. Never touches
+        the database.
+        """
+        event = {
+            "id": next(self._ids),
+            "user_id": user_id,
+            "action_type": action_type,
+            "description": description,
+            "meta_data": json.dumps(meta, default=str) if meta else None,
+            "created_at": datetime.utcnow()
+        }
+        with self._lock:
+            self._pending.append(event)
+            self._recent.append(event)
+            self.logged += 1
+            full = len(self._pending) >= self.flush_size
+        if full:
+            self._wakeup.set()
+        return event
+
+    def recent(self, limit: int = 50, action_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Newest events first, from the ring buffer.
+        """
+        with self._lock:
+            events = list(self._recent)
+        events.reverse()
+        if action_type:
+            events = [event for event in events if event["action_type"] == action_type]
+        return [_feed_item(event) for event in events[:limit]]
+
+    def flush(self) -> int:
+        """
+        Writes every pending event in one transaction. On failure the events
+        go back to the front of the buffer for the next attempt.
+        """
+        if self.session_factory is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            rows = [
+                {
+                    "user_id": event["user_id"],
+                    "action_type": event["action_type"],
+                    "description": event["description"],
+                    "meta_data": event["meta_data"],
+                    "created_at": event["created_at"]
+                }
+                for event in batch
+            ]
+            db = self.session_factory()
+            try:
+                db.execute(ActivityLog.__table__.insert(), rows)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                with self._lock:
+                    self._pending = batch + self._pending
+                    overflow = len(self._pending) - self.buffer_limit
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        self.dropped += overflow
+                    self.flush_errors += 1
+                print(f"Activity log flush failed: {e}")
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                self.written += len(batch)
+                self.flushes += 1
+            return len(batch)
+
+    def load_recent(self):
+        """
+        Seeds the ring buffer with the latest stored events, so the feed is
+        not empty after a restart.
+        """
+        db = self.session_factory()
+        try:
+            rows = db.query(ActivityLog).order_by(ActivityLog.id.desc()).limit(self._recent.maxlen).all()
+        finally:
+            db.close()
+        with self._lock:
+            stored = [_stored_event(row) for row in reversed(rows)]
+            buffered = list(self._recent)
+            # Number events logged before the seed after the stored ones, so feed ids stay unique
+            last_id = rows[0].id if rows else 0
+            for event in buffered:
+                last_id += 1
+                event["id"] = last_id
+            self._ids = itertools.count(last_id + 1)
+            self._recent.clear()
+            self._recent.extend(stored + buffered)
+
+    def start(self, session_factory):
+        if self._thread is not None:
+            return
+        self.session_factory = session_factory
+        self.load_recent()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "recent": len(self._recent),
+                "logged": self.logged,
+                "written": self.written,
+                "flushes": self.flushes,
+                "dropped": self.dropped,
+                "flush_errors": self.flush_errors
+            }
+
+
+activity_logger = ActivityLogger()
+
+
+def stored_activity(db: Session, limit: int = 50, action_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Newest flushed events first, from activity_logs: the feed shared by
+    every process, with database ids.
+    """
+    query = db.query(ActivityLog)
+    if action_type:
+        query = query.filter(ActivityLog.action_type == action_type)
+    rows = query.order_by(ActivityLog.id.desc()).limit(limit).all()
+    return [_feed_item(_stored_event(row)) for row in rows]
+
+
+def log_sms_ingest(items: Iterable[Tuple[int, Dict[str, Any]]], source: str):
+    """
+    One "sms_ingest" event per user for a batch of stored (user_id, parsed
+    SMS) pairs.
+    """
+    per_user = defaultdict(list)
+    for user_id, data in items:
+        per_user[user_id].append(data)
+    for user_id, messages in per_user.items():
+        if len(messages) == 1:
+            data = messages[0]
+            merchant = f" at {data['merchant']}" if data.get('merchant') else ""
+            description = f"Added {data['amount']} expense{merchant} from SMS"
+        else:
+            description = f"Imported {len(messages)} transactions from SMS"
+        activity_logger.log("sms_ingest", description, user_id, {"count": len(messages), "source": source})
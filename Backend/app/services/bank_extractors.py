@@ -0,0 +1,108 @@
+import re
+from typing import Any, Callable, Dict, Optional
+
+# An extractor receives the cleaned SMS text and returns the fields it could
+# read ('amount', 'merchant' and optionally 'payment_method'), or None to let
+# the generic regex cascade handle the message.
+Extractor = Callable[[str], Optional[Dict[str, Any]]]
+
+# Registry of bank-specific extractors keyed by normalized sender ID
+SENDER_EXTRACTORS: Dict[str, Extractor] = {}
+
+# Operator/circle prefix DLT adds in front of the sender header, e.g. "VM-HDFCBK"
+SENDER_PREFIX_PATTERN = re.compile(r"^[A-Z0-9]{2}-")
+
+AMOUNT = r"([\d,]+(?:\.\d{1,2})?)"
+
+
+def normalize_sender(sender: Optional[str]) -> Optional[str]:
+    """
+    Reduces a raw sender address ("VM-HDFCBK", "ad-hdfcbk-s") to its header ("HDFCBK").
+    """
+    if not sender:
+        return None
+    header = SENDER_PREFIX_PATTERN.sub("", sender.strip().upper())
+    return header.split("-")[0] or None
+
+
+def register_extractor(*sender_ids: str):
+    """
+    Decorator registering an extractor for one or more sender headers.
+    """
+    def decorator(extractor: Extractor) -> Extractor:
+        for sender_id in sender_ids:
+            SENDER_EXTRACTORS[sender_id.upper()] = extractor
+        return extractor
+    return decorator
+
+
+def get_extractor(sender: Optional[str]) -> Optional[Extractor]:
+    """
+    O(1) lookup of the extractor registered for a sender, if any.
+    """
+    header = normalize_sender(sender)
+    return SENDER_EXTRACTORS.get(header) if header else None
+
+
+def _to_amount(value: str) -> float:
+    return float(value.replace(',', ''))
+
+
+# --- HDFC Bank ---
+HDFC_UPI_PATTERN = re.compile(
+    r"(?i)rs\.?\s*" + AMOUNT + r"\s+debited from a/c\s+\S+\s+on\s+\S+\s+to\s+vpa\s+(\S+?)(?:@\S+)?\s*\(upi"
+)
+HDFC_CARD_PATTERN = re.compile(
+    r"(?i)spent\s+rs\.?\s*" + AMOUNT + r"\s+on hdfc bank card\s+\S+\s+at\s+(.+?)\s+on\s+\d"
+)
+
+
+@register_extractor("HDFCBK", "HDFCBN")
+def extract_hdfc(text: str) -> Optional[Dict[str, Any]]:
+    match = HDFC_UPI_PATTERN.search(text)
+    if match:
+        return {'amount': _to_amount(match.group(1)), 'merchant': match.group(2), 'payment_method': 'UPI'}
+    match = HDFC_CARD_PATTERN.search(text)
+    if match:
+        return {'amount': _to_amount(match.group(1)), 'merchant': match.group(2), 'payment_method': 'Card'}
+    return None
+
+
+# --- State Bank of India ---
+SBI_UPI_PATTERN = re.compile(
+    r"(?i)a/c\s+\S+\s+debited by\s+" + AMOUNT + r"\s+on date\s+\S+\s+trf to\s+(.+?)\s+ref\s*no"
+)
+SBI_CARD_PATTERN = re.compile(
+    r"(?i)rs\.?\s*" + AMOUNT + r"\s+spent on your sbi credit card ending\s+\d+\s+at\s+(.+?)\s+on\s+\d"
+)
+
+
+@register_extractor("SBIINB", "SBIUPI", "SBIPSG", "CBSSBI", "SBICRD", "ATMSBI")
+def extract_sbi(text: str) -> Optional[Dict[str, Any]]:
+    match = SBI_UPI_PATTERN.search(text)
+    if match:
+        return {'amount': _to_amount(match.group(1)), 'merchant': match.group(2), 'payment_method': 'UPI'}
+    match = SBI_CARD_PATTERN.search(text)
+    if match:
+        return {'amount': _to_amount(match.group(1)), 'merchant': match.group(2), 'payment_method': 'Card'}
+    return None
+
+
+# --- ICICI Bank ---
+ICICI_UPI_PATTERN = re.compile(
+    r"(?i)acct\s+\S+\s+debited for rs\.?\s*" + AMOUNT + r"\s+on\s+\S+;\s*(.+?)\s+credited"
+)
+ICICI_CARD_PATTERN = re.compile(
+    r"(?i)(?:inr|rs\.?)\s*" + AMOUNT + r"\s+spent using icici bank card\s+\S+\s+on\s+\S+\s+on\s+(.+?)\.\s"
+)
+
+
+@register_extractor("ICICIB", "ICICIT")
+def extract_icici(text: str) -> Optional[Dict[str, Any]]:
+    match = ICICI_UPI_PATTERN.search(text)
+    if match:
+        return {'amount': _to_amount(match.group(1)), 'merchant': match.group(2), 'payment_method': 'UPI'}
+    match = ICICI_CARD_PATTERN.search(text)
+    if match:
+        return {'amount': _to_amount(match.group(1)), 'merchant': match.group(2), 'payment_method': 'Card'}
+    return None
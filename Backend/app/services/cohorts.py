@@ -0,0 +1,223 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+# Weeks are numbered from signup: week 0 is the signup week, week 12 the last one tracked
+RETENTION_WEEKS = 12
+TRACKED_WEEKS = RETENTION_WEEKS + 1
+# Logged actions that do not show engagement; a signup row exists for every registered user
+RETENTION_EXCLUDED_ACTIONS = ("signup",)
+WEEK_SECONDS = 7 * 24 * 3600
+# Premium revenue per premium member, the same figure the admin revenue stats use
+PREMIUM_PRICE = 5.0
+# Closed cohorts are recomputed this often anyway, to pick up backfilled activity
+CLOSED_COHORT_TTL = timedelta(hours=24)
+
+
+def _sql_time(value: datetime) -> str:
+    # Same text form SQLAlchemy stores DateTime columns in
+    return value.isoformat(sep=" ")
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month = value.month - 1 + months
+    return value.replace(year=value.year + month // 12, month=month % 12 + 1)
+
+
+def open_cohorts_since(now: datetime) -> datetime:
+    """
+    First month whose cohort is still open: some of its users have not yet
+    reached the end of their retention window. Earlier cohorts are closed.
+    """
+    return _month_start(now - timedelta(weeks=TRACKED_WEEKS))
+
+
+def retention_counts(user_cohort: np.ndarray, user_signup: np.ndarray, event_user: np.ndarray,
+                     event_ts: np.ndarray, n_cohorts: int, now_ts: int,
+                     weeks: int = TRACKED_WEEKS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weekly retention counts for every cohort at once.
+
+    user_cohort/user_signup describe each user (cohort index, signup epoch
+    seconds); event_user/event_ts are activity events as (user position,
+    epoch seconds). Week w (0-based) covers days [7w, 7w + 7) after signup.
+    Returns (active, eligible), both (n_cohorts, weeks): users with at least
+    one event in the week, and users whose week has started.
+    """
+    week = (event_ts - user_signup[event_user]) // WEEK_SECONDS
+    valid = (week >= 0) & (week < weeks)
+    pairs = np.unique(event_user[valid] * weeks + week[valid])  # one entry per active (user, week)
+    active_user, active_week = np.divmod(pairs, weeks)
+    active = np.bincount(
+        user_cohort[active_user] * weeks + active_week, minlength=n_cohorts * weeks
+    ).reshape(n_cohorts, weeks)
+
+    # Number of weeks each user has started, then per cohort how many users reached each week
+    started = np.clip((now_ts - user_signup) // WEEK_SECONDS + 1, 0, weeks)
+    histogram = np.bincount(
+        user_cohort * (weeks + 1) + started, minlength=n_cohorts * (weeks + 1)
+    ).reshape(n_cohorts, weeks + 1)
+    eligible = histogram[:, ::-1].cumsum(axis=1)[:, ::-1][:, 1:]
+    return active, eligible
+
+
+def _load_retention(db: Session, since: datetime, until: datetime, now: datetime) -> Dict[str, Tuple]:
+    """
+    (active, eligible) weekly counts per signup month for users created in
+    [since, until), from transactions and engagement activity_logs rows.
+    """
+    params = {
+        "since": _sql_time(since),
+        "until": _sql_time(until),
+        "horizon": _sql_time(until + timedelta(weeks=TRACKED_WEEKS)),
+        "excluded": list(RETENTION_EXCLUDED_ACTIONS)
+    }
+    users = db.execute(text("""
+        SELECT id, CAST(strftime('%s', created_at) AS INTEGER), strftime('%Y-%m', created_at)
+        FROM users
+        WHERE created_at >= :since AND created_at < :until
+        ORDER BY id
+    """), params).fetchall()
+    if not users:
+        return {}
+
+    events = db.execute(text("""
+        SELECT t.user_id, CAST(strftime('%s', t.created_at) AS INTEGER)
+        FROM transactions t JOIN users u ON u.id = t.user_id
+        WHERE u.created_at >= :since AND u.created_at < :until
+          AND t.created_at >= :since AND t.created_at < :horizon
+        UNION ALL
+        SELECT a.user_id, CAST(strftime('%s', a.created_at) AS INTEGER)
+        FROM activity_logs a JOIN users u ON u.id = a.user_id
+        WHERE u.created_at >= :since AND u.created_at < :until
+          AND a.created_at >= :since AND a.created_at < :horizon
+          AND a.action_type NOT IN :excluded
+    """).bindparams(bindparam("excluded", expanding=True)), params).fetchall()
+
+    user_ids, user_signup, user_month = zip(*users)
+    user_ids = np.array(user_ids, dtype=np.int64)
+    months, user_cohort = np.unique(np.array(user_month, dtype=object), return_inverse=True)
+    if events:
+        event_user_ids, event_ts = (np.array(column, dtype=np.int64) for column in zip(*events))
+    else:
+        event_user_ids = event_ts = np.empty(0, dtype=np.int64)
+
+    active, eligible = retention_counts(
+        user_cohort.astype(np.int64),
+        np.array(user_signup, dtype=np.int64),
+        np.searchsorted(user_ids, event_user_ids),
+        event_ts,
+        len(months),
+        int((now - datetime(1970, 1, 1)).total_seconds())
+    )
+    return {month: (active[i], eligible[i]) for i, month in enumerate(months)}
+
+
+class CohortCache:
+    """
+    Retention counts of closed cohorts. Their users have all left the
+    retention window, so the counts no longer change as time passes.
+    """
+
+    def __init__(self, ttl: timedelta = CLOSED_COHORT_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple] = {}  # month -> (computed_at, active, eligible)
+        self._lock = threading.Lock()
+
+    def get_many(self, months: List[str], now: datetime) -> Dict[str, Tuple]:
+        with self._lock:
+            return {
+                month: entry[1:]
+                for month, entry in ((month, self._entries.get(month)) for month in months)
+                if entry is not None and now - entry[0] < self.ttl
+            }
+
+    def put_many(self, counts: Dict[str, Tuple], now: datetime):
+        with self._lock:
+            for month, (active, eligible) in counts.items():
+                self._entries[month] = (now, active, eligible)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+cohort_cache = CohortCache()
+
+
+def _percent(numerator, denominator) -> Optional[float]:
+    return round(100.0 * float(numerator) / float(denominator), 1) if denominator else None
+
+
+def cohort_analysis(db: Session, months: int = 12, now: Optional[datetime] = None,
+                    cache: CohortCache = cohort_cache) -> Dict[str, Any]:
+    """
+    Signup-month cohorts of the last `months` months with weekly retention
+    (share of users with a transaction or engagement activity in each of
+    weeks 1..RETENTION_WEEKS after signup), premium conversion and premium LTV per user. Closed cohorts come
+    from `cache`; only open ones are recomputed.
+    """
+    now = now or datetime.utcnow()
+    window_start = _add_months(_month_start(now), -(months - 1))
+    open_since = max(open_cohorts_since(now), window_start)
+
+    sizes = db.execute(text("""
+        SELECT strftime('%Y-%m', created_at), COUNT(*), SUM(CASE WHEN is_premium_member THEN 1 ELSE 0 END)
+        FROM users
+        WHERE created_at >= :since
+        GROUP BY 1
+        ORDER BY 1
+    """), {"since": _sql_time(window_start)}).fetchall()
+
+    closed_months = [row[0] for row in sizes if row[0] < open_since.strftime("%Y-%m")]
+    counts = cache.get_many(closed_months, now)
+    missing = [month for month in closed_months if month not in counts]
+    if missing:
+        computed = _load_retention(
+            db, datetime.strptime(missing[0], "%Y-%m"), _add_months(datetime.strptime(missing[-1], "%Y-%m"), 1), now
+        )
+        cache.put_many(computed, now)
+        counts.update(computed)
+    counts.update(_load_retention(db, open_since, _add_months(_month_start(now), 1), now))
+
+    empty = (np.zeros(TRACKED_WEEKS, dtype=np.int64), np.zeros(TRACKED_WEEKS, dtype=np.int64))
+    cohorts = []
+    week_4 = []
+    total_active = np.zeros(TRACKED_WEEKS, dtype=np.int64)
+    total_eligible = np.zeros(TRACKED_WEEKS, dtype=np.int64)
+    total_users = total_premium = 0
+    for month, size, premium in sizes:
+        active, eligible = counts.get(month, empty)
+        total_active += active
+        total_eligible += eligible
+        total_users += size
+        total_premium += premium or 0
+        cohorts.append({
+            "cohort": month,
+            "size": size,
+            # Week 0 is the signup week itself, so the list starts at week 1
+            "retention": [_percent(a, e) for a, e in zip(active[1:].tolist(), eligible[1:].tolist())],
+            "premium_conversion": _percent(premium or 0, size) or 0.0,
+            "ltv": round((premium or 0) * PREMIUM_PRICE / size, 2)
+        })
+        if eligible[4]:
+            week_4.append((_percent(active[4], eligible[4]), month))
+
+    return {
+        "cohorts": cohorts,
+        "summary": {
+            "avg_retention_week_1": _percent(total_active[1], total_eligible[1]),
+            "avg_retention_week_4": _percent(total_active[4], total_eligible[4]),
+            "avg_retention_week_12": _percent(total_active[12], total_eligible[12]),
+            "best_cohort": max(week_4)[1] if week_4 else None,
+            "avg_premium_conversion": _percent(total_premium, total_users) or 0.0
+        }
+    }
@@ -0,0 +1,147 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+
+from ..sql_models import Transaction, Subscription, User, DailyStats
+from .rollups import DAILY_COLUMNS, UNDATED, day_key, needs_seed
+
+
+def _source_totals(db: Session, lower: Optional[datetime] = None, upper: Optional[datetime] = None,
+                   upper_inclusive: bool = False) -> Dict[str, List]:
+    """
+    daily_stats values computed from the users, transactions and subscriptions
+    tables, per day, for rows stamped in [lower, upper) (or [lower, upper]).
+    """
+    totals = defaultdict(lambda: [0, 0, 0, 0.0, 0])
+    sources = (
+        (User.created_at, (0, 1), [
+            func.count(User.id),
+            func.sum(case((User.is_premium_member == True, 1), else_=0))
+        ], None),
+        (Transaction.date, (2, 3), [
+            func.count(Transaction.id),
+            func.sum(case((Transaction.type == "expense", Transaction.amount), else_=0.0))
+        ], None),
+        (Subscription.created_at, (4,), [
+            func.count(Subscription.id)
+        ], func.coalesce(Subscription.status, "active") == "active"),
+    )
+
+    for column, slots, aggregates, condition in sources:
+        day = func.coalesce(func.strftime("%Y-%m-%d", column), UNDATED)
+        query = db.query(day, *aggregates)
+        if condition is not None:
+            query = query.filter(condition)
+        if lower is not None:
+            query = query.filter(column >= lower)
+        if upper is not None:
+            query = query.filter(column <= upper if upper_inclusive else column < upper)
+        for row in query.group_by(day).all():
+            for slot, value in zip(slots, row[1:]):
+                totals[row[0]][slot] += value or 0
+    return totals
+
+
+def _midnight(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def range_totals(db: Session, start_date: Optional[datetime] = None,
+                 end_date: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Dashboard counters for start_date <= timestamp <= end_date (either bound
+    optional). Whole days are summed from daily_stats; only the partial days
+    at the edges of the range are read from the source tables, through their
+    date indexes.
+    """
+    sums = [0, 0, 0, 0.0, 0]
+    edges = []
+
+    if start_date is not None and end_date is not None and start_date >= _midnight(end_date):
+        # Same day (or an empty range): no whole days in between
+        edges.append((start_date, end_date))
+    else:
+        query = db.query(*[func.sum(getattr(DailyStats, column)) for column in DAILY_COLUMNS])
+        if start_date is not None or end_date is not None:
+            query = query.filter(DailyStats.day != UNDATED)
+        if start_date is not None:
+            first_day = _midnight(start_date)
+            if first_day != start_date:
+                first_day += timedelta(days=1)
+                edges.append((start_date, first_day - timedelta(microseconds=1)))
+            query = query.filter(DailyStats.day >= day_key(first_day))
+        if end_date is not None:
+            edges.append((_midnight(end_date), end_date))
+            query = query.filter(DailyStats.day < day_key(end_date))
+        sums = [value or 0 for value in query.one()]
+
+    for lower, upper in edges:
+        for values in _source_totals(db, lower, upper, upper_inclusive=True).values():
+            sums = [total + value for total, value in zip(sums, values)]
+
+    return dict(zip(DAILY_COLUMNS, sums))
+
+
+def rebuild_daily_stats(db: Session) -> int:
+    """
+    Rewrites daily_stats from the source tables. Does not commit. Returns the
+    number of rows written.
+    """
+    rows = [
+        dict(zip(("day",) + DAILY_COLUMNS, (day, *values)))
+        for day, values in _source_totals(db).items()
+    ]
+    db.execute(DailyStats.__table__.delete())
+    if rows:
+        db.execute(DailyStats.__table__.insert(), rows)
+    return len(rows)
+
+
+def seed_daily_stats(db: Session) -> int:
+    """
+    Rebuilds daily_stats when it is empty but the source tables are not, as
+    on a database that predates it. Does not commit. Returns the number of
+    rows written.
+    """
+    if not needs_seed(db, DailyStats, User, Transaction, Subscription):
+        return 0
+    return rebuild_daily_stats(db)
+
+
+def reconcile_daily_stats(db: Session, repair: bool = False) -> List[Dict[str, Any]]:
+    """
+    Compares every daily_stats bucket with the source tables and returns the
+    days that disagree, with both values. With `repair`, rewrites those days
+    (does not commit).
+    """
+    expected = _source_totals(db)
+    stored = {
+        row.day: [getattr(row, column) or 0 for column in DAILY_COLUMNS]
+        for row in db.query(DailyStats).all()
+    }
+
+    mismatches = []
+    for day in sorted(set(expected) | set(stored)):
+        want = expected.get(day, [0, 0, 0, 0.0, 0])
+        have = stored.get(day, [0, 0, 0, 0.0, 0])
+        # expense_volume is a float sum; allow for rounding from incremental updates
+        if want[:3] != have[:3] or want[4] != have[4] or abs(want[3] - have[3]) > 1e-6 * max(1.0, abs(want[3])):
+            mismatches.append({
+                "day": day,
+                "expected": dict(zip(DAILY_COLUMNS, want)),
+                "stored": dict(zip(DAILY_COLUMNS, have))
+            })
+
+    if repair and mismatches:
+        days = [mismatch["day"] for mismatch in mismatches]
+        db.execute(DailyStats.__table__.delete().where(DailyStats.day.in_(days)))
+        rows = [
+            dict(zip(("day",) + DAILY_COLUMNS, (day, *expected[day])))
+            for day in days if any(expected.get(day, ()))
+        ]
+        if rows:
+            db.execute(DailyStats.__table__.insert(), rows)
+    return mismatches
@@ -0,0 +1,210 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, case, and_
+from sqlalchemy.orm import Session
+
+from ..sql_models import Alert, AuthSession, DailyStats, Subscription
+from .cohorts import PREMIUM_PRICE
+from .rollups import day_key
+
+# Dashboard payloads are reused for this long; counters may lag writes by as much as the TTL
+DASHBOARD_TTL = timedelta(seconds=5)
+
+
+def dashboard_counts(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Every counter the admin dashboard shows, from one aggregate per table:
+    all-time, this-month and today figures from daily_stats via conditional
+    sums, subscriptions active right now, active sessions and open alerts.
+    """
+    now = now or datetime.utcnow()
+    today = day_key(now)
+    month_start = today[:8] + "01"
+    is_today = DailyStats.day == today
+    this_month = and_(DailyStats.day >= month_start, DailyStats.day <= today)
+
+    def total(column):
+        return func.coalesce(func.sum(column), 0)
+
+    def when(condition, column):
+        return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+    (total_users, premium_users, total_transactions, total_revenue,
+     signups_today, transactions_today, revenue_today, revenue_this_month) = db.query(
+        total(DailyStats.signups),
+        total(DailyStats.premium_signups),
+        total(DailyStats.transaction_count),
+        total(DailyStats.expense_volume),
+        when(is_today, DailyStats.signups),
+        when(is_today, DailyStats.transaction_count),
+        when(is_today, DailyStats.expense_volume),
+        when(this_month, DailyStats.expense_volume)
+    ).one()
+
+    # daily_stats only counts subscriptions as they were created, not whether they are still active
+    active_subscriptions = db.query(
+        when(Subscription.status == "active", 1)
+    ).select_from(Subscription).scalar()
+    active_sessions = db.query(func.count(AuthSession.id)).filter(
+        AuthSession.is_active == True,
+        AuthSession.expires_at > now
+    ).scalar() or 0
+    open_alerts = db.query(func.count(Alert.id)).filter(Alert.is_dismissed == False).scalar() or 0
+
+    return {
+        "total_users": total_users,
+        "premium_users": premium_users,
+        "total_transactions": total_transactions,
+        "total_revenue": round(total_revenue, 2),
+        "active_subscriptions": active_subscriptions,
+        "signups_today": signups_today,
+        "transactions_today": transactions_today,
+        "revenue_today": round(revenue_today, 2),
+        "revenue_this_month": round(revenue_this_month, 2),
+        "active_sessions": active_sessions,
+        "open_alerts": open_alerts,
+        "conversion_rate": round(100.0 * premium_users / total_users, 1) if total_users else 0.0
+    }
+
+
+def quick_stats_items(counts: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    The dashboard ticker entries.
+    """
+    return [
+        {"label": "Total Users", "value": counts["total_users"], "icon": "users"},
+        {"label": "Premium Members", "value": counts["premium_users"], "icon": "star"},
+        {"label": "Transactions Today", "value": counts["transactions_today"], "icon": "activity"},
+        {"label": "Revenue This Month", "value": f"${counts['revenue_this_month']:,.0f}", "icon": "dollar"},
+        {"label": "Active Sessions", "value": f"{counts['active_sessions']:,}", "icon": "zap"},
+        {"label": "Conversion Rate", "value": f"{counts['conversion_rate']}%", "icon": "trending-up"}
+    ]
+
+
+def revenue_breakdown(premium_users: int) -> Dict[str, Any]:
+    premium_revenue = premium_users * PREMIUM_PRICE
+    return {
+        "sources": [
+            {"name": "Premium Subscriptions", "value": premium_revenue, "percentage": 65, "color": "#60a5fa"},
+            {"name": "Product Sales", "value": 15000, "percentage": 25, "color": "#34d399"},
+            {"name": "Advertisements", "value": 6000, "percentage": 10, "color": "#fbbf24"}
+        ],
+        "total": premium_revenue + 15000 + 6000
+    }
+
+
+def business_goals(total_users: int, premium_users: int) -> Dict[str, Any]:
+    return {
+        "goals": [
+            {
+                "id": 1,
+                "name": "Monthly Revenue",
+                "target": 50000,
+                "current": 45231,
+                "unit": "$",
+                "progress": 90.5,
+                "status": "on_track",
+                "deadline": "2025-11-30"
+            },
+            {
+                "id": 2,
+                "name": "New Users",
+                "target": 1000,
+                "current": total_users,
+                "unit": "users",
+                "progress": (total_users / 1000) * 100,
+                "status": "on_track",
+                "deadline": "2025-11-30"
+            },
+            {
+                "id": 3,
+                "name": "Premium Conversions",
+                "target": 200,
+                "current": premium_users,
+                "unit": "users",
+                "progress": (premium_users / 200) * 100,
+                "status": "ahead",
+                "deadline": "2025-11-30"
+            },
+            {
+                "id": 4,
+                "name": "User Engagement",
+                "target": 75,
+                "current": 68,
+                "unit": "%",
+                "progress": 90.7,
+                "status": "at_risk",
+                "deadline": "2025-11-30"
+            }
+        ],
+        "achievements": [
+            {"name": "First 1000 Users", "unlocked": True, "date": "2025-10-15"},
+            {"name": "$10K Revenue", "unlocked": True, "date": "2025-10-20"},
+            {"name": "100 Premium Users", "unlocked": True, "date": "2025-11-01"},
+            {"name": "$50K Revenue", "unlocked": False, "date": None}
+        ]
+    }
+
+
+class DashboardCache:
+    """
+    The last dashboard payload, reused for DASHBOARD_TTL.
+    """
+
+    def __init__(self, ttl: timedelta = DASHBOARD_TTL):
+        self.ttl = ttl
+        self._entry: Optional[Tuple[datetime, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, now: datetime) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._entry is not None and timedelta(0) <= now - self._entry[0] < self.ttl:
+                self.hits += 1
+                return self._entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, now: datetime, payload: Dict[str, Any]):
+        with self._lock:
+            self._entry = (now, payload)
+
+    def clear(self):
+        with self._lock:
+            self._entry = None
+
+
+dashboard_cache = DashboardCache()
+
+
+def dashboard_bundle(db: Session, now: Optional[datetime] = None,
+                     cache: DashboardCache = dashboard_cache) -> Dict[str, Any]:
+    """
+    The all-time stats, ticker, revenue breakdown and goals payloads in one
+    response, built from a single dashboard_counts pass.
+    """
+    now = now or datetime.utcnow()
+    payload = cache.get(now)
+    if payload is not None:
+        return payload
+
+    counts = dashboard_counts(db, now)
+    payload = {
+        "stats": {
+            "total_users": counts["total_users"],
+            "premium_users": counts["premium_users"],
+            "total_transactions": counts["total_transactions"],
+            "total_revenue": counts["total_revenue"],
+            "active_subscriptions": counts["active_subscriptions"]
+        },
+        "counts": counts,
+        "quick_stats": quick_stats_items(counts),
+        "revenue_breakdown": revenue_breakdown(counts["premium_users"]),
+        "goals": business_goals(counts["total_users"], counts["premium_users"]),
+        "generated_at": now.isoformat() + "Z"
+    }
+    cache.put(now, payload)
+    return payload
@@ -0,0 +1,253 @@
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..sql_models import DailyStats
+from .rollups import UNDATED
+
+SEASON_LENGTH = 7  # weekly pattern in daily data
+FIT_WINDOW_DAYS = 365
+FORECAST_DAYS = 30
+INTERVAL_Z = 1.96  # 95% prediction interval
+
+# Series forecast from the daily_stats buckets: name -> column
+SERIES = {
+    "revenue": "expense_volume",
+    "signups": "signups",
+    "transactions": "transaction_count",
+}
+
+# Smoothing parameter grid; beta and gamma are fractions of their upper bounds
+# (beta < alpha, gamma < 1 - alpha) so every combination is admissible
+ALPHAS = np.linspace(0.05, 0.95, 10)
+BETA_FRACTIONS = np.array([0.0, 0.02, 0.05, 0.1, 0.3])
+GAMMA_FRACTIONS = np.array([0.0, 0.05, 0.1, 0.3, 0.6])
+
+
+class HoltWinters:
+    """
+    Additive exponential smoothing with trend and weekly seasonality
+    (ETS(A,A,A) in error-correction form), or trend only for series shorter
+    than two seasons. Parameters are picked by minimizing the one-step-ahead
+    squared error over a grid, with all grid points run through the series
+    together as NumPy vectors.
+    """
+
+    def __init__(self, season_length: int = SEASON_LENGTH):
+        self.season_length = season_length
+        self.alpha = self.beta = self.gamma = 0.0
+        self.level = self.trend = 0.0
+        self.season = np.zeros(0)
+        self.sigma = 0.0
+        self.n_observations = 0
+
+    def fit(self, y: np.ndarray) -> "HoltWinters":
+        y = np.asarray(y, dtype=np.float64)
+        n = len(y)
+        self.n_observations = n
+        if n < 3:
+            # Too short to estimate a trend: flat forecast around the mean
+            self.level = float(y.mean()) if n else 0.0
+            self.sigma = float(y.std(ddof=1)) if n > 1 else 0.0
+            self.season = np.zeros(0)
+            return self
+
+        m = self.season_length if n >= 2 * self.season_length else 0
+        alpha, beta_fraction, gamma_fraction = np.meshgrid(
+            ALPHAS, BETA_FRACTIONS, GAMMA_FRACTIONS if m else np.zeros(1), indexing="ij"
+        )
+        alpha = alpha.ravel()
+        beta = alpha * beta_fraction.ravel()
+        gamma = (1.0 - alpha) * gamma_fraction.ravel()
+
+        # Initial state from the first seasons (or the first two points without a season)
+        if m:
+            first, second = y[:m].mean(), y[m:2 * m].mean()
+            level = np.full(alpha.shape, first)
+            trend = np.full(alpha.shape, (second - first) / m)
+            season = np.tile(y[:m] - first, (len(alpha), 1))
+        else:
+            level = np.full(alpha.shape, y[0])
+            trend = np.full(alpha.shape, y[1] - y[0])
+            season = np.zeros((len(alpha), 1))
+
+        sse = np.zeros(alpha.shape)
+        for t in range(n):
+            slot = t % m if m else 0
+            error = y[t] - (level + trend + season[:, slot])
+            sse += error * error
+            level = level + trend + alpha * error
+            trend = trend + beta * error
+            if m:
+                season[:, slot] += gamma * error
+
+        best = int(np.argmin(sse))
+        self.alpha, self.beta, self.gamma = float(alpha[best]), float(beta[best]), float(gamma[best])
+        self.level, self.trend = float(level[best]), float(trend[best])
+        # Rotate so season[0] is the slot of the first forecast day
+        self.season = np.roll(season[best], -(n % m)) if m else np.zeros(0)
+        self.sigma = float(np.sqrt(sse[best] / max(n - 3, 1)))
+        return self
+
+    def forecast(self, horizon: int, z: float = INTERVAL_Z) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (mean, lower, upper) for the next `horizon` days. The interval widens
+        with the horizon as in the ETS(A,A,A) forecast variance.
+        """
+        steps = np.arange(1, horizon + 1)
+        mean = self.level + steps * self.trend
+        m = len(self.season)
+        if m:
+            mean = mean + self.season[(steps - 1) % m]
+
+        # var(h) = sigma^2 * (1 + sum_{j<h} (alpha + beta*j + gamma*[j % m == 0])^2)
+        j = np.arange(1, horizon)
+        c = self.alpha + self.beta * j + (self.gamma * (j % m == 0) if m else 0.0)
+        variance = np.concatenate(([0.0], np.cumsum(c * c))) + 1.0
+        width = z * self.sigma * np.sqrt(variance)
+        return mean, mean - width, mean + width
+
+
+def load_daily_series(db: Session, until: date, days: int = FIT_WINDOW_DAYS) -> Tuple[date, Dict[str, np.ndarray]]:
+    """
+    Zero-filled daily values of every forecast series from daily_stats, for
+    at most `days` days ending at `until`. Returns (first_day, series); the
+    series start at the first day with data.
+    """
+    start = until - timedelta(days=days - 1)
+    rows = db.query(DailyStats.day, *[getattr(DailyStats, column) for column in SERIES.values()]).filter(
+        DailyStats.day != UNDATED,
+        DailyStats.day >= start.isoformat(),
+        DailyStats.day <= until.isoformat()
+    ).order_by(DailyStats.day).all()
+    if not rows:
+        return until + timedelta(days=1), {name: np.zeros(0) for name in SERIES}
+
+    first_day = date.fromisoformat(rows[0][0])
+    positions = np.array([(date.fromisoformat(row[0]) - first_day).days for row in rows])
+    length = (until - first_day).days + 1
+    series = {}
+    for i, name in enumerate(SERIES, start=1):
+        values = np.zeros(length)
+        values[positions] = [row[i] or 0 for row in rows]
+        series[name] = values
+    return first_day, series
+
+
+class ForecastCache:
+    """
+    Fitted models per series, keyed by the last complete day they were fit on,
+    so they are refit once a day rather than on every request.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[date, HoltWinters, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.fits = 0
+
+    def get(self, through: date) -> Optional[Dict[str, Tuple[HoltWinters, np.ndarray]]]:
+        with self._lock:
+            if all(name in self._entries and self._entries[name][0] == through for name in SERIES):
+                return {name: self._entries[name][1:] for name in SERIES}
+            return None
+
+    def put(self, through: date, models: Dict[str, Tuple[HoltWinters, np.ndarray]]):
+        with self._lock:
+            for name, (model, history) in models.items():
+                self._entries[name] = (through, model, history)
+            self.fits += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+forecast_cache = ForecastCache()
+
+
+def fitted_models(db: Session, now: Optional[datetime] = None,
+                  cache: ForecastCache = forecast_cache) -> Tuple[date, Dict[str, Tuple[HoltWinters, np.ndarray]]]:
+    """
+    (last complete day, {series: (model, history)}), fitting only when a new
+    day of data has closed since the last fit.
+    """
+    through = (now or datetime.utcnow()).date() - timedelta(days=1)
+    models = cache.get(through)
+    if models is None:
+        _, series = load_daily_series(db, through)
+        models = {name: (HoltWinters().fit(values), values) for name, values in series.items()}
+        cache.put(through, models)
+    return through, models
+
+
+def _points(through: date, mean: np.ndarray, lower: np.ndarray, upper: np.ndarray, digits: int) -> list:
+    # Revenue, signups and transactions cannot go negative
+    return [
+        {
+            "day": i + 1,
+            "date": (through + timedelta(days=i + 1)).isoformat(),
+            "predicted": round(max(float(mean[i]), 0.0), digits),
+            "lower_bound": round(max(float(lower[i]), 0.0), digits),
+            "upper_bound": round(max(float(upper[i]), 0.0), digits)
+        }
+        for i in range(len(mean))
+    ]
+
+
+def _change_percent(forecast: np.ndarray, history: np.ndarray) -> Optional[float]:
+    recent = history[-len(forecast):].sum()
+    if recent <= 0:
+        return None
+    return round(100.0 * (np.clip(forecast, 0, None).sum() - recent) / recent, 1)
+
+
+def analytics_forecast(db: Session, days: int = FORECAST_DAYS, now: Optional[datetime] = None,
+                       cache: ForecastCache = forecast_cache) -> Dict[str, Any]:
+    """
+    Forecasts of daily revenue (expense volume, as on the dashboard), signups
+    and transactions for the next `days` days with 95% prediction intervals.
+    """
+    through, models = fitted_models(db, now, cache)
+    forecasts = {name: model.forecast(days) for name, (model, _) in models.items()}
+
+    insights = []
+    revenue_change = _change_percent(forecasts["revenue"][0], models["revenue"][1])
+    if revenue_change is not None:
+        insights.append({
+            "type": "positive" if revenue_change >= 0 else "warning",
+            "message": f"Revenue over the next {days} days is forecast {'up' if revenue_change >= 0 else 'down'} "
+                       f"{abs(revenue_change)}% on the last {days} days"
+        })
+    expected_signups = float(np.clip(forecasts["signups"][0], 0, None).sum())
+    insights.append({
+        "type": "info",
+        "message": f"About {int(round(expected_signups))} new users expected in the next {days} days"
+    })
+    transaction_change = _change_percent(forecasts["transactions"][0], models["transactions"][1])
+    if transaction_change is not None:
+        insights.append({
+            "type": "positive" if transaction_change >= 0 else "warning",
+            "message": f"Transaction volume forecast {'up' if transaction_change >= 0 else 'down'} "
+                       f"{abs(transaction_change)}% over the next {days} days"
+        })
+
+    return {
+        "revenue_forecast": _points(through, *forecasts["revenue"], 2),
+        "user_growth": _points(through, *forecasts["signups"], 1),
+        "transaction_forecast": _points(through, *forecasts["transactions"], 1),
+        "insights": insights,
+        "models": {
+            name: {
+                "alpha": round(model.alpha, 3),
+                "beta": round(model.beta, 3),
+                "gamma": round(model.gamma, 3),
+                "seasonal": len(model.season) > 0,
+                "observations": model.n_observations,
+                "fitted_through": through.isoformat()
+            }
+            for name, (model, _) in models.items()
+        }
+    }
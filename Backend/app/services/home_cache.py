@@ -0,0 +1,155 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..sql_models import Transaction, Subscription, Category, User
+
+HOME_CACHE_SIZE = 10000
+# Invalidation only reaches this process's cache; entries expire after this
+# long so writes made by CLI scripts and other workers show up too
+HOME_CACHE_TTL = timedelta(seconds=30)
+DIRTY_USERS_KEY = "home_cache_dirty_users"
+CLEAR_ALL = "all"
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class HomeCache:
+    """
+    LRU cache of serialized /mobile/home payloads per user. A miss registers a
+    pending token that invalidation discards, so a payload computed while a
+    write committed is never stored and cannot leave stale data behind.
+    Commits in this process invalidate at once; writes from elsewhere are
+    picked up when the entry's TTL runs out. The ETag is a hash of the body,
+    so a client revalidating after that still gets a 304 if nothing changed.
+    """
+
+    def __init__(self, max_size: int = HOME_CACHE_SIZE, ttl: timedelta = HOME_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # user_id -> (scope, body, etag, stored_at)
+        self._pending: Dict[int, object] = {}  # user_id -> token of the miss being computed
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def begin(self, user_id: int) -> object:
+        """Call before computing a payload after a miss; pass the token to `put`."""
+        token = object()
+        with self._lock:
+            self._pending[user_id] = token
+        return token
+
+    def get(self, user_id: int, scope: str, now: Optional[datetime] = None) -> Optional[tuple]:
+        """
+        Returns (body, etag) when a payload for this scope (the current month)
+        is cached and younger than the TTL.
+        """
+        now = now or datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != scope or not timedelta(0) <= now - entry[3] < self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, user_id: int, scope: str, body: bytes, token: object, now: Optional[datetime] = None) -> str:
+        now = now or datetime.utcnow()
+        etag = make_etag(body)
+        with self._lock:
+            if self._pending.get(user_id) is not token:
+                return etag  # invalidated while it was being computed
+            del self._pending[user_id]
+            self._entries[user_id] = (scope, body, etag, now)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return etag
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, user_ids: Iterable[int]):
+        with self._lock:
+            for user_id in user_ids:
+                self._pending.pop(user_id, None)
+                if self._entries.pop(user_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl.total_seconds(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+home_cache = HomeCache()
+
+
+def mark_users_dirty(db: Session, user_ids: Iterable[Any]):
+    """
+    Schedules the users' home payloads for invalidation when `db` commits.
+    Core inserts must call this since they bypass the flush hook.
+    """
+    db.info.setdefault(DIRTY_USERS_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_home_changes(session: Session, flush_context, instances):
+    dirty = set()
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, (Transaction, Subscription)):
+            dirty.add(instance.user_id)
+            dirty.update(inspect(instance).attrs.user_id.history.deleted)  # moved from another user
+        elif isinstance(instance, User) and instance in session.deleted:
+            dirty.add(instance.id)
+        elif isinstance(instance, Category) and instance not in session.new:
+            dirty.add(CLEAR_ALL)  # names and colors are shared by every user's payload
+    if dirty:
+        mark_users_dirty(session, dirty)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    dirty = session.info.pop(DIRTY_USERS_KEY, None)
+    if not dirty:
+        return
+    if CLEAR_ALL in dirty:
+        home_cache.clear()
+    else:
+        home_cache.invalidate(user_id for user_id in dirty if user_id is not None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop(DIRTY_USERS_KEY, None)
@@ -0,0 +1,298 @@
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from ..sql_models import SMSIngestJob
+from .sms_ingest import store_parsed_messages
+from .leak_detector import leak_state
+from .activity_log import log_sms_ingest
+from .merchant_suggest import merchant_suggester
+
+# Worker pool defaults
+QUEUE_WORKERS = 2
+QUEUE_BATCH_SIZE = 200
+QUEUE_POLL_INTERVAL = 1.0  # seconds between polls when the queue is empty
+MAX_ATTEMPTS = 3
+# A claimed batch belongs to its worker for this long; after that it is
+# presumed abandoned (the worker died) and goes back in the queue. Far above
+# the time a batch takes, so a live worker's batch is never claimed twice.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def enqueue_sms(db: Session, user_id: int, sms_text: str, sender: Optional[str] = None) -> SMSIngestJob:
+    """
+    Appends a raw SMS to the durable ingest queue and commits it.
+    """
+    job = SMSIngestJob(
+        ticket_id=uuid.uuid4().hex,
+        user_id=user_id,
+        sender=sender,
+        sms_text=sms_text,
+        status="queued",
+        attempts=0
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_batch(db: Session, size: int, now: Optional[datetime] = None) -> List[SMSIngestJob]:
+    """
+    Atomically moves up to `size` queued jobs to 'processing' under a fresh claim
+    token, starting their lease, and returns them. SQLite serializes the UPDATE,
+    so concurrent workers never claim the same row.
+    """
+    now = now or datetime.utcnow()
+    token = uuid.uuid4().hex
+    queued_ids = db.query(SMSIngestJob.id).filter(
+        SMSIngestJob.status == "queued"
+    ).order_by(SMSIngestJob.id).limit(size).scalar_subquery()
+
+    claimed = db.query(SMSIngestJob).filter(
+        SMSIngestJob.id.in_(queued_ids),
+        SMSIngestJob.status == "queued"
+    ).update({
+        SMSIngestJob.status: "processing",
+        SMSIngestJob.claim_token: token,
+        SMSIngestJob.claimed_at: now,
+        SMSIngestJob.attempts: SMSIngestJob.attempts + 1
+    }, synchronize_session=False)
+    db.commit()
+
+    if not claimed:
+        return []
+    return db.query(SMSIngestJob).filter(SMSIngestJob.claim_token == token).order_by(SMSIngestJob.id).all()
+
+
+def process_batch(db: Session, jobs: List[SMSIngestJob], parser) -> int:
+    """
+    Parses a claimed batch and writes every resulting row plus the job statuses
+    in a single commit (group commit). Returns the number of jobs finished.
+    On a write failure the session is rolled back and the error raised; the
+    caller releases the batch.
+    """
+    now = datetime.utcnow()
+    items = []
+    for job in jobs:
+        try:
+            parsed_data = parser.parse(job.sms_text, sender=job.sender)
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            job.processed_at = now
+            continue
+
+        job.result = json.dumps(parsed_data, default=str)
+        job.processed_at = now
+        if parsed_data['amount'] == 0:
+            job.status = "ignored"
+            job.error = "Could not extract valid amount"
+        else:
+            job.status = "done"
+            items.append((job.user_id, parsed_data))
+
+    try:
+        store_parsed_messages(db, items)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    leak_state.record_many(items)
+    merchant_suggester.record_many(items)
+    log_sms_ingest(items, "sms/queue")
+    return len(jobs)
+
+
+def release_batch(db: Session, jobs: List[SMSIngestJob], error: str):
+    """
+    Puts the jobs of a failed batch back in the queue, or marks them failed once
+    they have used up their attempts, recording the error on each. Only jobs
+    still held under the batch's claim are touched.
+    """
+    tokens = {job.claim_token for job in jobs}
+    for status, attempts_left in (("failed", False), ("queued", True)):
+        db.query(SMSIngestJob).filter(
+            SMSIngestJob.id.in_([job.id for job in jobs]),
+            SMSIngestJob.claim_token.in_(tokens),
+            SMSIngestJob.status == "processing",
+            (SMSIngestJob.attempts < MAX_ATTEMPTS) if attempts_left else (SMSIngestJob.attempts >= MAX_ATTEMPTS)
+        ).update({
+            SMSIngestJob.status: status,
+            SMSIngestJob.claim_token: None,
+            SMSIngestJob.claimed_at: None,
+            SMSIngestJob.error: error
+        }, synchronize_session=False)
+    db.commit()
+
+
+def recover_stale_jobs(db: Session, now: Optional[datetime] = None, lease: timedelta = CLAIM_LEASE) -> int:
+    """
+    Requeues jobs left in 'processing' past their lease by a worker that died
+    (e.g. a restart), or marks them failed once they have used up their
+    attempts. Batches still within their lease are left to their worker, so
+    this is safe to run from every process.
+    """
+    now = now or datetime.utcnow()
+    recovered = 0
+    for status, attempts_left in (("failed", False), ("queued", True)):
+        recovered += db.query(SMSIngestJob).filter(
+            SMSIngestJob.status == "processing",
+            or_(SMSIngestJob.claimed_at.is_(None), SMSIngestJob.claimed_at < now - lease),
+            (SMSIngestJob.attempts < MAX_ATTEMPTS) if attempts_left else (SMSIngestJob.attempts >= MAX_ATTEMPTS)
+        ).update({
+            SMSIngestJob.status: status,
+            SMSIngestJob.claim_token: None,
+            SMSIngestJob.claimed_at: None,
+            SMSIngestJob.error: "Claim lease expired"
+        }, synchronize_session=False)
+    db.commit()
+    return recovered
+
+
+def queue_depth(db: Session) -> Dict[str, Any]:
+    """
+    Number of jobs per status and the age of the oldest queued job.
+    """
+    counts = dict(db.query(SMSIngestJob.status, func.count(SMSIngestJob.id)).group_by(SMSIngestJob.status).all())
+    oldest = db.query(func.min(SMSIngestJob.created_at)).filter(SMSIngestJob.status == "queued").scalar()
+    return {
+        "queued": counts.get("queued", 0),
+        "processing": counts.get("processing", 0),
+        "done": counts.get("done", 0),
+        "ignored": counts.get("ignored", 0),
+        "failed": counts.get("failed", 0),
+        "oldest_queued_age_seconds": round((datetime.utcnow() - oldest).total_seconds(), 3) if oldest else 0.0
+    }
+
+
+class IngestWorkerPool:
+    """
+    Background threads draining the SMS ingest queue in batches.
+    """
+
+    def __init__(self, session_factory, parser, workers: int = QUEUE_WORKERS,
+                 batch_size: int = QUEUE_BATCH_SIZE, poll_interval: float = QUEUE_POLL_INTERVAL):
+        self.session_factory = session_factory
+        self.parser = parser
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+
+        self.batches_processed = 0
+        self.jobs_processed = 0
+        self.batch_errors = 0
+        self.last_error: Optional[str] = None
+        self.last_batch_seconds = 0.0
+        self._next_recovery = 0.0
+
+    def start(self):
+        if self._threads:
+            return
+        self.recover()
+
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"sms-ingest-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def recover(self) -> int:
+        """
+        Requeues batches whose lease expired; run at start and while idle.
+        """
+        self._next_recovery = time.monotonic() + CLAIM_LEASE.total_seconds()
+        db = self.session_factory()
+        try:
+            return recover_stale_jobs(db)
+        except Exception as e:
+            print(f"SMS ingest recovery failed: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def notify(self):
+        """Wakes the workers up right away instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    def drain_once(self) -> int:
+        """
+        Claims and processes one batch. Returns the number of jobs handled.
+        """
+        db = self.session_factory()
+        jobs = []
+        try:
+            jobs = claim_batch(db, self.batch_size)
+            if not jobs:
+                return 0
+            started = time.perf_counter()
+            processed = process_batch(db, jobs, self.parser)
+            with self._lock:
+                self.batches_processed += 1
+                self.jobs_processed += processed
+                self.last_batch_seconds = round(time.perf_counter() - started, 4)
+            return processed
+        except Exception as e:
+            self._fail_batch(db, jobs, e)
+            return 0
+        finally:
+            db.close()
+
+    def _fail_batch(self, db: Session, jobs: List[SMSIngestJob], error: Exception):
+        """
+        Records a batch failure on its jobs (requeued or failed, with the
+        error) and in the pool stats. If even that write fails, the jobs go
+        back in the queue when their lease expires.
+        """
+        with self._lock:
+            self.batch_errors += 1
+            self.last_error = str(error)
+        print(f"SMS ingest batch failed: {error}")
+        if not jobs:
+            return
+        try:
+            db.rollback()
+            release_batch(db, jobs, str(error))
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                self.last_error = f"{error}; release failed: {e}"
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.drain_once():
+                continue
+            if time.monotonic() >= self._next_recovery:
+                self.recover()
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": sum(1 for thread in self._threads if thread.is_alive()),
+                "batch_size": self.batch_size,
+                "batches_processed": self.batches_processed,
+                "jobs_processed": self.jobs_processed,
+                "batch_errors": self.batch_errors,
+                "last_error": self.last_error,
+                "last_batch_seconds": self.last_batch_seconds
+            }
@@ -0,0 +1,77 @@
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+
+class KeywordIndex:
+    """
+    Aho-Corasick automaton over a keyword table. `scan` reports every keyword
+    occurring in a text (as a substring) with a single linear pass over it,
+    regardless of how many keywords are indexed.
+
+    Failure links are folded into the transition table once at build time, so
+    scanning is a single dict lookup per character.
+    """
+
+    def __init__(self, keywords: Dict[str, Any]):
+        """
+        `keywords` maps each (lowercase) keyword to the payload returned when it matches.
+        """
+        self.payloads = dict(keywords)
+
+        # Trie transitions, failure links and per-state outputs (keywords ending here)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for keyword in self.payloads:
+            if keyword:
+                self._insert(keyword)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def _insert(self, keyword: str):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append(keyword)
+
+    def _build_failure_links(self):
+        # Breadth-first so a state's failure target is always complete before it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fail_transitions = self._goto[self._fail[state]] if state else {}
+            for char, next_state in list(self._goto[state].items()):
+                queue.append(next_state)
+                self._fail[next_state] = fail_transitions.get(char, 0) if state else 0
+                # Inherit the outputs of the longest proper suffix state
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+            # Fold the failure state's transitions in (turning the trie into a DFA)
+            for char, target in fail_transitions.items():
+                self._goto[state].setdefault(char, target)
+
+    def scan(self, text: str) -> List[Tuple[int, str, Any]]:
+        """
+        Returns (start, keyword, payload) for every keyword occurrence in `text`,
+        in the order the occurrences end.
+        """
+        goto, output, payloads = self._goto, self._output, self.payloads
+        root = goto[0]
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            state = goto[state].get(char) or root.get(char, 0)
+            if output[state]:
+                matches.extend(
+                    (position - len(keyword) + 1, keyword, payloads[keyword]) for keyword in output[state]
+                )
+        return matches
@@ -0,0 +1,207 @@
+import heapq
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, case
+from sqlalchemy.orm import Session
+
+from ..sql_models import User, UserStats, UserDailyActivity
+from .rollups import USER_DAY_DELTAS_KEY
+
+LEADERBOARD_SIZE = 10
+ROLLING_WINDOWS = (7, 30)  # days, including today
+METRICS = ("transactions", "spend")
+# Rebuild from user_daily_activity at least this often, to pick up writes
+# made by other processes
+LEADERBOARD_TTL = timedelta(minutes=10)
+
+
+class RollingLeaderboard:
+    """
+    Top users by transaction count and by spend over the rolling windows,
+    kept in memory. Per-user window totals are loaded from user_daily_activity
+    once a day (or after LEADERBOARD_TTL); committed writes are applied as
+    deltas in between. Each board keeps its top LEADERBOARD_SIZE entries, so
+    a read is O(K). Only a drop in a ranked user's score can let an unranked
+    user overtake them; that board is then re-ranked from the totals on its
+    next read. user_daily_activity (and user_stats, for the all-time boards)
+    are seeded from the source tables at startup, before the first load.
+    """
+
+    def __init__(self, size: int = LEADERBOARD_SIZE, windows: Tuple[int, ...] = ROLLING_WINDOWS):
+        self.size = size
+        self.windows = windows
+        self._lock = threading.Lock()
+        self._today: Optional[date] = None
+        self._loaded_at: Optional[datetime] = None
+        self._totals: Dict[int, Dict[int, List]] = {}  # window -> user_id -> [transactions, spend]
+        self._top: Dict[Tuple[int, str], Optional[List[Tuple]]] = {}  # (window, metric) -> [(score, user_id)]
+
+    def _window_start(self, window: int) -> str:
+        return (self._today - timedelta(days=window - 1)).isoformat()
+
+    def rebuild(self, db: Session, now: Optional[datetime] = None):
+        """
+        Reloads every window's per-user totals from user_daily_activity.
+        """
+        now = now or datetime.utcnow()
+        today = now.date()
+        starts = {window: (today - timedelta(days=window - 1)).isoformat() for window in self.windows}
+        columns = []
+        for window in self.windows:
+            in_window = UserDailyActivity.day >= starts[window]
+            columns.append(func.sum(case((in_window, UserDailyActivity.transaction_count), else_=0)))
+            columns.append(func.sum(case((in_window, UserDailyActivity.total_spent), else_=0.0)))
+        rows = db.query(UserDailyActivity.user_id, *columns).filter(
+            UserDailyActivity.day >= min(starts.values())
+        ).group_by(UserDailyActivity.user_id).all()
+
+        totals = {window: {} for window in self.windows}
+        for row in rows:
+            for i, window in enumerate(self.windows):
+                count, spent = row[1 + 2 * i] or 0, row[2 + 2 * i] or 0.0
+                if count or spent:
+                    totals[window][row[0]] = [count, spent]
+
+        with self._lock:
+            self._today = today
+            self._loaded_at = now
+            self._totals = totals
+            self._top = {(window, metric): None for window in self.windows for metric in METRICS}
+
+    def _stale(self, now: datetime) -> bool:
+        return self._today != now.date() or now - self._loaded_at >= LEADERBOARD_TTL
+
+    def apply(self, deltas: List[Dict[str, Any]]):
+        """
+        Applies committed user_daily_activity deltas (user_id, day,
+        transaction_count, total_spent) to the windows they fall in.
+        """
+        with self._lock:
+            if self._today is None:
+                return
+            for window in self.windows:
+                start = self._window_start(window)
+                totals = self._totals[window]
+                changed = defaultdict(lambda: [0, 0.0])
+                for delta in deltas:
+                    if delta["day"] >= start:
+                        changed[delta["user_id"]][0] += delta["transaction_count"]
+                        changed[delta["user_id"]][1] += delta["total_spent"]
+                for user_id, (count, spent) in changed.items():
+                    entry = totals.setdefault(user_id, [0, 0.0])
+                    entry[0] += count
+                    entry[1] += spent
+                    for metric, index in zip(METRICS, (0, 1)):
+                        self._update_top(window, metric, user_id, entry[index])
+
+    def _update_top(self, window: int, metric: str, user_id: int, score):
+        top = self._top[(window, metric)]
+        if top is None:
+            return  # re-ranked on next read anyway
+        position = next((i for i, (_, ranked) in enumerate(top) if ranked == user_id), None)
+        if position is not None:
+            previous = top[position][0]
+            top[position] = (score, user_id)
+            if score < previous and len(top) == self.size:
+                self._top[(window, metric)] = None  # an unranked user may now be ahead
+                return
+        elif len(top) < self.size or (score, user_id) > top[-1]:
+            top.append((score, user_id))
+        else:
+            return
+        top.sort(reverse=True)
+        del top[self.size:]
+
+    def top(self, db: Session, window: int, metric: str, limit: int = LEADERBOARD_SIZE,
+            now: Optional[datetime] = None) -> List[Tuple]:
+        """
+        [(score, user_id)] best first, at most `limit` (<= LEADERBOARD_SIZE).
+        """
+        now = now or datetime.utcnow()
+        if self._today is None or self._stale(now):
+            self.rebuild(db, now)
+        with self._lock:
+            key = (window, metric)
+            if self._top[key] is None:
+                index = METRICS.index(metric)
+                self._top[key] = heapq.nlargest(
+                    self.size,
+                    ((entry[index], user_id) for user_id, entry in self._totals[window].items() if entry[index] > 0)
+                )
+            return [item for item in self._top[key] if item[0] > 0][:limit]
+
+    def clear(self):
+        with self._lock:
+            self._today = None
+            self._totals = {}
+            self._top = {}
+
+
+leaderboard = RollingLeaderboard()
+
+
+def all_time_top(db: Session, metric: str, limit: int = LEADERBOARD_SIZE) -> List[Tuple]:
+    """
+    [(score, user_id)] from user_stats, read through the index on the metric.
+    """
+    column = UserStats.transaction_count if metric == "transactions" else UserStats.total_spent
+    rows = db.query(column, UserStats.user_id).filter(column > 0).order_by(
+        column.desc(), UserStats.user_id.desc()
+    ).limit(limit).all()
+    return [(row[0], row[1]) for row in rows]
+
+
+def leaderboards(db: Session, limit: int = 5, now: Optional[datetime] = None) -> Dict[str, Dict[str, List]]:
+    """
+    {"7d"|"30d"|"all_time": {"transactions"|"spend": [entries]}}, each entry
+    the user's public fields with rank and value.
+    """
+    limit = max(1, min(limit, LEADERBOARD_SIZE))
+    boards = {}
+    for window in leaderboard.windows:
+        boards[f"{window}d"] = {
+            metric: leaderboard.top(db, window, metric, limit, now) for metric in METRICS
+        }
+    boards["all_time"] = {metric: all_time_top(db, metric, limit) for metric in METRICS}
+
+    user_ids = {user_id for board in boards.values() for entries in board.values() for _, user_id in entries}
+    users = {
+        row.id: row for row in db.query(
+            User.id, User.full_name, User.email, User.profile_image, User.is_premium_member
+        ).filter(User.id.in_(user_ids)).all()
+    } if user_ids else {}
+
+    def entry(rank: int, score, user_id: int) -> Dict[str, Any]:
+        user = users.get(user_id)
+        return {
+            "rank": rank,
+            "id": user_id,
+            "full_name": user.full_name if user else None,
+            "email": user.email if user else None,
+            "profile_image": user.profile_image if user else None,
+            "is_premium_member": bool(user.is_premium_member) if user else False,
+            "value": round(score, 2)
+        }
+
+    return {
+        name: {
+            metric: [entry(rank, score, user_id) for rank, (score, user_id) in enumerate(entries, start=1)]
+            for metric, entries in board.items()
+        }
+        for name, board in boards.items()
+    }
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session):
+    deltas = session.info.pop(USER_DAY_DELTAS_KEY, None)
+    if deltas:
+        leaderboard.apply(deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop(USER_DAY_DELTAS_KEY, None)
@@ -0,0 +1,191 @@
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..sql_models import Transaction, Category, Subscription
+
+# Rule 1: frequent small food purchases
+FOOD_CATEGORIES = {"Food", "Food & Dining"}
+SMALL_FOOD_AMOUNT = 500
+SMALL_FOOD_WINDOW = timedelta(days=30)
+SMALL_FOOD_LIMIT = 5  # more than this many in the window is a leak
+
+# Rule 2: subscription price hikes
+SUBSCRIPTION_CATEGORIES = {"Subscriptions"}
+
+LEAK_USERS_CACHED = 10000  # users with loaded leak state, least recently used evicted
+# Reload a user's state at least this often, to pick up edits, deletes and other processes' writes
+LEAK_STATE_TTL = timedelta(minutes=15)
+
+
+def _is_small_food(transaction: Dict[str, Any]) -> bool:
+    return transaction.get("category") in FOOD_CATEGORIES and transaction["amount"] < SMALL_FOOD_AMOUNT
+
+
+def _is_subscription(transaction: Dict[str, Any]) -> bool:
+    return bool(transaction.get("is_subscription")) or transaction.get("category") in SUBSCRIPTION_CATEGORIES
+
+
+class UserLeakState:
+    """
+    Rolling per-user aggregates the leak rules need: the dates of small food
+    purchases inside the window and the last amount paid per subscription merchant.
+    """
+    __slots__ = ("small_food_dates", "subscription_amounts")
+
+    def __init__(self):
+        self.small_food_dates: List[datetime] = []  # kept sorted
+        self.subscription_amounts: Dict[str, tuple] = {}  # merchant -> (date, amount)
+
+    def add(self, transaction: Dict[str, Any]):
+        date = transaction.get("date") or datetime.now()
+        if _is_small_food(transaction):
+            insort(self.small_food_dates, date)
+            # Drop purchases that have left the window of the newest one
+            cutoff = bisect_left(self.small_food_dates, self.small_food_dates[-1] - SMALL_FOOD_WINDOW)
+            if cutoff:
+                del self.small_food_dates[:cutoff]
+
+        merchant = transaction.get("merchant")
+        if merchant and _is_subscription(transaction):
+            previous = self.subscription_amounts.get(merchant)
+            if previous is None or previous[0] <= date:
+                self.subscription_amounts[merchant] = (date, transaction["amount"])
+
+    def small_food_count(self, as_of: datetime) -> int:
+        start = bisect_left(self.small_food_dates, as_of - SMALL_FOOD_WINDOW)
+        return len(self.small_food_dates) - start
+
+
+class LeakStateStore:
+    """
+    In-memory rolling leak state per user, an LRU of at most `max_size`
+    users. A user's state is built from the transactions table on first
+    access and then kept current by `record` on every transaction write in
+    this process; it is rebuilt once it is older than `ttl`, or on `reset`.
+    """
+
+    def __init__(self, max_size: int = LEAK_USERS_CACHED, ttl: timedelta = LEAK_STATE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._users: "OrderedDict[int, tuple]" = OrderedDict()  # user_id -> (state, loaded_at)
+        self._lock = threading.Lock()
+
+    def _fresh(self, entry: Optional[tuple], now: datetime) -> bool:
+        return entry is not None and timedelta(0) <= now - entry[1] < self.ttl
+
+    def get(self, db: Session, user_id: int, now: Optional[datetime] = None) -> UserLeakState:
+        now = now or datetime.utcnow()
+        with self._lock:
+            entry = self._users.get(user_id)
+            if self._fresh(entry, now):
+                self._users.move_to_end(user_id)
+                return entry[0]
+        state = self.load_user(db, user_id)
+        with self._lock:
+            entry = self._users.get(user_id)
+            if self._fresh(entry, now):
+                return entry[0]  # reloaded by another request meanwhile
+            self._users[user_id] = (state, now)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+        return state
+
+    def load_user(self, db: Session, user_id: int) -> UserLeakState:
+        """
+        Rebuilds one user's state from the transactions table.
+        """
+        state = UserLeakState()
+
+        food_rows = db.query(Transaction.date, Transaction.amount, Category.name).join(
+            Category, Transaction.category_id == Category.id
+        ).filter(
+            Transaction.user_id == user_id,
+            Category.name.in_(FOOD_CATEGORIES),
+            Transaction.amount < SMALL_FOOD_AMOUNT,
+            Transaction.date >= datetime.now() - SMALL_FOOD_WINDOW
+        ).all()
+        for row in food_rows:
+            state.add({"date": row.date, "amount": row.amount, "category": row.name})
+
+        subscription_names = db.query(Subscription.name).filter(Subscription.user_id == user_id).subquery()
+        subscription_rows = db.query(Transaction.date, Transaction.amount, Transaction.merchant_name).outerjoin(
+            Category, Transaction.category_id == Category.id
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.merchant_name.in_(subscription_names.select()) | Category.name.in_(SUBSCRIPTION_CATEGORIES)
+        ).all()
+        for row in subscription_rows:
+            state.add({"date": row.date, "amount": row.amount, "merchant": row.merchant_name, "is_subscription": True})
+
+        return state
+
+    def record(self, user_id: int, transaction: Dict[str, Any]):
+        """
+        Folds a newly written transaction into the user's state. Users whose state
+        is not loaded yet pick it up from the table on first access.
+        """
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None:
+                entry[0].add(transaction)
+
+    def record_many(self, items: List[tuple]):
+        """
+        `record` for a list of (user_id, transaction) pairs.
+        """
+        for user_id, transaction in items:
+            self.record(user_id, transaction)
+
+    def reset(self, user_id: Optional[int] = None):
+        """
+        Drops the state of one user (or everyone) so it is rebuilt from the table.
+        """
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+
+leak_state = LeakStateStore()
+
+
+class LeakDetector:
+    def __init__(self, state: LeakStateStore = leak_state):
+        self.state = state
+
+    def detect(self, transaction: Dict[str, Any], user_id: int, db: Session) -> Dict[str, Any]:
+        """
+        Checks a transaction (before it is recorded) against the user's rolling state.
+        """
+        is_leak = False
+        severity = None
+        reason = None
+        state = self.state.get(db, user_id)
+
+        # 1. Check for small recurring coffee/food
+        if _is_small_food(transaction):
+            if state.small_food_count(transaction.get("date") or datetime.now()) > SMALL_FOOD_LIMIT:
+                is_leak = True
+                severity = "medium"
+                reason = "Frequent small food purchases"
+
+        # 2. Check for subscription price hike
+        if _is_subscription(transaction):
+            previous = state.subscription_amounts.get(transaction.get("merchant"))
+            if previous and transaction["amount"] > previous[1]:
+                is_leak = True
+                severity = "high"
+                reason = f"Price increased from {previous[1]} to {transaction['amount']}"
+
+        return {
+            "is_leak": is_leak,
+            "leak_severity": severity,
+            "leak_reason": reason
+        }
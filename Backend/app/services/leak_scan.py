@@ -0,0 +1,182 @@
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..sql_models import TransactionLeak
+from .leak_detector import (
+    FOOD_CATEGORIES,
+    SMALL_FOOD_AMOUNT,
+    SMALL_FOOD_LIMIT,
+    SMALL_FOOD_WINDOW,
+    SUBSCRIPTION_CATEGORIES,
+)
+
+FETCH_CHUNK_SIZE = 200_000
+WRITE_CHUNK_SIZE = 50_000
+
+SEVERITY_NONE = 0
+SEVERITY_MEDIUM = 1
+SEVERITY_HIGH = 2
+
+
+def _in_list(prefix: str, values) -> tuple:
+    params = {f"{prefix}{i}": value for i, value in enumerate(sorted(values))}
+    return ", ".join(f":{name}" for name in params), params
+
+
+def load_transaction_columns(db: Session, chunk_size: int = FETCH_CHUNK_SIZE) -> Dict[str, np.ndarray]:
+    """
+    Loads every dated transaction joined with its category as one NumPy array per
+    column. Category and subscription matching is done by SQLite during the join;
+    a merchant counts as a subscription if the user has it in `subscriptions` or
+    has paid it under a subscription category, and merchant names are only
+    fetched for those rows.
+    """
+    food_list, food_params = _in_list("food", FOOD_CATEGORIES)
+    subscription_list, subscription_params = _in_list("subscription", SUBSCRIPTION_CATEGORIES)
+    sql = f"""
+        SELECT t.id,
+               t.user_id,
+               CAST(strftime('%s', t.date) AS INTEGER),
+               t.amount,
+               COALESCE(c.name IN ({food_list}), 0),
+               s.user_id IS NOT NULL,
+               CASE WHEN s.user_id IS NOT NULL THEN t.merchant_name END
+        FROM transactions t
+        LEFT JOIN categories c ON c.id = t.category_id
+        LEFT JOIN (
+            SELECT DISTINCT t2.user_id, t2.merchant_name AS name
+            FROM transactions t2 JOIN categories c2 ON c2.id = t2.category_id
+            WHERE c2.name IN ({subscription_list}) AND t2.merchant_name IS NOT NULL
+            UNION
+            SELECT user_id, name FROM subscriptions
+        ) s ON s.user_id = t.user_id AND s.name = t.merchant_name
+        WHERE t.date IS NOT NULL AND t.user_id IS NOT NULL
+    """
+    result = db.execute(text(sql), {**food_params, **subscription_params})
+
+    names = ("id", "user_id", "ts", "amount", "is_food", "is_subscription", "merchant")
+    dtypes = (np.int64, np.int64, np.int64, np.float64, np.bool_, np.bool_, object)
+    parts: List[List[np.ndarray]] = [[] for _ in names]
+    while True:
+        rows = result.fetchmany(chunk_size)
+        if not rows:
+            break
+        for part, column, dtype in zip(parts, zip(*rows), dtypes):
+            part.append(np.array(column, dtype=dtype))
+
+    return {
+        name: np.concatenate(part) if part else np.empty(0, dtype=dtype)
+        for name, part, dtype in zip(names, parts, dtypes)
+    }
+
+
+def evaluate_leak_rules(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Applies the LeakDetector rules to every transaction at once, with the same
+    semantics as checking each one against the history written before it.
+    Returns a severity code per row and the previous amount for price hikes.
+    """
+    user_id = columns["user_id"]
+    ts = columns["ts"]
+    amount = columns["amount"]
+    row_id = columns["id"]
+    size = len(row_id)
+
+    severity = np.zeros(size, dtype=np.int8)
+    previous_amount = np.full(size, np.nan)
+
+    # 1. Frequent small food purchases: count the user's earlier small food rows
+    # inside the window with one searchsorted over a (user, time) composite key
+    food_rows = np.flatnonzero(columns["is_food"] & (amount < SMALL_FOOD_AMOUNT))
+    if len(food_rows):
+        order = food_rows[np.lexsort((row_id[food_rows], ts[food_rows], user_id[food_rows]))]
+        window = int(SMALL_FOOD_WINDOW.total_seconds())
+        offset = ts[order] - ts[order].min()
+        span = int(offset.max()) + window + 1  # keeps every user's keys in a disjoint range
+        key = user_id[order] * span + offset
+        window_start = np.searchsorted(key, key - window, side="left")
+        earlier_in_window = np.arange(len(order)) - window_start
+        severity[order[earlier_in_window > SMALL_FOOD_LIMIT]] = SEVERITY_MEDIUM
+
+    # 2. Subscription price hikes: compare with the previous charge of the same
+    # user and merchant
+    subscription_rows = np.flatnonzero(columns["is_subscription"])
+    if len(subscription_rows) > 1:
+        _, merchant_code = np.unique(columns["merchant"][subscription_rows].astype(str), return_inverse=True)
+        order_in_subset = np.lexsort((row_id[subscription_rows], ts[subscription_rows],
+                                      merchant_code, user_id[subscription_rows]))
+        order = subscription_rows[order_in_subset]
+        merchant_code = merchant_code[order_in_subset]
+
+        same_group = (user_id[order][1:] == user_id[order][:-1]) & (merchant_code[1:] == merchant_code[:-1])
+        hiked = same_group & (amount[order][1:] > amount[order][:-1])
+        hiked_rows = order[1:][hiked]
+        severity[hiked_rows] = SEVERITY_HIGH
+        previous_amount[hiked_rows] = amount[order][:-1][hiked]
+
+    return {"severity": severity, "previous_amount": previous_amount}
+
+
+def write_leak_flags(db: Session, columns: Dict[str, np.ndarray], flags: Dict[str, np.ndarray],
+                     chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+    """
+    Replaces the contents of transaction_leaks with the flagged rows in bulk.
+    Does not commit.
+    """
+    flagged = np.flatnonzero(flags["severity"] != SEVERITY_NONE)
+    now = datetime.utcnow()
+
+    db.execute(TransactionLeak.__table__.delete())
+    for start in range(0, len(flagged), chunk_size):
+        rows = flagged[start:start + chunk_size]
+        records = []
+        for transaction_id, user_id, code, amount, previous in zip(
+            columns["id"][rows].tolist(),
+            columns["user_id"][rows].tolist(),
+            flags["severity"][rows].tolist(),
+            columns["amount"][rows].tolist(),
+            flags["previous_amount"][rows].tolist()
+        ):
+            if code == SEVERITY_HIGH:
+                severity, reason = "high", f"Price increased from {previous} to {amount}"
+            else:
+                severity, reason = "medium", "Frequent small food purchases"
+            records.append({
+                "transaction_id": transaction_id,
+                "user_id": user_id,
+                "severity": severity,
+                "reason": reason,
+                "detected_at": now
+            })
+        db.execute(TransactionLeak.__table__.insert(), records)
+    return len(flagged)
+
+
+def run_leak_scan(db: Session) -> Dict[str, Any]:
+    """
+    Full-history leak scan over all users. Commits the new flags and returns
+    counts and per-phase timings.
+    """
+    started = time.perf_counter()
+    columns = load_transaction_columns(db)
+    loaded = time.perf_counter()
+    flags = evaluate_leak_rules(columns)
+    evaluated = time.perf_counter()
+    flagged = write_leak_flags(db, columns, flags)
+    db.commit()
+    written = time.perf_counter()
+
+    return {
+        "transactions": len(columns["id"]),
+        "flagged": flagged,
+        "small_food": int(np.count_nonzero(flags["severity"] == SEVERITY_MEDIUM)),
+        "price_hikes": int(np.count_nonzero(flags["severity"] == SEVERITY_HIGH)),
+        "load_seconds": round(loaded - started, 3),
+        "evaluate_seconds": round(evaluated - loaded, 3),
+        "write_seconds": round(written - evaluated, 3)
+    }
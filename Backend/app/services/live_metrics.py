@@ -0,0 +1,139 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .dashboard import dashboard_counts, quick_stats_items
+
+METRICS_TICK_SECONDS = 2.0
+KEEPALIVE_SECONDS = 15.0
+# Messages queued per client before it is treated as slow and resynced with a snapshot
+SUBSCRIBER_QUEUE_SIZE = 32
+
+
+def metrics_snapshot(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Live dashboard metrics: the dashboard counters plus the ticker entries.
+    """
+    metrics = dashboard_counts(db, now)
+    metrics["quick_stats"] = quick_stats_items(metrics)
+    return metrics
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class MetricsBroadcaster:
+    """
+    One producer for every connected admin client. While anyone is
+    subscribed it computes a snapshot per tick (in a worker thread, with its
+    own session) and pushes only the keys that changed to each client's
+    queue, so database load does not grow with the number of open tabs. The
+    producer stops when the last client disconnects.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], interval: float = METRICS_TICK_SECONDS,
+                 queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.queue_size = queue_size
+
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot: Dict[str, Any] = {}
+        self._version = 0
+
+        self.ticks = 0
+        self.deltas = 0
+        self.resyncs = 0
+
+    def _compute(self) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            return metrics_snapshot(db)
+        finally:
+            db.close()
+
+    def _snapshot_message(self) -> str:
+        return format_sse("snapshot", {"version": self._version, "metrics": self._snapshot}, self._version)
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Registers a client. Its queue starts with the current snapshot, if
+        one has been computed; otherwise the first delta carries every key.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if self._snapshot:
+            queue.put_nowait(self._snapshot_message())
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _publish(self, message: str):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A client that fell behind gets the full state instead of the missed deltas
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot_message())
+                self.resyncs += 1
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                snapshot = await run_in_threadpool(self._compute)
+            except Exception as e:
+                print(f"Live metrics tick failed: {e}")
+                snapshot = None
+            self.ticks += 1
+
+            if snapshot is not None:
+                changes = {key: value for key, value in snapshot.items() if self._snapshot.get(key) != value}
+                if changes:
+                    self._snapshot = snapshot
+                    self._version += 1
+                    self.deltas += 1
+                    self._publish(format_sse("delta", {"version": self._version, "changes": changes}, self._version))
+            await asyncio.sleep(self.interval)
+
+    async def stream(self, is_disconnected: Callable):
+        """
+        SSE body for one client: the snapshot, then deltas as they happen,
+        with keep-alive comments while nothing changes.
+        """
+        queue = self.subscribe()
+        try:
+            yield f"retry: {int(self.interval * 1000)}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    message = ": keep-alive\n\n"
+                if await is_disconnected():
+                    break
+                yield message
+        finally:
+            self.unsubscribe(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "version": self._version,
+            "ticks": self.ticks,
+            "deltas": self.deltas,
+            "resyncs": self.resyncs
+        }
@@ -0,0 +1,296 @@
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..sql_models import Transaction
+
+SUGGEST_LIMIT = 10  # most suggestions per request; also the ranked list size of inner trie nodes
+TRIE_LEAF_SIZE = 32  # names a trie leaf holds before it branches on the next character
+USER_MERCHANT_LIMIT = 200  # merchants kept per user; the least used is evicted beyond this
+MERCHANT_USERS_CACHED = 10000  # users with a loaded merchant list, least recently used evicted
+GLOBAL_MERCHANT_LIMIT = 50000  # most frequent merchants loaded into the shared trie
+# Reload the shared trie at least this often, to pick up writes made by other processes
+GLOBAL_MERCHANT_TTL = timedelta(hours=1)
+
+_SEPARATORS = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_merchant(name: Optional[str]) -> str:
+    """
+    Lowercase, accent-free, single-spaced form of a merchant name: the key
+    names are matched and counted by. "" when there are no letters or digits.
+    """
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", stripped.lower()).strip()
+
+
+class _TrieNode:
+    __slots__ = ("children", "ranked", "leaf")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.ranked: List[Tuple[int, str]] = []  # (-count, key), best first
+        self.leaf = True  # leaves rank every key below them; inner nodes only the best SUGGEST_LIMIT
+
+
+class MerchantTrie:
+    """
+    Global merchant counts in a character trie whose nodes carry their best
+    keys, so a lookup is a walk down the prefix. A node only branches once
+    more than TRIE_LEAF_SIZE keys share it; below that its keys sit in one
+    list, which keeps the node count near the number of keys over
+    TRIE_LEAF_SIZE rather than the number of characters. Counts only grow, so
+    the ranked lists stay exact under incremental adds.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+        self.counts: Dict[str, int] = {}
+        self.display: Dict[str, str] = {}  # key -> name as first seen
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, key: str, display: str, count: int = 1):
+        old = self.counts.get(key, 0)
+        total = old + count
+        self.counts[key] = total
+        self.display.setdefault(key, display)
+
+        node, depth = self.root, 0
+        while True:
+            self._rank(node, key, old, total)
+            if node.leaf:
+                if len(node.ranked) > TRIE_LEAF_SIZE:
+                    self._split(node, depth)
+                return
+            if depth == len(key):
+                return
+            node = node.children.setdefault(key[depth], _TrieNode())
+            depth += 1
+
+    @staticmethod
+    def _rank(node: _TrieNode, key: str, old: int, total: int):
+        ranked = node.ranked
+        if old:
+            i = bisect_left(ranked, (-old, key))
+            if i < len(ranked) and ranked[i] == (-old, key):
+                del ranked[i]
+        entry = (-total, key)
+        if node.leaf or len(ranked) < SUGGEST_LIMIT or entry < ranked[-1]:
+            insort(ranked, entry)
+            if not node.leaf:
+                del ranked[SUGGEST_LIMIT:]
+
+    def _split(self, node: _TrieNode, depth: int):
+        node.leaf = False
+        for entry in node.ranked:
+            key = entry[1]
+            if len(key) > depth:
+                # Appending in rank order keeps each child's list sorted
+                node.children.setdefault(key[depth], _TrieNode()).ranked.append(entry)
+        del node.ranked[SUGGEST_LIMIT:]
+        for child in node.children.values():
+            if len(child.ranked) > TRIE_LEAF_SIZE:
+                self._split(child, depth + 1)
+
+    def top(self, prefix: str, limit: int = SUGGEST_LIMIT) -> List[Tuple[int, str]]:
+        """
+        [(-count, key)] of the most frequent keys starting with `prefix`.
+        """
+        node = self.root
+        for char in prefix:
+            if node.leaf:
+                return [entry for entry in node.ranked if entry[1].startswith(prefix)][:limit]
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.ranked[:limit]
+
+
+class UserMerchants:
+    """
+    One user's merchant counts, at most USER_MERCHANT_LIMIT of them, with the
+    keys kept sorted so a prefix is a bisect away.
+    """
+    __slots__ = ("keys", "counts", "display")
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.counts: Dict[str, int] = {}
+        self.display: Dict[str, str] = {}
+
+    def add(self, key: str, display: str, count: int = 1):
+        if key in self.counts:
+            self.counts[key] += count
+            return
+        if len(self.keys) >= USER_MERCHANT_LIMIT:
+            evicted = min(self.keys, key=self.counts.__getitem__)
+            self.keys.pop(bisect_left(self.keys, evicted))
+            del self.counts[evicted]
+            del self.display[evicted]
+        insort(self.keys, key)
+        self.counts[key] = count
+        self.display[key] = display
+
+    def matching(self, prefix: str) -> Iterable[str]:
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            yield self.keys[i]
+            i += 1
+
+
+def _merchant_counts(rows: Iterable[Tuple[str, int]]) -> Dict[str, Tuple[int, str]]:
+    """
+    {key: (count, display)} from (merchant_name, count) rows, merging spellings
+    that normalize alike and showing the most used one.
+    """
+    merged: Dict[str, Tuple[int, str]] = {}
+    best: Dict[str, int] = {}
+    for name, count in rows:
+        key = normalize_merchant(name)
+        if not key:
+            continue
+        total, display = merged.get(key, (0, name.strip()))
+        if count > best.get(key, 0):
+            best[key] = count
+            display = name.strip()
+        merged[key] = (total + count, display)
+    return merged
+
+
+class MerchantSuggester:
+    """
+    Merchant autocomplete. A shared trie of global counts is loaded from
+    transactions (and reloaded after GLOBAL_MERCHANT_TTL); each user's own
+    counts are loaded on their first lookup. Both are kept current by
+    `record_many` after ingested transactions commit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trie: Optional[MerchantTrie] = None
+        self._loaded_at: Optional[datetime] = None
+        self._users: "OrderedDict[int, UserMerchants]" = OrderedDict()
+
+    def load_global(self, db: Session, now: Optional[datetime] = None):
+        now = now or datetime.utcnow()
+        count = func.count(Transaction.id)
+        rows = db.query(Transaction.merchant_name, count).filter(
+            Transaction.merchant_name.isnot(None)
+        ).group_by(Transaction.merchant_name).order_by(count.desc()).limit(GLOBAL_MERCHANT_LIMIT).all()
+
+        trie = MerchantTrie()
+        for key, (total, display) in _merchant_counts(rows).items():
+            trie.add(key, display, total)
+        with self._lock:
+            self._trie = trie
+            self._loaded_at = now
+
+    def load_user(self, db: Session, user_id: int) -> UserMerchants:
+        rows = db.query(Transaction.merchant_name, func.count(Transaction.id)).filter(
+            Transaction.user_id == user_id,
+            Transaction.merchant_name.isnot(None)
+        ).group_by(Transaction.merchant_name).all()
+
+        merchants = UserMerchants()
+        counts = _merchant_counts(rows)
+        for key in heapq.nlargest(USER_MERCHANT_LIMIT, counts, key=lambda key: counts[key][0]):
+            merchants.add(key, counts[key][1], counts[key][0])
+        return merchants
+
+    def _user(self, db: Session, user_id: int) -> UserMerchants:
+        with self._lock:
+            merchants = self._users.get(user_id)
+            if merchants is not None:
+                self._users.move_to_end(user_id)
+                return merchants
+        merchants = self.load_user(db, user_id)
+        with self._lock:
+            merchants = self._users.setdefault(user_id, merchants)
+            while len(self._users) > MERCHANT_USERS_CACHED:
+                self._users.popitem(last=False)
+        return merchants
+
+    def suggest(self, db: Session, user_id: int, prefix: str, limit: int = SUGGEST_LIMIT,
+                now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Merchants starting with `prefix` (normalized): the user's own, most
+        used first, then the most used across all users.
+        """
+        now = now or datetime.utcnow()
+        limit = max(1, min(limit, SUGGEST_LIMIT))
+        if self._trie is None or now - self._loaded_at >= GLOBAL_MERCHANT_TTL:
+            self.load_global(db, now)
+        merchants = self._user(db, user_id)
+        prefix = normalize_merchant(prefix) if prefix.strip() else ""
+
+        with self._lock:
+            trie = self._trie
+            own = heapq.nsmallest(
+                limit,
+                ((-merchants.counts[key], -trie.counts.get(key, 0), key) for key in merchants.matching(prefix))
+            )
+            suggestions = [
+                {
+                    "name": merchants.display[key],
+                    "user_count": -user_count,
+                    "global_count": -global_count
+                }
+                for user_count, global_count, key in own
+            ]
+            seen = {key for _, _, key in own}
+            for global_count, key in trie.top(prefix, limit + len(seen)):
+                if len(suggestions) >= limit:
+                    break
+                if key not in seen:
+                    suggestions.append({"name": trie.display[key], "user_count": 0, "global_count": -global_count})
+        return suggestions
+
+    def record_many(self, items: Iterable[Tuple[int, Dict[str, Any]]]):
+        """
+        Counts the merchants of newly written (user_id, transaction) pairs.
+        Users whose list is not loaded yet pick them up from the table.
+        """
+        with self._lock:
+            for user_id, transaction in items:
+                name = transaction.get("merchant")
+                key = normalize_merchant(name)
+                if not key:
+                    continue
+                if self._trie is not None:
+                    self._trie.add(key, name.strip())
+                merchants = self._users.get(user_id)
+                if merchants is not None:
+                    merchants.add(key, name.strip())
+
+    def record(self, user_id: int, transaction: Dict[str, Any]):
+        self.record_many([(user_id, transaction)])
+
+    def reset(self):
+        with self._lock:
+            self._trie = None
+            self._loaded_at = None
+            self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "global_merchants": len(self._trie) if self._trie is not None else 0,
+                "users_loaded": len(self._users),
+                "loaded_at": self._loaded_at.isoformat() if self._loaded_at else None
+            }
+
+
+merchant_suggester = MerchantSuggester()
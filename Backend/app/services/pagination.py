@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """
+    Opaque, URL-safe token for the position after a row.
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = {"dt": sort_value.isoformat()}
+    payload = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """
+    Inverse of `encode_cursor`. Raises ValueError on a malformed token.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value["dt"])
+        return sort_value, int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_page(query: Query, sort_column, id_column, cursor: Optional[str], limit: int,
+                sort_attr: str, id_attr: str = "id") -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of `query` in (sort_column, id_column) descending order, starting
+    after `cursor` (None or "" for the first page). Seeks straight to the
+    position through the index instead of scanning and discarding earlier rows.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Rows with a NULL sort value come last, as SQLite sorts them in DESC order.
+    """
+    order = (sort_column.desc(), id_column.desc())
+    if not cursor:
+        rows = query.order_by(*order).limit(limit + 1).all()
+    else:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort_value is None:
+            rows = []
+        else:
+            # Row-value comparison lets SQLite seek on the index
+            rows = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id)).order_by(
+                *order
+            ).limit(limit + 1).all()
+        if len(rows) <= limit:
+            null_rows = query.filter(sort_column.is_(None))
+            if sort_value is None:
+                null_rows = null_rows.filter(id_column < row_id)
+            rows += null_rows.order_by(id_column.desc()).limit(limit + 1 - len(rows)).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
@@ -0,0 +1,226 @@
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..sql_models import Transaction, Subscription, RecurringScanState
+
+# (billing_cycle, period in days, tolerance in days on the mean interval)
+BILLING_CYCLES = (
+    ("weekly", 7.0, 1.5),
+    ("monthly", 30.44, 4.0),
+    ("yearly", 365.25, 15.0),
+)
+MIN_CHARGES = {"weekly": 3, "monthly": 3, "yearly": 2}
+MAX_INTERVAL_CV = 0.2  # std / mean of the days between charges
+MAX_AMOUNT_CV = 0.25  # std / mean of the charged amounts
+LAPSED_PERIODS = 2.0  # no charge for this many periods means it is no longer active
+USER_CHUNK_SIZE = 500
+
+MERCHANT_NOISE_WORDS = {
+    "www", "com", "in", "co", "inc", "ltd", "pvt", "llc", "india",
+    "payment", "payments", "online", "subscription", "bill", "autopay",
+}
+NON_ALNUM_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_merchant(name: str) -> str:
+    """
+    Folds merchant name variants ("NETFLIX.COM", "Netflix India") to one key.
+    """
+    words = [
+        word for word in NON_ALNUM_PATTERN.split(name.lower())
+        if word and not word.isdigit() and word not in MERCHANT_NOISE_WORDS
+    ]
+    return " ".join(words)
+
+
+def find_dirty_users(db: Session) -> tuple:
+    """
+    Returns (user_ids, watermark, high): the users with transactions in
+    (watermark, high]. Every scan covers all such users, so everything at or
+    below the highest stored watermark has already been seen; rows written
+    while a scan runs are above `high` and wait for the next one.
+    """
+    watermark = db.query(func.max(RecurringScanState.last_transaction_id)).scalar() or 0
+    high = db.query(func.max(Transaction.id)).scalar() or 0
+    user_ids = [row[0] for row in db.query(Transaction.user_id).filter(
+        Transaction.id > watermark,
+        Transaction.id <= high,
+        Transaction.user_id.isnot(None)
+    ).distinct().all()]
+    return user_ids, watermark, high
+
+
+def detect_recurring(group: np.ndarray, ts: np.ndarray, amount: np.ndarray,
+                     now: float) -> Dict[str, np.ndarray]:
+    """
+    Estimates a billing period per (user, merchant) group from the inter-arrival
+    times. Rows must be sorted by group, then time. Returns one entry per group:
+    the matched cycle index (-1 for none), mean interval in days and the index
+    of the group's last row.
+    """
+    groups = int(group.max()) + 1 if len(group) else 0
+    last_row = np.flatnonzero(np.r_[group[1:] != group[:-1], True]) if len(group) else np.empty(0, dtype=np.int64)
+
+    # Days between consecutive charges of the same group; same-day repeats are
+    # treated as duplicates rather than as a zero-length period
+    interval = np.diff(ts) / 86400.0
+    valid = (group[1:] == group[:-1]) & (interval >= 1.0)
+    interval_group = group[1:][valid]
+    interval = interval[valid]
+
+    charges = np.bincount(interval_group, minlength=groups) + 1
+    interval_sum = np.bincount(interval_group, interval, minlength=groups)
+    interval_sq = np.bincount(interval_group, interval * interval, minlength=groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_interval = interval_sum / (charges - 1)
+        interval_cv = np.sqrt(np.maximum(interval_sq / (charges - 1) - mean_interval ** 2, 0.0)) / mean_interval
+
+    count = np.bincount(group, minlength=groups)
+    amount_sum = np.bincount(group, amount, minlength=groups)
+    amount_sq = np.bincount(group, amount * amount, minlength=groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_amount = amount_sum / count
+        amount_cv = np.sqrt(np.maximum(amount_sq / count - mean_amount ** 2, 0.0)) / mean_amount
+
+    regular = (interval_cv <= MAX_INTERVAL_CV) & (amount_cv <= MAX_AMOUNT_CV)
+    active = (now - ts[last_row]) / 86400.0 <= mean_interval * LAPSED_PERIODS
+
+    cycle = np.full(groups, -1, dtype=np.int64)
+    for index, (name, days, tolerance) in enumerate(BILLING_CYCLES):
+        matched = regular & active & (np.abs(mean_interval - days) <= tolerance) & (charges >= MIN_CHARGES[name])
+        cycle[matched] = index
+
+    return {"cycle": cycle, "mean_interval": mean_interval, "last_row": last_row}
+
+
+def _load_history(db: Session, user_ids: List[int]) -> List[Any]:
+    return db.query(
+        Transaction.user_id,
+        Transaction.merchant_name,
+        Transaction.date,
+        Transaction.amount,
+        Transaction.category_id,
+        Transaction.payment_method_id
+    ).filter(
+        Transaction.user_id.in_(user_ids),
+        Transaction.merchant_name.isnot(None),
+        Transaction.date.isnot(None),
+        (Transaction.type != "income") | Transaction.type.is_(None)
+    ).all()
+
+
+def _upsert_subscriptions(db: Session, user_ids: List[int], detected: List[Dict[str, Any]]) -> Dict[str, int]:
+    existing = {}
+    for sub in db.query(Subscription).filter(Subscription.user_id.in_(user_ids)).all():
+        existing.setdefault((sub.user_id, normalize_merchant(sub.name or "")), sub)
+
+    created = updated = 0
+    for item in detected:
+        sub = existing.get((item["user_id"], item["key"]))
+        if sub is None:
+            db.add(Subscription(
+                user_id=item["user_id"],
+                name=item["name"],
+                amount=item["amount"],
+                billing_cycle=item["billing_cycle"],
+                next_billing_date=item["next_billing_date"],
+                category_id=item["category_id"],
+                payment_method_id=item["payment_method_id"],
+                status="active"
+            ))
+            created += 1
+        else:
+            sub.amount = item["amount"]
+            sub.billing_cycle = item["billing_cycle"]
+            sub.next_billing_date = item["next_billing_date"]
+            sub.status = "active"
+            updated += 1
+    return {"created": created, "updated": updated}
+
+
+def scan_users(db: Session, user_ids: List[int], now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Runs the detector over the full history of the given users and creates or
+    updates their Subscription rows. Does not commit.
+    """
+    now = now or datetime.now()
+    rows = _load_history(db, user_ids)
+    if not rows:
+        return {"created": 0, "updated": 0}
+
+    # Group codes per (user, normalized merchant), then sort by group and time
+    codes = {}
+    group = np.fromiter((codes.setdefault((row.user_id, normalize_merchant(row.merchant_name)), len(codes))
+                         for row in rows), dtype=np.int64, count=len(rows))
+    ts = np.fromiter((row.date.timestamp() for row in rows), dtype=np.float64, count=len(rows))
+    amount = np.fromiter((row.amount or 0.0 for row in rows), dtype=np.float64, count=len(rows))
+    order = np.lexsort((ts, group))
+    group, ts, amount = group[order], ts[order], amount[order]
+
+    result = detect_recurring(group, ts, amount, now.timestamp())
+    keys = list(codes)
+
+    detected = []
+    for group_code in np.flatnonzero(result["cycle"] >= 0).tolist():
+        if not keys[group_code][1]:
+            continue
+        last = int(result["last_row"][group_code])
+        row = rows[int(order[last])]
+        billing_cycle = BILLING_CYCLES[result["cycle"][group_code]][0]
+        period = timedelta(days=float(result["mean_interval"][group_code]))
+        next_billing = row.date + period
+        while next_billing < now:  # a charge may be due but not seen yet
+            next_billing += period
+        detected.append({
+            "user_id": row.user_id,
+            "key": keys[group_code][1],
+            "name": row.merchant_name,
+            "amount": float(amount[last]),
+            "billing_cycle": billing_cycle,
+            "next_billing_date": next_billing.date(),
+            "category_id": row.category_id,
+            "payment_method_id": row.payment_method_id
+        })
+
+    return _upsert_subscriptions(db, user_ids, detected)
+
+
+def run_recurring_scan(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Incremental run: only users with transactions added since the last scan are
+    re-evaluated. Subscriptions are committed per chunk of users (the upsert is
+    idempotent), and the watermarks once every chunk is done.
+    """
+    user_ids, watermark, high = find_dirty_users(db)
+    stats = {"users": len(user_ids), "created": 0, "updated": 0}
+
+    for start in range(0, len(user_ids), USER_CHUNK_SIZE):
+        counts = scan_users(db, user_ids[start:start + USER_CHUNK_SIZE], now)
+        stats["created"] += counts["created"]
+        stats["updated"] += counts["updated"]
+        db.commit()
+
+    scanned_at = datetime.utcnow()
+    for start in range(0, len(user_ids), USER_CHUNK_SIZE):
+        chunk = user_ids[start:start + USER_CHUNK_SIZE]
+        last_ids = dict(db.query(Transaction.user_id, func.max(Transaction.id)).filter(
+            Transaction.user_id.in_(chunk),
+            Transaction.id > watermark,
+            Transaction.id <= high
+        ).group_by(Transaction.user_id).all())
+        for user_id in chunk:
+            db.merge(RecurringScanState(
+                user_id=user_id,
+                last_transaction_id=last_ids[user_id],
+                scanned_at=scanned_at
+            ))
+    db.commit()
+
+    return stats
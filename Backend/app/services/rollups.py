@@ -0,0 +1,456 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select, desc, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from ..sql_models import (
+    Transaction, Category, Subscription, User, UserCategoryMonthly, UserStats, DailyStats, UserDailyActivity
+)
+
+TRANSACTION_FIELDS = ("user_id", "category_id", "date", "type", "amount")
+SUBSCRIPTION_FIELDS = ("user_id", "status", "amount", "created_at")
+USER_FIELDS = ("created_at", "is_premium_member")
+UNCATEGORIZED = 0
+UNDATED = ""
+DAILY_COLUMNS = ("signups", "premium_signups", "transaction_count", "expense_volume", "new_subscriptions")
+# session.info key of the committed-on-success user_daily_activity deltas the leaderboard applies
+USER_DAY_DELTAS_KEY = "rollups_user_day_deltas"
+
+
+def month_key(date: datetime) -> str:
+    return date.strftime("%Y-%m")
+
+
+def day_key(date: Optional[datetime]) -> str:
+    return date.strftime("%Y-%m-%d") if date is not None else UNDATED
+
+
+def _rollup_key(values: Dict[str, Any]) -> Optional[Tuple]:
+    if values["user_id"] is None or values["date"] is None or values["type"] is None:
+        return None
+    return (values["user_id"], month_key(values["date"]), values["type"], values["category_id"] or UNCATEGORIZED)
+
+
+class RollupDeltas:
+    """
+    Pending changes to the materialized tables from one batch of writes:
+    user_category_monthly (amount, count) per key, user_stats per user,
+    daily_stats per day and user_daily_activity per (user, day).
+    """
+
+    def __init__(self):
+        self.monthly = defaultdict(lambda: [0.0, 0])
+        # user_id -> [transaction_count, total_spent, active_subscriptions, subscription_cost, last_activity_at]
+        self.users = defaultdict(lambda: [0, 0.0, 0, 0.0, None])
+        # day -> values in DAILY_COLUMNS order
+        self.days = defaultdict(lambda: [0, 0, 0, 0.0, 0])
+        # (user_id, day) -> [transaction_count, total_spent]
+        self.user_days = defaultdict(lambda: [0, 0.0])
+
+    def add_transaction(self, values: Dict[str, Any], sign: int):
+        amount = values["amount"] or 0.0
+        day = self.days[day_key(values["date"])]
+        day[2] += sign
+        if values["type"] == "expense":
+            day[3] += sign * amount
+
+        key = _rollup_key(values)
+        if key is not None:
+            self.monthly[key][0] += sign * amount
+            self.monthly[key][1] += sign
+
+        if values["user_id"] is None:
+            return
+        stats = self.users[values["user_id"]]
+        stats[0] += sign
+        if values["type"] == "expense":
+            stats[1] += sign * amount
+        if values["date"] is not None:
+            user_day = self.user_days[(values["user_id"], day_key(values["date"]))]
+            user_day[0] += sign
+            if values["type"] == "expense":
+                user_day[1] += sign * amount
+        if sign > 0 and values["date"] is not None and (stats[4] is None or values["date"] > stats[4]):
+            stats[4] = values["date"]
+
+    def add_subscription(self, values: Dict[str, Any], sign: int):
+        # status is NULL until the column default applies at insert
+        if (values["status"] or "active") != "active":
+            return
+        self.days[day_key(values["created_at"])][4] += sign
+        if values["user_id"] is None:
+            return
+        stats = self.users[values["user_id"]]
+        stats[2] += sign
+        stats[3] += sign * (values["amount"] or 0.0)
+
+    def add_user(self, values: Dict[str, Any], sign: int):
+        day = self.days[day_key(values["created_at"])]
+        day[0] += sign
+        if values["is_premium_member"]:
+            day[1] += sign
+
+    def apply(self, db: Session):
+        """
+        Upserts the deltas in the session's current transaction.
+        """
+        monthly_rows = [
+            {
+                "user_id": user_id,
+                "month": month,
+                "type": type_,
+                "category_id": category_id,
+                "total_amount": amount,
+                "transaction_count": count
+            }
+            for (user_id, month, type_, category_id), (amount, count) in self.monthly.items()
+            if amount or count
+        ]
+        if monthly_rows:
+            table = UserCategoryMonthly.__table__
+            stmt = sqlite_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.month, table.c.type, table.c.category_id],
+                set_={
+                    "total_amount": table.c.total_amount + stmt.excluded.total_amount,
+                    "transaction_count": table.c.transaction_count + stmt.excluded.transaction_count
+                }
+            )
+            db.connection().execute(stmt, monthly_rows)
+
+        user_rows = [
+            {
+                "user_id": user_id,
+                "transaction_count": count,
+                "total_spent": spent,
+                "active_subscriptions": subscriptions,
+                "subscription_cost": cost,
+                "last_activity_at": last_activity
+            }
+            for user_id, (count, spent, subscriptions, cost, last_activity) in self.users.items()
+            if count or spent or subscriptions or cost or last_activity
+        ]
+        if user_rows:
+            table = UserStats.__table__
+            stmt = sqlite_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={
+                    "transaction_count": table.c.transaction_count + stmt.excluded.transaction_count,
+                    "total_spent": table.c.total_spent + stmt.excluded.total_spent,
+                    "active_subscriptions": table.c.active_subscriptions + stmt.excluded.active_subscriptions,
+                    "subscription_cost": table.c.subscription_cost + stmt.excluded.subscription_cost,
+                    "last_activity_at": case(
+                        (stmt.excluded.last_activity_at.is_(None), table.c.last_activity_at),
+                        (table.c.last_activity_at.is_(None), stmt.excluded.last_activity_at),
+                        (stmt.excluded.last_activity_at > table.c.last_activity_at, stmt.excluded.last_activity_at),
+                        else_=table.c.last_activity_at
+                    )
+                }
+            )
+            db.connection().execute(stmt, user_rows)
+
+        daily_rows = [
+            dict(zip(("day",) + DAILY_COLUMNS, (day, *values)))
+            for day, values in self.days.items()
+            if any(values)
+        ]
+        if daily_rows:
+            table = DailyStats.__table__
+            stmt = sqlite_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.day],
+                set_={column: table.c[column] + stmt.excluded[column] for column in DAILY_COLUMNS}
+            )
+            db.connection().execute(stmt, daily_rows)
+
+        user_day_rows = [
+            {"user_id": user_id, "day": day, "transaction_count": count, "total_spent": spent}
+            for (user_id, day), (count, spent) in self.user_days.items()
+            if count or spent
+        ]
+        if user_day_rows:
+            table = UserDailyActivity.__table__
+            stmt = sqlite_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.day],
+                set_={
+                    "transaction_count": table.c.transaction_count + stmt.excluded.transaction_count,
+                    "total_spent": table.c.total_spent + stmt.excluded.total_spent
+                }
+            )
+            db.connection().execute(stmt, user_day_rows)
+            pending = db.info.setdefault(USER_DAY_DELTAS_KEY, [])
+            pending.extend(user_day_rows)
+
+
+def add_transaction_rows(db: Session, rows: Iterable[Dict[str, Any]]):
+    """
+    Rolls up transactions written with Core inserts (which bypass the ORM
+    flush hook). Call it in the same transaction as the insert.
+    """
+    deltas = RollupDeltas()
+    for row in rows:
+        deltas.add_transaction({field: row.get(field) for field in TRANSACTION_FIELDS}, 1)
+    deltas.apply(db)
+
+
+def add_subscription_rows(db: Session, rows: Iterable[Dict[str, Any]]):
+    """
+    `add_transaction_rows` for subscriptions written with Core inserts.
+    """
+    deltas = RollupDeltas()
+    for row in rows:
+        deltas.add_subscription({field: row.get(field) for field in SUBSCRIPTION_FIELDS}, 1)
+    deltas.apply(db)
+
+
+def _previous_values(instance, fields) -> Dict[str, Any]:
+    state = inspect(instance)
+    values = {}
+    for field in fields:
+        history = state.attrs[field].history
+        values[field] = history.deleted[0] if history.deleted else getattr(instance, field)
+    return values
+
+
+def _current_values(instance, fields) -> Dict[str, Any]:
+    return {field: getattr(instance, field) for field in fields}
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Setting an attribute on an expired instance does not load its old value,
+# which the hook needs to subtract; active history makes the set load it first
+for _model, _fields in ((Transaction, TRANSACTION_FIELDS), (Subscription, SUBSCRIPTION_FIELDS), (User, USER_FIELDS)):
+    for _field in _fields:
+        event.listen(getattr(_model, _field), "set", _load_old_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_rollup_changes(session: Session, flush_context, instances):
+    """
+    Keeps user_category_monthly, user_stats and daily_stats in step with ORM
+    inserts, updates and deletes of transactions, subscriptions and users,
+    inside the same database transaction as the change.
+    """
+    deltas = RollupDeltas()
+    tracked = (
+        (Transaction, TRANSACTION_FIELDS, deltas.add_transaction),
+        (Subscription, SUBSCRIPTION_FIELDS, deltas.add_subscription),
+        (User, USER_FIELDS, deltas.add_user),
+    )
+
+    with session.no_autoflush:
+        for model, fields, add in tracked:
+            for instance in session.new:
+                if isinstance(instance, model):
+                    # Fill the column default now so the row lands in the right day
+                    if "created_at" in fields and instance.created_at is None:
+                        instance.created_at = datetime.utcnow()
+                    add(_current_values(instance, fields), 1)
+            for instance in session.deleted:
+                if isinstance(instance, model):
+                    add(_previous_values(instance, fields), -1)
+            for instance in session.dirty:
+                if isinstance(instance, model) and session.is_modified(instance):
+                    previous = _previous_values(instance, fields)
+                    current = _current_values(instance, fields)
+                    if previous != current:
+                        add(previous, -1)
+                        add(current, 1)
+
+    deltas.apply(session)
+
+
+def rebuild_user_category_monthly(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recomputes user_category_monthly from the transactions table, for one user
+    or everyone. Does not commit. Returns the number of rows written.
+    """
+    monthly = UserCategoryMonthly.__table__
+    monthly_delete = monthly.delete()
+    monthly_source = select(
+        Transaction.user_id,
+        func.strftime("%Y-%m", Transaction.date),
+        Transaction.type,
+        func.coalesce(Transaction.category_id, UNCATEGORIZED),
+        func.sum(Transaction.amount),
+        func.count(Transaction.id)
+    ).where(
+        Transaction.user_id.isnot(None),
+        Transaction.date.isnot(None),
+        Transaction.type.isnot(None)
+    ).group_by(
+        Transaction.user_id,
+        func.strftime("%Y-%m", Transaction.date),
+        Transaction.type,
+        func.coalesce(Transaction.category_id, UNCATEGORIZED)
+    )
+    if user_id is not None:
+        monthly_delete = monthly_delete.where(monthly.c.user_id == user_id)
+        monthly_source = monthly_source.where(Transaction.user_id == user_id)
+
+    db.execute(monthly_delete)
+    return db.execute(monthly.insert().from_select(
+        ["user_id", "month", "type", "category_id", "total_amount", "transaction_count"],
+        monthly_source
+    )).rowcount
+
+
+def rebuild_user_stats(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recomputes user_stats from the users, transactions and subscriptions
+    tables, for one user or everyone. Does not commit. Returns the number of
+    rows written.
+    """
+    transaction_totals = select(
+        Transaction.user_id.label("user_id"),
+        func.count(Transaction.id).label("transaction_count"),
+        func.sum(case((Transaction.type == "expense", Transaction.amount), else_=0.0)).label("total_spent"),
+        func.max(Transaction.date).label("last_activity_at")
+    ).group_by(Transaction.user_id).subquery()
+    subscription_totals = select(
+        Subscription.user_id.label("user_id"),
+        func.count(Subscription.id).label("active_subscriptions"),
+        func.sum(Subscription.amount).label("subscription_cost")
+    ).where(
+        func.coalesce(Subscription.status, "active") == "active"
+    ).group_by(Subscription.user_id).subquery()
+
+    stats = UserStats.__table__
+    stats_delete = stats.delete()
+    stats_source = select(
+        User.id,
+        func.coalesce(transaction_totals.c.transaction_count, 0),
+        func.coalesce(transaction_totals.c.total_spent, 0.0),
+        func.coalesce(subscription_totals.c.active_subscriptions, 0),
+        func.coalesce(subscription_totals.c.subscription_cost, 0.0),
+        transaction_totals.c.last_activity_at
+    ).outerjoin(
+        transaction_totals, transaction_totals.c.user_id == User.id
+    ).outerjoin(
+        subscription_totals, subscription_totals.c.user_id == User.id
+    )
+    if user_id is not None:
+        stats_delete = stats_delete.where(stats.c.user_id == user_id)
+        stats_source = stats_source.where(User.id == user_id)
+
+    db.execute(stats_delete)
+    return db.execute(stats.insert().from_select(
+        ["user_id", "transaction_count", "total_spent", "active_subscriptions",
+         "subscription_cost", "last_activity_at"],
+        stats_source
+    )).rowcount
+
+
+def rebuild_user_daily_activity(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recomputes user_daily_activity from the transactions table, for one user
+    or everyone. Does not commit. Returns the number of rows written.
+    """
+    activity = UserDailyActivity.__table__
+    activity_delete = activity.delete()
+    activity_source = select(
+        Transaction.user_id,
+        func.strftime("%Y-%m-%d", Transaction.date),
+        func.count(Transaction.id),
+        func.sum(case((Transaction.type == "expense", Transaction.amount), else_=0.0))
+    ).where(
+        Transaction.user_id.isnot(None),
+        Transaction.date.isnot(None)
+    ).group_by(
+        Transaction.user_id,
+        func.strftime("%Y-%m-%d", Transaction.date)
+    )
+    if user_id is not None:
+        activity_delete = activity_delete.where(activity.c.user_id == user_id)
+        activity_source = activity_source.where(Transaction.user_id == user_id)
+
+    db.execute(activity_delete)
+    return db.execute(activity.insert().from_select(
+        ["user_id", "day", "transaction_count", "total_spent"],
+        activity_source
+    )).rowcount
+
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    Recomputes user_category_monthly, user_stats and user_daily_activity from
+    the transactions and subscriptions tables, for one user or everyone. Does
+    not commit. Returns the number of rows written per table.
+    """
+    return {
+        "user_category_monthly": rebuild_user_category_monthly(db, user_id),
+        "user_stats": rebuild_user_stats(db, user_id),
+        "user_daily_activity": rebuild_user_daily_activity(db, user_id)
+    }
+
+
+def needs_seed(db: Session, rollup, *sources) -> bool:
+    """
+    True when a rollup table is empty while one of its source tables has rows:
+    the rollup was added to a database that already held data, and the write
+    hooks only track changes made after that.
+    """
+    def has_rows(model) -> bool:
+        # select 1 rather than the entity, so a table missing a newer mapped column still reads
+        return db.execute(select(1).select_from(model).limit(1)).first() is not None
+
+    return not has_rows(rollup) and any(has_rows(source) for source in sources)
+
+
+# Rollup table -> (source tables, rebuild function), seeded at startup when unfilled
+ROLLUP_SEEDS = {
+    "user_category_monthly": (UserCategoryMonthly, (Transaction,), rebuild_user_category_monthly),
+    "user_stats": (UserStats, (User,), rebuild_user_stats),
+    "user_daily_activity": (UserDailyActivity, (Transaction,), rebuild_user_daily_activity),
+}
+
+
+def seed_empty_rollups(db: Session) -> Dict[str, int]:
+    """
+    Rebuilds every rollup table that `needs_seed`. Does not commit. Returns
+    the number of rows written per rebuilt table.
+    """
+    return {
+        name: rebuild(db)
+        for name, (rollup, sources, rebuild) in ROLLUP_SEEDS.items()
+        if needs_seed(db, rollup, *sources)
+    }
+
+
+def month_summary(db: Session, user_id: int, month: str, type_: str = "expense", top: int = 3) -> Dict[str, Any]:
+    """
+    Total and top categories of one user's month, read from the rollup.
+    """
+    total = db.query(func.sum(UserCategoryMonthly.total_amount)).filter(
+        UserCategoryMonthly.user_id == user_id,
+        UserCategoryMonthly.month == month,
+        UserCategoryMonthly.type == type_,
+        UserCategoryMonthly.transaction_count > 0
+    ).scalar() or 0.0
+
+    top_categories = db.query(
+        Category.name,
+        Category.color,
+        UserCategoryMonthly.total_amount
+    ).join(Category, Category.id == UserCategoryMonthly.category_id).filter(
+        UserCategoryMonthly.user_id == user_id,
+        UserCategoryMonthly.month == month,
+        UserCategoryMonthly.type == type_,
+        UserCategoryMonthly.transaction_count > 0
+    ).order_by(desc(UserCategoryMonthly.total_amount)).limit(top).all()
+
+    return {
+        "total": total,
+        "top_categories": [
+            {"name": row.name, "color": row.color, "amount": row.total_amount}
+            for row in top_categories
+        ]
+    }
@@ -0,0 +1,32 @@
+from typing import List
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Engine
+
+
+def add_missing_columns(engine: Engine, metadata: MetaData) -> List[str]:
+    """
+    Adds mapped columns that existing tables lack, since create_all never
+    alters a table that is already there. Idempotent: columns already present
+    are left alone. Only nullable columns can be added in place (SQLite's
+    ADD COLUMN needs a default otherwise); others are reported and skipped.
+    Returns the "table.column" names that were added.
+    """
+    added = []
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+            if not existing:
+                continue  # not created yet; create_all builds it whole
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if column.primary_key or not column.nullable:
+                    print(f"Schema upgrade skipped {table.name}.{column.name}: not nullable")
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                for foreign_key in column.foreign_keys:
+                    ddl += f" REFERENCES {foreign_key.column.table.name}({foreign_key.column.name})"
+                conn.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+    return added
@@ -0,0 +1,150 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# FTS5 index -> (content table, indexed columns). The indexes are external
+# content tables: they store only the token index and read column values
+# from the content table by rowid (the table's id).
+SEARCH_INDEXES = {
+    "users_fts": ("users", ("email", "full_name")),
+    "transactions_fts": ("transactions", ("merchant_name", "note")),
+}
+SEARCH_ENTITIES = {"users": "users_fts", "transactions": "transactions_fts"}
+# Terms beyond this are ignored, to keep pathological queries cheap
+MAX_QUERY_TERMS = 8
+# Only the newest this-many matches are ranked, so a common prefix matching
+# much of a large table costs no more than a selective one
+SEARCH_CANDIDATES = 1000
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_index_ddl(index: str) -> List[str]:
+    """
+    CREATE statements for one FTS5 index and the triggers that keep it in
+    sync with its content table, on every insert path including Core bulk
+    inserts.
+    """
+    table, columns = SEARCH_INDEXES[index]
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    delete_old = f"INSERT INTO {index}({index}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {index}(rowid, {column_list}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+        f"{column_list}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_au AFTER UPDATE OF {column_list} ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def missing_columns(conn, index: str) -> List[str]:
+    """
+    Indexed columns its content table does not have (yet), as on a database
+    created before one of them was added.
+    """
+    table, columns = SEARCH_INDEXES[index]
+    existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+    return [column for column in columns if column not in existing]
+
+
+def ensure_search_index(engine: Engine) -> List[str]:
+    """
+    Creates missing search indexes and their triggers, filling any newly
+    created index from its content table. An index whose content table lacks
+    one of its columns is skipped and reported. Returns the indexes that were
+    built.
+    """
+    built = []
+    for index in SEARCH_INDEXES:
+        with engine.begin() as conn:
+            missing = missing_columns(conn, index)
+            if missing:
+                print(f"Search index {index} skipped: {SEARCH_INDEXES[index][0]} has no {', '.join(missing)} column")
+                continue
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": index}
+            ).first()
+            for statement in search_index_ddl(index):
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {index}({index}) VALUES ('rebuild')"))
+                built.append(index)
+    return built
+
+
+def rebuild_search_index(db: Session):
+    """
+    Re-tokenizes every index from its content table. Does not commit.
+    """
+    for index in SEARCH_INDEXES:
+        db.execute(text(f"INSERT INTO {index}({index}) VALUES ('rebuild')"))
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text: every word must match as a prefix.
+    Words are quoted, so FTS5 operators and punctuation in the input are
+    treated as text.
+    """
+    terms = _TERM.findall(query.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_ids(db: Session, entity: str, query: str, limit: int = 20,
+               candidates: int = SEARCH_CANDIDATES) -> List[Tuple[int, float]]:
+    """
+    [(id, score)] of the best matches for one entity, best first. Scores are
+    bm25 relevance (lower is better) over the newest `candidates` matches:
+    FTS5 walks the match list in rowid order and stops there, instead of
+    scoring every matching row.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    index = SEARCH_ENTITIES[entity]
+    rows = db.execute(
+        text(
+            f"SELECT rowid, rank FROM ("
+            f"SELECT rowid, rank FROM {index} WHERE {index} MATCH :query ORDER BY rowid DESC LIMIT :candidates"
+            f") ORDER BY rank LIMIT :limit"
+        ),
+        {"query": expression, "candidates": candidates, "limit": limit}
+    ).all()
+    return [(row[0], row[1]) for row in rows]
+
+
+def available_entities(db: Session) -> List[str]:
+    """
+    Entities whose index exists; `ensure_search_index` skips an index whose
+    content table lacks a column, or may have failed altogether.
+    """
+    names = {row[0] for row in db.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN :names").bindparams(
+            bindparam("names", expanding=True)
+        ),
+        {"names": list(SEARCH_INDEXES)}
+    )}
+    return [entity for entity, index in SEARCH_ENTITIES.items() if index in names]
+
+
+def search_all(db: Session, query: str, entities: Optional[List[str]] = None,
+               limit: int = 20) -> Dict[str, List[Tuple[int, float]]]:
+    """
+    {entity: [(id, score)]} for the requested entities that have an index.
+    Entities without one are left out; compare with `entities` to report them.
+    """
+    available = available_entities(db)
+    return {
+        entity: search_ids(db, entity, query, limit)
+        for entity in (entities or list(SEARCH_ENTITIES)) if entity in available
+    }
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..sql_models import Transaction, Category, Subscription, PaymentMethod
+from .rollups import add_transaction_rows, add_subscription_rows
+from .home_cache import mark_users_dirty
+
+
+def resolve_categories(db: Session, wanted: set) -> dict:
+    """
+    Maps (user_id, category_name) pairs to category ids with a single lookup,
+    creating the missing user categories in one flush.
+    """
+    user_ids = {user_id for user_id, _ in wanted}
+    names = {name for _, name in wanted}
+
+    existing = db.query(Category.id, Category.name, Category.user_id, Category.is_default).filter(
+        Category.name.in_(names),
+        Category.user_id.in_(user_ids) | (Category.is_default == True)
+    ).all()
+
+    resolved = {}
+    defaults = {}
+    for cat in existing:
+        if cat.user_id in user_ids and (cat.user_id, cat.name) in wanted:
+            resolved.setdefault((cat.user_id, cat.name), cat.id)
+        if cat.is_default:
+            defaults.setdefault(cat.name, cat.id)
+
+    new_categories = {}
+    for key in wanted:
+        if key in resolved:
+            continue
+        if key[1] in defaults:
+            resolved[key] = defaults[key[1]]
+        else:
+            new_categories[key] = Category(
+                name=key[1],
+                type='expense',
+                user_id=key[0],
+                icon='pricetag-outline',
+                color='#CCCCCC'
+            )
+
+    if new_categories:
+        db.add_all(new_categories.values())
+        db.flush()
+        for key, category in new_categories.items():
+            resolved[key] = category.id
+
+    return resolved
+
+def resolve_payment_methods(db: Session, wanted: set) -> dict:
+    """
+    Maps (user_id, payment_method_name) pairs to payment method ids with a single
+    lookup, creating the missing ones in one flush.
+    """
+    user_ids = {user_id for user_id, _ in wanted}
+    types = {name.lower() for _, name in wanted}
+
+    existing = db.query(PaymentMethod.id, PaymentMethod.user_id, PaymentMethod.type).filter(
+        PaymentMethod.user_id.in_(user_ids),
+        PaymentMethod.type.in_(types)
+    ).all()
+
+    by_type = {}
+    for pm in existing:
+        by_type.setdefault((pm.user_id, pm.type), pm.id)
+
+    resolved = {}
+    new_methods = {}
+    for user_id, name in wanted:
+        pm_id = by_type.get((user_id, name.lower()))
+        if pm_id is not None:
+            resolved[(user_id, name)] = pm_id
+        else:
+            new_methods[(user_id, name)] = PaymentMethod(
+                user_id=user_id,
+                type=name.lower(),  # upi, card, wallet
+                identifier="Default",  # Placeholder
+                name=name
+            )
+
+    if new_methods:
+        db.add_all(new_methods.values())
+        db.flush()
+        for key, payment_method in new_methods.items():
+            resolved[key] = payment_method.id
+
+    return resolved
+
+
+def store_parsed_messages(db: Session, items: List[Tuple[int, Dict[str, Any]]]) -> int:
+    """
+    Writes the transactions (and new subscriptions) for a list of
+    (user_id, parsed_data) pairs using bulk inserts. Categories and payment
+    methods are resolved once for the whole list. Does not commit.
+    """
+    if not items:
+        return 0
+
+    category_ids = resolve_categories(db, {
+        (user_id, data['category']) for user_id, data in items
+    })
+    payment_method_ids = resolve_payment_methods(db, {
+        (user_id, data['payment_method']) for user_id, data in items
+        if data['payment_method'] != 'Unknown'
+    })
+
+    # Subscriptions: skip names that already exist or repeat within the batch
+    subscription_keys = {
+        (user_id, data['merchant']) for user_id, data in items
+        if data['is_subscription']
+    }
+    known_subscriptions = set()
+    if subscription_keys:
+        known_subscriptions = set(db.query(Subscription.user_id, Subscription.name).filter(
+            Subscription.user_id.in_({user_id for user_id, _ in subscription_keys}),
+            Subscription.name.in_({name for _, name in subscription_keys})
+        ).all())
+
+    transaction_rows = []
+    subscription_rows = []
+    for user_id, data in items:
+        category_id = category_ids[(user_id, data['category'])]
+        payment_method_id = payment_method_ids.get((user_id, data['payment_method']))
+
+        if data['is_subscription'] and (user_id, data['merchant']) not in known_subscriptions:
+            known_subscriptions.add((user_id, data['merchant']))
+            subscription_rows.append({
+                "user_id": user_id,
+                "name": data['merchant'],
+                "amount": data['amount'],
+                "category_id": category_id,
+                "payment_method_id": payment_method_id,
+                "status": 'active',
+                "next_billing_date": datetime.now() + timedelta(days=30),  # Default to monthly
+                "created_at": datetime.utcnow()
+            })
+
+        transaction_rows.append({
+            "user_id": user_id,
+            "amount": data['amount'],
+            "category_id": category_id,
+            "merchant_name": data['merchant'],
+            "payment_method_id": payment_method_id,
+            "date": data['date'],
+            "type": 'expense',
+            "note": f"Auto-detected via SMS from {data['merchant']}"
+        })
+
+    if subscription_rows:
+        db.execute(Subscription.__table__.insert(), subscription_rows)
+        add_subscription_rows(db, subscription_rows)
+    db.execute(Transaction.__table__.insert(), transaction_rows)
+    add_transaction_rows(db, transaction_rows)
+    mark_users_dirty(db, {user_id for user_id, _ in items})
+    return len(transaction_rows)
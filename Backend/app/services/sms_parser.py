@@ -1,24 +1,76 @@
 import re
 from datetime import datetime
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Iterable
+
+from .bank_extractors import get_extractor
+from .keyword_index import KeywordIndex
+
+# Regex patterns for common bank SMS formats (Indian context primarily based on user request context).
+# Each pattern is paired with the keywords that must appear in the lowercased message
+# for it to be able to match, so a message is only run against the patterns it can hit,
+# and optionally a guard: a cheap regex the lowercased message must match first.
+PATTERN_SPECS = [
+    # Pattern 1: "Rs. <amount> spent on <card> at <merchant> on <date>"
+    # Guarded by "at"/"to" somewhere before a date: without one the pattern cannot match,
+    # but its nested lazy groups backtrack for tens of microseconds before giving up on
+    # long alerts such as "Rs.X debited from a/c .. on <date> to VPA .. (UPI Ref No ..)"
+    (r"(?i)(?:rs\.?|inr)\s*([\d,]+(?:\.\d{2})?)\s*(?:spent|debited|paid)\s*(?:on|using|via)?\s*(?:card|upi|wallet)?\s*.*?\s*(?:at|to)\s*([a-zA-Z0-9\s\.\-\&]+?)\s*(?:on|at)\s*(\d{2}[-/]\d{2}(?:[-/]\d{2,4})?)",
+     ('spent', 'debited', 'paid'), r"(?:at|to).*\d{2}[-/]\d{2}"),
+
+    # Pattern 2: "Debited: Rs. <amount> from A/c ... to <merchant>"
+    (r"(?i)debited[:\s]*rs\.?\s*([\d,]+(?:\.\d{2})?).*?to\s*([a-zA-Z0-9\s\.\-\&]+?)(?:\s+on\s+|\.|$)",
+     ('debited',), None),
+
+    # Pattern 3: "Transaction of Rs. <amount> made at <merchant>"
+    (r"(?i)transaction.*?rs\.?\s*([\d,]+(?:\.\d{2})?).*?at\s*([a-zA-Z0-9\s\.\-\&]+?)(?:\s+on\s+|\.|$)",
+     ('transaction',), None),
+
+    # Pattern 4: "Paid Rs. <amount> to <merchant>"
+    (r"(?i)paid\s*rs\.?\s*([\d,]+(?:\.\d{2})?)\s*to\s*([a-zA-Z0-9\s\.\-\&]+?)(?:\s+on\s+|\.|$)",
+     ('paid',), None),
+]
+
+# Fallback used when no full pattern matches: just look for "Rs." and numbers
+FALLBACK_AMOUNT_PATTERN = re.compile(r"(?:rs\.?|inr)\s*([\d,]+(?:\.\d{2})?)", re.IGNORECASE)
+
+# Payment method keywords in order of precedence (UPI wins over Card, Card over Wallet).
+# PhonePe/Paytm can be UPI too, but often wallet.
+PAYMENT_METHOD_KEYWORDS = [
+    ('UPI', ('upi',)),
+    ('Card', ('card', 'debit', 'credit')),
+    ('Wallet', ('wallet', 'paytm', 'phonepe')),
+]
+
+# Keywords that describe a kind of merchant rather than a brand
+GENERIC_MERCHANT_KEYWORDS = {
+    'restaurant', 'cafe', 'burger', 'pizza', 'food', 'dining', 'fuel', 'petrol', 'metro',
+    'retail', 'store', 'mart', 'mall', 'movie', 'cinema', 'electricity', 'water', 'gas',
+    'bill', 'recharge', 'grocery', 'gym', 'fitness', 'subscription'
+}
+
 
 class SMSParser:
     def __init__(self):
-        # Regex patterns for common bank SMS formats (Indian context primarily based on user request context)
+        # Precompiled patterns with the prefilter keywords that route a message to them
+        # and their guards (DOTALL, as the patterns' \s can span lines)
         self.patterns = [
-            # Pattern 1: "Rs. <amount> spent on <card> at <merchant> on <date>"
-            r"(?i)(?:rs\.?|inr)\s*([\d,]+(?:\.\d{2})?)\s*(?:spent|debited|paid)\s*(?:on|using|via)?\s*(?:card|upi|wallet)?\s*.*?\s*(?:at|to)\s*([a-zA-Z0-9\s\.\-\&]+?)\s*(?:on|at)\s*(\d{2}[-/]\d{2}(?:[-/]\d{2,4})?)",
-            
-            # Pattern 2: "Debited: Rs. <amount> from A/c ... to <merchant>"
-            r"(?i)debited[:\s]*rs\.?\s*([\d,]+(?:\.\d{2})?).*?to\s*([a-zA-Z0-9\s\.\-\&]+?)(?:\s+on\s+|\.|$)",
-            
-            # Pattern 3: "Transaction of Rs. <amount> made at <merchant>"
-            r"(?i)transaction.*?rs\.?\s*([\d,]+(?:\.\d{2})?).*?at\s*([a-zA-Z0-9\s\.\-\&]+?)(?:\s+on\s+|\.|$)",
-             
-             # Pattern 4: "Paid Rs. <amount> to <merchant>"
-            r"(?i)paid\s*rs\.?\s*([\d,]+(?:\.\d{2})?)\s*to\s*([a-zA-Z0-9\s\.\-\&]+?)(?:\s+on\s+|\.|$)"
+            (re.compile(pattern), keywords, re.compile(guard, re.DOTALL) if guard else None)
+            for pattern, keywords, guard in PATTERN_SPECS
         ]
-        
+        self.trigger_keywords = tuple(dict.fromkeys(
+            keyword for _, keywords, _ in PATTERN_SPECS for keyword in keywords
+        ))
+
+        # Single alternation over every payment keyword so the text is scanned once
+        self.payment_method_rank = {}
+        for rank, (method, keywords) in enumerate(PAYMENT_METHOD_KEYWORDS):
+            for keyword in keywords:
+                self.payment_method_rank[keyword] = (rank, method)
+        self.payment_method_regex = re.compile(
+            "|".join(re.escape(keyword) for keyword in self.payment_method_rank)
+        )
+
         # Keywords to identify subscription-like merchants
         self.subscription_keywords = [
             'netflix', 'spotify', 'amazon prime', 'hotstar', 'youtube', 'apple', 'google one', 
@@ -35,9 +87,83 @@ class SMSParser:
             'groceries': ['bigbasket', 'blinkit', 'zepto', 'dmart', 'reliance fresh', 'grocery']
         }
 
-    def parse(self, sms_text: str) -> Dict[str, Any]:
+    # The keyword tables are exposed read-only; assigning a new table rebuilds the
+    # keyword index, so it is only rebuilt when the tables actually change.
+    @property
+    def category_keywords(self):
+        return self._category_keywords
+
+    @category_keywords.setter
+    def category_keywords(self, table: Dict[str, Iterable[str]]):
+        self._category_keywords = MappingProxyType({
+            category: tuple(keywords) for category, keywords in table.items()
+        })
+        self._keyword_index = None
+
+    @property
+    def subscription_keywords(self):
+        return self._subscription_keywords
+
+    @subscription_keywords.setter
+    def subscription_keywords(self, keywords: Iterable[str]):
+        self._subscription_keywords = tuple(keywords)
+        self._keyword_index = None
+
+    @property
+    def keyword_index(self) -> KeywordIndex:
+        if self._keyword_index is None:
+            self._keyword_index = self._build_keyword_index()
+        return self._keyword_index
+
+    def _build_keyword_index(self) -> KeywordIndex:
+        """
+        Indexes every category and subscription keyword. Each payload is
+        (category rank or None, is subscription keyword).
+        """
+        payloads = {}
+        for rank, keywords in enumerate(self._category_keywords.values()):
+            for keyword in keywords:
+                category_rank, is_subscription = payloads.get(keyword, (None, False))
+                payloads[keyword] = (rank if category_rank is None else category_rank, is_subscription)
+        for keyword in self._subscription_keywords:
+            category_rank, _ = payloads.get(keyword, (None, False))
+            payloads[keyword] = (category_rank, True)
+
+        self._category_names = [category.capitalize() for category in self._category_keywords]
+        return KeywordIndex(payloads)
+
+    def classify_merchant(self, merchant: str) -> Dict[str, Any]:
+        """
+        Finds the category, subscription flag and brand of a merchant with one
+        scan of its name.
+        """
+        merchant_lower = merchant.lower()
+        best_rank = None
+        is_subscription = False
+        brand = None
+        for start, keyword, (category_rank, subscription_keyword) in self.keyword_index.scan(merchant_lower):
+            if category_rank is not None and (best_rank is None or category_rank < best_rank):
+                best_rank = category_rank
+            is_subscription = is_subscription or subscription_keyword
+
+            # A brand must be a whole word (so "vi" is not found inside "movie")
+            if keyword in GENERIC_MERCHANT_KEYWORDS or (brand and len(brand) >= len(keyword)):
+                continue
+            end = start + len(keyword)
+            if (start == 0 or not merchant_lower[start - 1].isalnum()) and \
+                    (end == len(merchant_lower) or not merchant_lower[end].isalnum()):
+                brand = keyword
+
+        return {
+            'category': self._category_names[best_rank] if best_rank is not None else 'General',
+            'is_subscription': is_subscription,
+            'brand': brand.title() if brand else None
+        }
+
+    def parse(self, sms_text: str, sender: Optional[str] = None) -> Dict[str, Any]:
         """
         Parses the SMS text and returns a dictionary with extracted details.
+        When the sender ID has a bank-specific extractor it is tried first.
         """
         cleaned_text = sms_text.strip()
         data = {
@@ -46,13 +172,40 @@ class SMSParser:
             'date': datetime.now(), # Default to current time if date not found
             'category': 'General',
             'is_subscription': False,
+            'brand': None,
             'payment_method': 'Unknown'
         }
 
-        # 1. Extract Amount and Merchant
-        match_found = False
-        for pattern in self.patterns:
-            match = re.search(pattern, cleaned_text)
+        lower_text = cleaned_text.lower()
+
+        # 1. Extract Amount and Merchant, with the sender's bank-specific extractor if registered
+        extractor = get_extractor(sender)
+        extracted = extractor(cleaned_text) if extractor else None
+        if extracted:
+            data.update(extracted)
+        else:
+            self._extract_generic(cleaned_text, lower_text, data)
+        
+        # 2. Determine Category, Subscription and Brand in one pass over the merchant
+        if data['merchant']:
+            data.update(self.classify_merchant(data['merchant']))
+        
+        # 3. Determine Payment Method (one pass over the lowercased text)
+        if data['payment_method'] == 'Unknown':
+            data['payment_method'] = self._detect_payment_method(lower_text)
+            
+        return data
+
+    def _extract_generic(self, cleaned_text: str, lower_text: str, data: Dict[str, Any]):
+        """
+        Generic extraction: runs the regex cascade (only patterns whose keywords
+        are present and guard matches), falling back to the first amount in the text.
+        """
+        triggers = {keyword for keyword in self.trigger_keywords if keyword in lower_text}
+        for pattern, keywords, guard in self.patterns:
+            if not triggers.intersection(keywords) or (guard and not guard.search(lower_text)):
+                continue
+            match = pattern.search(cleaned_text)
             if match:
                 try:
                     amount_str = match.group(1).replace(',', '')
@@ -68,45 +221,31 @@ class SMSParser:
                          # For now, we keep the default 'now' or implement simple parsing
                          pass
                          
-                    match_found = True
-                    break
+                    return
                 except Exception as e:
                     print(f"Error parsing match: {e}")
                     continue
-        
-        if not match_found:
-             # Fallback: simple heuristic if regex fails
-             # Look for "Rs." and numbers
-             amount_match = re.search(r"(?:rs\.?|inr)\s*([\d,]+(?:\.\d{2})?)", cleaned_text, re.IGNORECASE)
-             if amount_match:
-                 data['amount'] = float(amount_match.group(1).replace(',', ''))
-        
-        # 2. Determine Category
-        if data['merchant']:
-            merchant_lower = data['merchant'].lower()
-            for category, keywords in self.category_keywords.items():
-                if any(keyword in merchant_lower for keyword in keywords):
-                    data['category'] = category.capitalize()
-                    break
-        
-        # 3. Check for Subscription
-        if data['merchant']:
-            merchant_lower = data['merchant'].lower()
-            if any(keyword in merchant_lower for keyword in self.subscription_keywords):
-                data['is_subscription'] = True
-                # Heuristic: If amount is standard subscription price (e.g., 199, 499, 999), it reinforces it
-                # For now, relying on merchant name
-        
-        # 4. Determine Payment Method (Simple keyword search)
-        lower_text = cleaned_text.lower()
-        if 'upi' in lower_text:
-            data['payment_method'] = 'UPI'
-        elif 'card' in lower_text or 'debit' in lower_text or 'credit' in lower_text:
-            data['payment_method'] = 'Card'
-        elif 'wallet' in lower_text or 'paytm' in lower_text or 'phonepe' in lower_text: # PhonePe/Paytm can be UPI too, but often wallet
-            data['payment_method'] = 'Wallet'
-            
-        return data
+
+        self._extract_fallback_amount(cleaned_text, data)
+
+    def _extract_fallback_amount(self, cleaned_text: str, data: Dict[str, Any]):
+        # Fallback: simple heuristic if regex fails
+        amount_match = FALLBACK_AMOUNT_PATTERN.search(cleaned_text)
+        if amount_match:
+            data['amount'] = float(amount_match.group(1).replace(',', ''))
+
+    def _detect_payment_method(self, lower_text: str) -> str:
+        """
+        Returns the highest precedence payment method mentioned in the text.
+        """
+        best = None
+        for match in self.payment_method_regex.finditer(lower_text):
+            rank, method = self.payment_method_rank[match.group(0)]
+            if rank == 0:
+                return method
+            if best is None or rank < best[0]:
+                best = (rank, method)
+        return best[1] if best else 'Unknown'
 
 # Example Usage
 if __name__ == "__main__":
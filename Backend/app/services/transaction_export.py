@@ -0,0 +1,145 @@
+import csv
+import io
+from typing import Any, Callable, Dict, Iterator, List
+
+from sqlalchemy.orm import Session
+
+from ..sql_models import Transaction
+from .transaction_queries import transaction_listing_query, filter_transactions
+
+EXPORT_FORMATS = ("csv", "parquet")
+EXPORT_COLUMNS = ("id", "user_id", "date", "amount", "type", "category", "merchant", "payment_method", "created_at")
+CSV_BATCH_SIZE = 5000
+# Rows per Parquet row group; larger groups compress and scan better
+PARQUET_BATCH_SIZE = 50000
+
+
+def _row_values(row) -> tuple:
+    return (row.id, row.user_id, row.date, row.amount, row.type, row.category_name,
+            row.merchant_name, row.payment_method, row.created_at)
+
+
+def iter_export_batches(session_factory: Callable[[], Session], filters: Dict[str, Any],
+                        batch_size: int) -> Iterator[List[tuple]]:
+    """
+    Streams the filtered transaction listing in batches of `batch_size` rows,
+    paged by id (`id > last_id ORDER BY id LIMIT batch_size`) so memory stays
+    flat however many rows match. Each batch is read in its own short
+    transaction, which ends before the batch is handed on: a slow download
+    never holds SQLite's shared lock and blocks writers. Opens its own
+    sessions: the request's session is closed before a streaming body is
+    consumed.
+    """
+    last_id = None
+    while True:
+        db = session_factory()
+        try:
+            # Primary-key order seeks to the next page through the rowid instead of sorting
+            query = filter_transactions(transaction_listing_query(db), **filters)
+            if last_id is not None:
+                query = query.filter(Transaction.id > last_id)
+            batch = [_row_values(row) for row in query.order_by(Transaction.id).limit(batch_size).all()]
+        finally:
+            db.close()
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_id = batch[-1][0]
+
+
+def stream_csv(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """
+    Header line, then one encoded chunk per batch.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        writer.writerows(
+            tuple(value.isoformat() if hasattr(value, "isoformat") else value for value in row)
+            for row in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands written bytes back to the generator
+    instead of keeping the whole file.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def parquet_available() -> bool:
+    return _load_pyarrow() is not None
+
+
+def stream_parquet(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """
+    Parquet file written one row group per batch. Requires pyarrow.
+    """
+    pa = _load_pyarrow()
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("date", pa.timestamp("us")),
+        ("amount", pa.float64()),
+        ("type", pa.string()),
+        ("category", pa.string()),
+        ("merchant", pa.string()),
+        ("payment_method", pa.string()),
+        ("created_at", pa.timestamp("us")),
+    ])
+    sink = _ChunkSink()
+    writer = pa.parquet.ParquetWriter(sink, schema)
+    try:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
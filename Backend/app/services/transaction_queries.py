@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session, Query
+
+from ..sql_models import Transaction, Category, PaymentMethod
+
+
+def transaction_listing_query(db: Session) -> Query:
+    """
+    Column-projected transactions joined with their category and payment method
+    names. Rows are plain tuples: one SELECT, no lazy loads and no identity map.
+    """
+    return db.query(
+        Transaction.id,
+        Transaction.user_id,
+        Transaction.amount,
+        Transaction.merchant_name,
+        Transaction.note,
+        Transaction.type,
+        Transaction.date,
+        Transaction.created_at,
+        Category.name.label("category_name"),
+        PaymentMethod.type.label("payment_method")
+    ).outerjoin(
+        Category, Category.id == Transaction.category_id
+    ).outerjoin(
+        PaymentMethod, PaymentMethod.id == Transaction.payment_method_id
+    )
+
+
+def filter_transactions(query: Query, user_id: Optional[int] = None, type_: Optional[str] = None,
+                        category: Optional[str] = None, start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None) -> Query:
+    """
+    Applies the listing filters to a `transaction_listing_query`.
+    `category` matches the category name; the date range is inclusive.
+    """
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+    if type_ is not None:
+        query = query.filter(Transaction.type == type_)
+    if category is not None:
+        query = query.filter(Category.name == category)
+    if start_date is not None:
+        query = query.filter(Transaction.date >= start_date)
+    if end_date is not None:
+        query = query.filter(Transaction.date <= end_date)
+    return query
+
+
+def list_transactions(db: Session, skip: int = 0, limit: int = 100, **filters) -> List[Any]:
+    """
+    Newest-first transaction rows matching `filter_transactions` filters.
+    """
+    query = filter_transactions(transaction_listing_query(db), **filters)
+    return query.order_by(desc(Transaction.date), desc(Transaction.id)).offset(skip).limit(limit).all()
+
+
+def serialize_transaction(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "amount": row.amount,
+        "merchant": row.merchant_name,
+        "note": row.note,
+        "category": row.category_name or "Uncategorized",
+        "payment_method": row.payment_method,
+        "type": row.type,
+        "date": row.date.isoformat() if row.date else None,
+        "created_at": row.created_at.isoformat() if row.created_at else None
+    }
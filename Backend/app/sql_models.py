@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Date, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Date, Text, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime
@@ -16,7 +16,7 @@ class User(Base):
     monthly_income = Column(Float)
     currency = Column(String, default="USD")
     is_premium_member = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     transactions = relationship("Transaction", back_populates="user")
@@ -48,8 +48,10 @@ class Transaction(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     amount = Column(Float)
     category_id = Column(Integer, ForeignKey("categories.id"))
+    merchant_name = Column(String, nullable=True)
+    payment_method_id = Column(Integer, ForeignKey("payment_methods.id"), nullable=True)
     note = Column(String, nullable=True)
-    date = Column(DateTime)
+    date = Column(DateTime, index=True)
     type = Column(String) # income, expense
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -116,7 +118,7 @@ class ActivityLog(Base):
     __tablename__ = "activity_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     action_type = Column(String)  # signup, purchase, transaction, login, etc.
     description = Column(String)
     meta_data = Column(String)  # JSON string for additional data
@@ -145,7 +147,7 @@ class Subscription(Base):
     category_id = Column(Integer, ForeignKey("categories.id"))
     payment_method_id = Column(Integer, ForeignKey("payment_methods.id"))
     status = Column(String, default="active")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     user = relationship("User", back_populates="subscriptions")
     category = relationship("Category", back_populates="subscriptions")
@@ -177,7 +179,7 @@ class CoinTransaction(Base):
     transaction_type = Column(String)  # earned, redeemed, bonus, etc.
     description = Column(String)
     rule_id = Column(Integer, ForeignKey("coin_rules.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     user = relationship("User", back_populates="coin_transactions")
     rule = relationship("CoinRule", backref="transactions")
@@ -192,10 +194,91 @@ class Notification(Base):
     notification_type = Column(String)  # info, warning, success, error
     is_read = Column(Boolean, default=False)
     link = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     user = relationship("User", back_populates="notifications")
 
 # Update User relationships
 User.coin_transactions = relationship("CoinTransaction", back_populates="user")
 User.notifications = relationship("Notification", back_populates="user")
+
+class SMSIngestJob(Base):
+    __tablename__ = "sms_ingest_queue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticket_id = Column(String, unique=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    sender = Column(String, nullable=True)
+    sms_text = Column(Text)
+    status = Column(String, default="queued", index=True)  # queued, processing, done, ignored, failed
+    claim_token = Column(String, nullable=True, index=True)  # Set by the worker that claimed the row
+    claimed_at = Column(DateTime, nullable=True)  # Start of the claim's lease
+    attempts = Column(Integer, default=0)
+    result = Column(Text, nullable=True)  # JSON string of the parsed data
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+
+class TransactionLeak(Base):
+    __tablename__ = "transaction_leaks"
+
+    transaction_id = Column(Integer, ForeignKey("transactions.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    severity = Column(String)  # medium, high
+    reason = Column(String)
+    detected_at = Column(DateTime, default=datetime.utcnow)
+
+class RecurringScanState(Base):
+    __tablename__ = "recurring_scan_state"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_transaction_id = Column(Integer, default=0, index=True)  # highest transaction id already scanned
+    scanned_at = Column(DateTime, default=datetime.utcnow)
+
+class UserCategoryMonthly(Base):
+    __tablename__ = "user_category_monthly"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    month = Column(String, primary_key=True)  # YYYY-MM
+    type = Column(String, primary_key=True)  # income, expense
+    category_id = Column(Integer, primary_key=True)  # 0 when uncategorized
+    total_amount = Column(Float, default=0.0)
+    transaction_count = Column(Integer, default=0)
+
+# Composite indexes for per-user listings paginated on (date/created_at, id);
+# SQLite appends the rowid (id) to every index entry
+Index("ix_transactions_user_date", Transaction.user_id, Transaction.date)
+Index("ix_coin_transactions_user_created_at", CoinTransaction.user_id, CoinTransaction.created_at)
+Index("ix_notifications_user_created_at", Notification.user_id, Notification.created_at)
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    transaction_count = Column(Integer, default=0)
+    total_spent = Column(Float, default=0.0)  # sum of expense transactions
+    active_subscriptions = Column(Integer, default=0)
+    subscription_cost = Column(Float, default=0.0)  # sum of active subscription amounts
+    last_activity_at = Column(DateTime, nullable=True)  # latest transaction date seen
+
+# Leaderboard reads: top users by all-time count and spend walk these indexes
+Index("ix_user_stats_transaction_count", UserStats.transaction_count)
+Index("ix_user_stats_total_spent", UserStats.total_spent)
+
+class DailyStats(Base):
+    __tablename__ = "daily_stats"
+
+    day = Column(String, primary_key=True)  # YYYY-MM-DD, "" for rows without a date
+    signups = Column(Integer, default=0)  # users created that day
+    premium_signups = Column(Integer, default=0)  # of those, users who are premium members now
+    transaction_count = Column(Integer, default=0)
+    expense_volume = Column(Float, default=0.0)  # sum of expense transactions dated that day
+    new_subscriptions = Column(Integer, default=0)  # active subscriptions created that day
+
+class UserDailyActivity(Base):
+    __tablename__ = "user_daily_activity"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(String, primary_key=True, index=True)  # YYYY-MM-DD of the transaction date
+    transaction_count = Column(Integer, default=0)
+    total_spent = Column(Float, default=0.0)  # sum of expense transactions
@@ -0,0 +1,159 @@
+"""
+Offline backfill of a user's SMS export into transactions, categories and subscriptions.
+
+Usage (from project root):
+    python backfill_sms.py export.ndjson
+    python backfill_sms.py export.csv --user-id 7 --workers 4 --chunk-size 2000
+
+Each record needs the SMS text in `sms_text` (or `body`) and may carry `sender`,
+`user_id` and a `timestamp` (epoch seconds/milliseconds) or ISO `date`.
+The file is streamed and at most a few chunks are in flight at any time, so
+memory stays flat regardless of the archive size.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from Backend.app.database import SessionLocal, engine
+from Backend.app import sql_models as models
+from Backend.app.services.sms_parser import SMSParser
+from Backend.app.services.sms_ingest import store_parsed_messages
+
+# Create tables if they don't exist
+models.Base.metadata.create_all(bind=engine)
+
+_parser = None
+
+
+def _init_worker():
+    global _parser
+    _parser = SMSParser()
+
+
+def _record_date(record):
+    timestamp = record.get("timestamp")
+    if timestamp not in (None, ""):
+        timestamp = float(timestamp)
+        if timestamp > 1e12:  # milliseconds
+            timestamp /= 1000.0
+        return datetime.fromtimestamp(timestamp)
+    if record.get("date"):
+        return datetime.fromisoformat(record["date"])
+    return None
+
+
+def parse_chunk(records):
+    """
+    Runs in a worker process. Returns (items, ignored, failed) where items are
+    (user_id, parsed_data) pairs ready for store_parsed_messages.
+    """
+    items = []
+    ignored = 0
+    failed = 0
+    for record in records:
+        try:
+            text = record.get("sms_text") or record.get("body") or ""
+            parsed_data = _parser.parse(text, sender=record.get("sender"))
+            if parsed_data['amount'] == 0:
+                ignored += 1
+                continue
+            date = _record_date(record)
+            if date:
+                parsed_data['date'] = date
+            items.append((int(record["user_id"]), parsed_data))
+        except Exception:
+            failed += 1
+    return items, ignored, failed
+
+
+def read_records(path, default_user_id=None):
+    """
+    Streams records from an NDJSON or CSV file one at a time.
+    """
+    is_csv = os.path.splitext(path)[1].lower() == ".csv"
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f) if is_csv else (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            if default_user_id is not None and not row.get("user_id"):
+                row["user_id"] = default_user_id
+            yield row
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def backfill(path, user_id=None, workers=None, chunk_size=1000):
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    stats = {"messages": 0, "stored": 0, "ignored": 0, "failed": 0}
+    started = time.perf_counter()
+    db = SessionLocal()
+
+    def write(result):
+        items, ignored, failed = result
+        stats["messages"] += len(items) + ignored + failed
+        stats["ignored"] += ignored
+        stats["failed"] += failed
+        try:
+            stats["stored"] += store_parsed_messages(db, items)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            stats["failed"] += len(items)
+            print(f"Chunk write failed: {e}")
+
+        elapsed = time.perf_counter() - started
+        print(f"{stats['messages']} messages, {stats['messages'] / elapsed:,.0f} msg/s, "
+              f"{stats['failed']} failed", end="\r")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            pending = []
+            for chunk in chunked(read_records(path, user_id), chunk_size):
+                pending.append(pool.submit(parse_chunk, chunk))
+                # Bound the chunks in flight so the reader never runs ahead of the writer
+                if len(pending) >= max_in_flight:
+                    write(pending.pop(0).result())
+            for future in pending:
+                write(future.result())
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print()
+    print(f"Processed {stats['messages']} messages in {elapsed:.1f}s "
+          f"({stats['messages'] / elapsed if elapsed else 0:,.0f} msg/s)")
+    print(f"Stored: {stats['stored']}  Ignored: {stats['ignored']}  Failed: {stats['failed']}")
+    return stats
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Backfill transactions from an SMS archive (NDJSON or CSV).")
+    arg_parser.add_argument("path", help="Path to the .ndjson/.jsonl or .csv export")
+    arg_parser.add_argument("--user-id", type=int, help="User id for records that do not carry one")
+    arg_parser.add_argument("--workers", type=int, help="Parser processes (default: CPU count)")
+    arg_parser.add_argument("--chunk-size", type=int, default=1000, help="Messages per parse/insert chunk")
+    args = arg_parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"Error: archive not found at {args.path}")
+        sys.exit(1)
+
+    backfill(args.path, user_id=args.user_id, workers=args.workers, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark for the vectorized leak scan on a synthetic transactions table.
+
+Usage (from project root):
+    python benchmarks/bench_leak_scan.py [rows] [reference_users]
+
+The table is built in a temporary SQLite file. The row-by-row LeakDetector is
+run over the first `reference_users` users to check that both engines flag the
+same transactions and to extrapolate its time for the full table.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Backend.app.database import Base
+from Backend.app import sql_models  # noqa: F401  (registers the tables)
+from Backend.app.services.leak_detector import LeakDetector, LeakStateStore, UserLeakState
+from Backend.app.services.leak_scan import (
+    SEVERITY_NONE, SEVERITY_MEDIUM, SEVERITY_HIGH,
+    load_transaction_columns, evaluate_leak_rules, write_leak_flags,
+)
+
+CATEGORIES = ["Food", "Shopping", "Subscriptions", "Transport", "Bills"]
+FOOD_MERCHANTS = ["Swiggy", "Zomato", "Starbucks", "Dominos", "McDonalds"]
+SUBSCRIPTION_MERCHANTS = ["Netflix", "Spotify", "Prime", "Hotstar", "Youtube Premium"]
+OTHER_MERCHANTS = ["Amazon", "Flipkart", "Uber", "Ola", "Airtel", "Jio", "Myntra"]
+
+
+def build_table(path, rows, seed=42):
+    """Writes `rows` synthetic transactions (~200 per user over a year)."""
+    rng = np.random.default_rng(seed)
+    users = max(rows // 200, 1)
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO users (id, email) VALUES (?, ?)",
+                     [(i, f"user{i}@example.com") for i in range(1, users + 1)])
+    conn.executemany("INSERT INTO categories (id, name, type, is_default) VALUES (?, ?, 'expense', 1)",
+                     list(enumerate(CATEGORIES, start=1)))
+
+    user_id = rng.integers(1, users + 1, rows)
+    kind = rng.choice(3, rows, p=[0.45, 0.1, 0.45])  # food, subscription, other
+    start = datetime(2024, 1, 1).timestamp()
+    ts = start + rng.integers(0, 365 * 86400, rows)
+
+    amount = np.where(kind == 0, rng.integers(40, 800, rows), rng.integers(100, 5000, rows)).astype(float)
+    merchant_index = rng.integers(0, 5, rows)
+    # Subscriptions: a fixed price per (user, merchant) with occasional hikes
+    base_price = 99.0 + (user_id * 7 + merchant_index * 50) % 500
+    amount = np.where(kind == 1, base_price + 50 * (rng.random(rows) < 0.05), amount)
+
+    category_id = np.where(kind == 0, 1, np.where(kind == 1, 3, rng.choice([2, 4, 5], rows)))
+    merchant = np.where(kind == 0, np.array(FOOD_MERCHANTS)[merchant_index],
+                        np.where(kind == 1, np.array(SUBSCRIPTION_MERCHANTS)[merchant_index],
+                                 np.array(OTHER_MERCHANTS)[rng.integers(0, len(OTHER_MERCHANTS), rows)]))
+    dates = np.datetime_as_string(ts.astype("datetime64[s]"), unit="s")
+
+    batch = 200_000
+    for offset in range(0, rows, batch):
+        window = slice(offset, offset + batch)
+        conn.executemany(
+            "INSERT INTO transactions (user_id, amount, category_id, merchant_name, date, type) "
+            "VALUES (?, ?, ?, ?, ?, 'expense')",
+            zip(user_id[window].tolist(), amount[window].tolist(), category_id[window].tolist(),
+                merchant[window].tolist(), [d.replace("T", " ") for d in dates[window].tolist()])
+        )
+    conn.commit()
+    conn.close()
+
+
+def reference_scan(columns, max_user):
+    """Row-by-row LeakDetector in date order for users up to `max_user`."""
+    class EmptyStore(LeakStateStore):
+        def load_user(self, db, user_id):
+            return UserLeakState()
+
+    store = EmptyStore()
+    detector = LeakDetector(state=store)
+
+    rows = np.flatnonzero(columns["user_id"] <= max_user)
+    rows = rows[np.lexsort((columns["id"][rows], columns["ts"][rows]))]
+    flagged = {}
+    for row in rows.tolist():
+        transaction = {
+            "amount": float(columns["amount"][row]),
+            "category": "Food" if columns["is_food"][row] else None,
+            "merchant": columns["merchant"][row],
+            "is_subscription": bool(columns["is_subscription"][row]),
+            "date": datetime.utcfromtimestamp(int(columns["ts"][row]))
+        }
+        user_id = int(columns["user_id"][row])
+        result = detector.detect(transaction, user_id, None)
+        if result["is_leak"]:
+            flagged[int(columns["id"][row])] = SEVERITY_HIGH if result["leak_severity"] == "high" else SEVERITY_MEDIUM
+        store.record(user_id, transaction)
+    return flagged, len(rows)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    reference_users = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        started = time.perf_counter()
+        build_table(path, rows)
+        print(f"Built {rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+        engine = create_engine(f"sqlite:///{path}")
+        db = sessionmaker(bind=engine)()
+        try:
+            started = time.perf_counter()
+            columns = load_transaction_columns(db)
+            loaded = time.perf_counter()
+            flags = evaluate_leak_rules(columns)
+            evaluated = time.perf_counter()
+            flagged = write_leak_flags(db, columns, flags)
+            db.commit()
+            written = time.perf_counter()
+        finally:
+            db.close()
+            engine.dispose()
+
+        expected, reference_rows = {}, 0
+        reference_seconds = 0.0
+        if reference_users:
+            started_reference = time.perf_counter()
+            expected, reference_rows = reference_scan(columns, reference_users)
+            reference_seconds = time.perf_counter() - started_reference
+
+        subset = np.flatnonzero((columns["user_id"] <= reference_users) & (flags["severity"] != SEVERITY_NONE))
+        actual = dict(zip(columns["id"][subset].tolist(), flags["severity"][subset].tolist()))
+
+    total = written - started
+    print(f"Load:             {loaded - started:.2f}s")
+    print(f"Evaluate:         {evaluated - loaded:.2f}s")
+    print(f"Write:            {written - evaluated:.2f}s ({flagged:,} flagged)")
+    print(f"Vectorized scan:  {total:.2f}s ({rows / total:,.0f} rows/s)")
+    if reference_rows:
+        rate = reference_rows / reference_seconds
+        print(f"Row-by-row:       {rate:,.0f} rows/s over {reference_rows:,} rows "
+              f"(~{rows / rate:.1f}s projected, rules only)")
+        print(f"Mismatches:       {len(set(actual.items()) ^ set(expected.items()))}")
+
+
+if __name__ == "__main__":
+    main()
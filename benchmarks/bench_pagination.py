@@ -0,0 +1,84 @@
+"""
+Latency of deep pages of the admin transaction listing: offset/limit versus
+keyset (cursor) pagination.
+
+Usage (from project root):
+    python benchmarks/bench_pagination.py [rows] [page_size]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Backend.app.database import Base
+from Backend.app.sql_models import Transaction
+from Backend.app.services.pagination import encode_cursor, keyset_page
+from Backend.app.services.transaction_queries import list_transactions, transaction_listing_query
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        start = datetime(2020, 1, 1)
+        with engine.begin() as conn:
+            batch = 100_000
+            for offset in range(0, rows, batch):
+                conn.execute(Transaction.__table__.insert(), [
+                    {
+                        "user_id": i % 1000 + 1,
+                        "amount": float(i % 900 + 10),
+                        "date": start + timedelta(minutes=i // 3),  # duplicate dates exercise the id tie-breaker
+                        "type": "expense"
+                    }
+                    for i in range(offset, min(offset + batch, rows))
+                ])
+
+        db = sessionmaker(bind=engine)()
+        print(f"{rows:,} transactions, {page_size} per page")
+        print(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10}")
+        for page in (1, 10, 100, 1000, 10000):
+            skip = (page - 1) * page_size
+            if skip >= rows:
+                break
+            cursor = ""
+            if skip:
+                # The cursor a client would hold after reading the previous page
+                last = transaction_listing_query(db).order_by(
+                    Transaction.date.desc(), Transaction.id.desc()
+                ).offset(skip - 1).limit(1).one()
+                cursor = encode_cursor(last.date, last.id)
+
+            offset_rows = list_transactions(db, skip=skip, limit=page_size)
+            keyset_rows, _ = keyset_page(transaction_listing_query(db), Transaction.date, Transaction.id,
+                                         cursor, page_size, "date")
+            assert [row.id for row in keyset_rows] == [row.id for row in offset_rows]
+
+            offset_ms = best_of(lambda: list_transactions(db, skip=skip, limit=page_size))
+            keyset_ms = best_of(lambda: keyset_page(transaction_listing_query(db), Transaction.date,
+                                                    Transaction.id, cursor, page_size, "date"))
+            print(f"{page:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
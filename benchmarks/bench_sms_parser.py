@@ -0,0 +1,123 @@
+"""
+Throughput benchmark for SMSParser.parse against the previous regex cascade,
+over the mixed corpus and per message format (where the difference between
+the two lies: formats no pattern can match skip the cascade, and the guarded
+pattern 1 no longer backtracks through long UPI alerts).
+
+Usage (from project root):
+    python benchmarks/bench_sms_parser.py [corpus_size]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Backend.app.services.sms_parser import SMSParser, PATTERN_SPECS
+from sms_corpus import TEMPLATES, generate_format_corpus, generate_sms_corpus
+
+
+class LegacySMSParser(SMSParser):
+    """
+    The original parser: every uncompiled pattern tried in sequence, then
+    separate substring scans for the payment method.
+    """
+    def __init__(self):
+        super().__init__()
+        self.legacy_patterns = [pattern for pattern, _, _ in PATTERN_SPECS]
+
+    def parse(self, sms_text):
+        cleaned_text = sms_text.strip()
+        data = {
+            'amount': 0.0,
+            'merchant': None,
+            'category': 'General',
+            'is_subscription': False,
+            'payment_method': 'Unknown'
+        }
+
+        match_found = False
+        for pattern in self.legacy_patterns:
+            match = re.search(pattern, cleaned_text)
+            if match:
+                data['amount'] = float(match.group(1).replace(',', ''))
+                data['merchant'] = match.group(2).strip()
+                match_found = True
+                break
+
+        if not match_found:
+            amount_match = re.search(r"(?:rs\.?|inr)\s*([\d,]+(?:\.\d{2})?)", cleaned_text, re.IGNORECASE)
+            if amount_match:
+                data['amount'] = float(amount_match.group(1).replace(',', ''))
+
+        if data['merchant']:
+            merchant_lower = data['merchant'].lower()
+            for category, keywords in self.category_keywords.items():
+                if any(keyword in merchant_lower for keyword in keywords):
+                    data['category'] = category.capitalize()
+                    break
+
+        if data['merchant']:
+            merchant_lower = data['merchant'].lower()
+            if any(keyword in merchant_lower for keyword in self.subscription_keywords):
+                data['is_subscription'] = True
+
+        lower_text = cleaned_text.lower()
+        if 'upi' in lower_text:
+            data['payment_method'] = 'UPI'
+        elif 'card' in lower_text or 'debit' in lower_text or 'credit' in lower_text:
+            data['payment_method'] = 'Card'
+        elif 'wallet' in lower_text or 'paytm' in lower_text or 'phonepe' in lower_text:
+            data['payment_method'] = 'Wallet'
+
+        return data
+
+
+def run(parser, messages, repeat=3):
+    """Returns the best messages/second over `repeat` runs."""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in messages:
+            parser.parse(text)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(messages) / elapsed)
+    return best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    messages = [text for _, text in generate_sms_corpus(size)]
+
+    legacy = LegacySMSParser()
+    current = SMSParser()
+
+    # Sanity check: both parsers must agree on every message
+    fields = ('amount', 'merchant', 'category', 'is_subscription', 'payment_method')
+    mismatches = 0
+    for text in messages:
+        old, new = legacy.parse(text), current.parse(text)
+        if any(old[field] != new[field] for field in fields):
+            mismatches += 1
+
+    legacy_rate = run(legacy, messages)
+    current_rate = run(current, messages)
+
+    print(f"Corpus size:      {size} messages")
+    print(f"Mismatches:       {mismatches}")
+    print(f"Legacy parser:    {legacy_rate:,.0f} msg/s")
+    print(f"Compiled parser:  {current_rate:,.0f} msg/s")
+    print(f"Speedup:          {current_rate / legacy_rate:.2f}x")
+
+    print("\nPer format (us/msg, legacy -> compiled):")
+    for template in TEMPLATES:
+        sample = generate_format_corpus(template, 2000)
+        legacy_us = 1e6 / run(legacy, sample)
+        current_us = 1e6 / run(current, sample)
+        print(f"  {legacy_us:6.1f} -> {current_us:5.1f}  {legacy_us / current_us:4.1f}x  {template[:50]}")
+
+
+if __name__ == "__main__":
+    main()
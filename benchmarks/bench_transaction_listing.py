@@ -0,0 +1,101 @@
+"""
+Statements and time per transaction listing: ORM objects with lazy-loaded
+categories versus the joined, column-projected query layer.
+
+Usage (from project root):
+    python benchmarks/bench_transaction_listing.py [rows] [limit]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, desc, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Backend.app.database import Base
+from Backend.app.sql_models import Transaction
+from Backend.app.services.transaction_queries import list_transactions, serialize_transaction
+
+
+def legacy_listing(db, limit):
+    """The previous admin listing: one SELECT plus one per distinct category."""
+    result = []
+    for tx in db.query(Transaction).order_by(desc(Transaction.date)).limit(limit).all():
+        result.append({
+            "id": tx.id,
+            "user_id": tx.user_id,
+            "amount": tx.amount,
+            "merchant": tx.merchant_name,
+            "category": tx.category.name if tx.category else "Uncategorized",
+            "type": tx.type,
+            "date": tx.date.isoformat() if tx.date else None,
+            "created_at": tx.created_at.isoformat() if tx.created_at else None
+        })
+    return result
+
+
+def measure(engine, listing, repeat=5):
+    """Returns (statements per call, best seconds per call)."""
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    best = float("inf")
+    counts = set()
+    for _ in range(repeat):
+        db = sessionmaker(bind=engine)()
+        del statements[:]
+        started = time.perf_counter()
+        listing(db)
+        best = min(best, time.perf_counter() - started)
+        counts.add(len(statements))
+        db.close()
+    event.remove(engine, "before_cursor_execute", count)
+    return max(counts), best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        start = datetime(2024, 1, 1)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO categories (id, name, type, color) VALUES " +
+                ", ".join(f"({i}, 'Category {i}', 'expense', '#CCCCCC')" for i in range(1, 501))
+            )
+            conn.execute(Transaction.__table__.insert(), [
+                {
+                    "user_id": i % 100 + 1,
+                    "amount": float(i % 900 + 10),
+                    "category_id": i % 500 + 1,
+                    "merchant_name": f"Merchant {i % 50}",
+                    "date": start + timedelta(minutes=i),
+                    "type": "expense"
+                }
+                for i in range(rows)
+            ])
+
+        legacy_statements, legacy_seconds = measure(engine, lambda db: legacy_listing(db, limit))
+        joined_statements, joined_seconds = measure(
+            engine, lambda db: [serialize_transaction(row) for row in list_transactions(db, limit=limit)]
+        )
+        engine.dispose()
+
+    print(f"Listing {limit} of {rows:,} transactions")
+    print(f"Lazy-loaded ORM:  {legacy_statements} statements, {legacy_seconds * 1000:.1f} ms")
+    print(f"Joined query:     {joined_statements} statements, {joined_seconds * 1000:.1f} ms")
+    assert joined_statements == 1, "listing must be a single statement"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Synthetic bank SMS corpus shared by the benchmark scripts.
+"""
+import random
+
+SENDERS = ['HDFCBK', 'SBIINB', 'ICICIB', 'AXISBK', 'KOTAKB', 'PAYTMB']
+
+MERCHANTS = [
+    'Swiggy', 'Zomato', 'Starbucks Coffee', 'Uber', 'Ola Cabs', 'Shell Petrol', 'Amazon',
+    'Flipkart', 'Myntra', 'Netflix', 'Spotify', 'Hotstar', 'PVR Cinemas', 'BookMyShow',
+    'Airtel Recharge', 'Jio Prepaid', 'BESCOM Electricity', 'BigBasket', 'Blinkit', 'DMart',
+    'Cult Fitness Gym', 'Adobe Systems', 'Local Store', 'Corner Cafe', 'Dominos Pizza',
+]
+
+TEMPLATES = [
+    "Rs.{amount} spent on card XX{card} at {merchant} on {date}. Avl bal Rs.{balance}",
+    "INR {amount} debited via UPI to {merchant} on {date}. Ref {ref}",
+    "Debited: Rs. {amount} from A/c XX{card} to {merchant} on {date}",
+    "Transaction of Rs. {amount} made at {merchant} on {date} using Credit Card XX{card}",
+    "Paid Rs. {amount} to {merchant} using UPI on {date}",
+    "Paid Rs. {amount} to {merchant} via Paytm wallet",
+    "Your a/c XX{card} is credited with INR {amount} on {date}. Info: NEFT-{ref}",
+    "OTP for your transaction is {ref}. Do not share it with anyone.",
+    "Dear customer, your {merchant} order has been shipped.",
+    # Full-length formats as banks actually send them, plus the OTP/promotional
+    # noise that makes up a large part of a real inbox
+    "Rs.{amount} debited from a/c **{card} on {date} to VPA {merchant} (UPI Ref No {ref}). "
+    "Not you? Call 18002586161 to block UPI. -HDFC Bank",
+    "Dear Customer, Rs.{amount} spent on your SBI Credit Card ending {card} at {merchant} on {date}. "
+    "Trxn not done by you? Report at sbicard.com/Dispute",
+    "Your OTP for login is {ref}. It is valid for 10 minutes. Do not share this OTP with anyone "
+    "for security reasons. -ICICI Bank",
+    "Congratulations! You are pre-approved for a personal loan of up to Rs {balance} at attractive "
+    "interest rates. Apply now at https://bit.ly/pl{ref} T&C apply",
+]
+
+
+def render_sms(template: str, rng: random.Random) -> str:
+    return template.format(
+        amount=f"{rng.randint(10, 25000):,}.{rng.randint(0, 99):02d}",
+        merchant=rng.choice(MERCHANTS),
+        card=rng.randint(1000, 9999),
+        date=f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.choice([24, 25])}",
+        balance=f"{rng.randint(1000, 500000):,}.00",
+        ref=rng.randint(100000, 999999),
+    )
+
+
+def generate_sms_corpus(size: int, seed: int = 42):
+    """
+    Returns a list of (sender, sms_text) tuples drawn from the templates above.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        template = rng.choice(TEMPLATES)
+        text = render_sms(template, rng)
+        corpus.append((rng.choice(SENDERS), text))
+    return corpus
+
+
+def generate_format_corpus(template: str, size: int, seed: int = 42):
+    """
+    Returns `size` messages of a single template, for per-format timings.
+    """
+    rng = random.Random(seed)
+    return [render_sms(template, rng) for _ in range(size)]
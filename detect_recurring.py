@@ -0,0 +1,29 @@
+"""
+Recurring payment detection: estimates billing periods from transaction
+history and creates or updates subscriptions. Only users with transactions
+added since the previous run are scanned, so it is cheap to run often.
+
+Usage (from project root):
+    python detect_recurring.py
+"""
+from Backend.app.database import SessionLocal, engine
+from Backend.app import sql_models as models
+from Backend.app.services.recurring_detector import run_recurring_scan
+
+# Create tables if they don't exist
+models.Base.metadata.create_all(bind=engine)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        stats = run_recurring_scan(db)
+    finally:
+        db.close()
+
+    print(f"Scanned {stats['users']} users: {stats['created']} subscriptions created, "
+          f"{stats['updated']} updated")
+
+
+if __name__ == "__main__":
+    main()
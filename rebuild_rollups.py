@@ -0,0 +1,41 @@
+"""
+Recomputes the materialized rollups from the source tables. They are kept
+current on every write, and empty ones are filled when the app starts; run
+this after bulk edits made outside the app or if they ever drift. daily_stats is global, so it is only rebuilt without
+--user-id.
+
+Usage (from project root):
+    python rebuild_rollups.py
+    python rebuild_rollups.py --user-id 7
+"""
+import argparse
+
+from Backend.app.database import SessionLocal, engine
+from Backend.app import sql_models as models
+from Backend.app.services.rollups import rebuild_rollups
+from Backend.app.services.daily_stats import rebuild_daily_stats
+
+# Create tables if they don't exist
+models.Base.metadata.create_all(bind=engine)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Rebuild the transaction rollup tables.")
+    arg_parser.add_argument("--user-id", type=int, help="Only rebuild this user's rollups")
+    args = arg_parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        counts = rebuild_rollups(db, user_id=args.user_id)
+        if args.user_id is None:
+            counts["daily_stats"] = rebuild_daily_stats(db)
+        db.commit()
+    finally:
+        db.close()
+
+    for table, rows in counts.items():
+        print(f"{table}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
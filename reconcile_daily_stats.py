@@ -0,0 +1,41 @@
+"""
+Checks the daily_stats buckets behind the admin dashboard against the users,
+transactions and subscriptions tables and reports the days that disagree.
+Run it nightly; pass --repair to rewrite the drifted days.
+
+Usage (from project root):
+    python reconcile_daily_stats.py
+    python reconcile_daily_stats.py --repair
+"""
+import argparse
+import sys
+
+from Backend.app.database import SessionLocal, engine
+from Backend.app import sql_models as models
+from Backend.app.services.daily_stats import reconcile_daily_stats
+
+# Create tables if they don't exist
+models.Base.metadata.create_all(bind=engine)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Reconcile daily_stats with the source tables.")
+    arg_parser.add_argument("--repair", action="store_true", help="Rewrite the days that disagree")
+    args = arg_parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        mismatches = reconcile_daily_stats(db, repair=args.repair)
+        db.commit()
+    finally:
+        db.close()
+
+    for mismatch in mismatches:
+        print(f"{mismatch['day'] or '(no date)'}: expected {mismatch['expected']}, stored {mismatch['stored']}")
+    print(f"{len(mismatches)} day(s) out of sync" + (", repaired" if args.repair and mismatches else ""))
+    if mismatches and not args.repair:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
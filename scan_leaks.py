@@ -0,0 +1,30 @@
+"""
+Nightly leak scan: re-runs the LeakDetector rules over every user's full
+history and rewrites the transaction_leaks table.
+
+Usage (from project root):
+    python scan_leaks.py
+"""
+from Backend.app.database import SessionLocal, engine
+from Backend.app import sql_models as models
+from Backend.app.services.leak_scan import run_leak_scan
+
+# Create tables if they don't exist
+models.Base.metadata.create_all(bind=engine)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        stats = run_leak_scan(db)
+    finally:
+        db.close()
+
+    print(f"Scanned {stats['transactions']} transactions, flagged {stats['flagged']} "
+          f"({stats['small_food']} small food, {stats['price_hikes']} price hikes)")
+    print(f"Load {stats['load_seconds']}s  Evaluate {stats['evaluate_seconds']}s  "
+          f"Write {stats['write_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,37 @@ import '../../core/constants/api_constants.dart';
 class HomeService {
   final Dio _dio;
 
+  // Last payload and ETag per user, revalidated with If-None-Match
+  final Map<int, String> _etags = {};
+  final Map<int, Map<String, dynamic>> _cachedData = {};
+
   HomeService(this._dio);
 
   Future<Map<String, dynamic>> getHomeData(int userId) async {
     try {
+      final etag = _etags[userId];
       final response = await _dio.get(
         ApiConstants.home,
         queryParameters: {'user_id': userId},
+        options: Options(
+          headers: {
+            if (etag != null && _cachedData.containsKey(userId)) 'If-None-Match': etag,
+          },
+          validateStatus: (status) => status != null && (status < 300 || status == 304),
+        ),
       );
-      return response.data;
+
+      if (response.statusCode == 304) {
+        return _cachedData[userId]!;
+      }
+
+      final data = Map<String, dynamic>.from(response.data);
+      final newEtag = response.headers.value('etag');
+      if (newEtag != null) {
+        _etags[userId] = newEtag;
+        _cachedData[userId] = data;
+      }
+      return data;
     } catch (e) {
       // If mobile/home endpoint is not ready, fallback to fetching profile + transactions separately
       // For now, rethrow
@@ -0,0 +1,86 @@
+"""
+Cohort retention counts engagement only: the signup row every registered user
+gets in activity_logs must not make them retained, and each summary figure
+must read the week its label names (week 0 is the signup week).
+
+Usage (from project root):
+    python -m pytest tests
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Backend.app.database import Base
+from Backend.app.services.cohorts import RETENTION_WEEKS, CohortCache, cohort_analysis
+from Backend.app.sql_models import ActivityLog, Transaction, User
+
+SIGNUP = datetime(2024, 3, 4, 9, 0)
+NOW = datetime(2024, 6, 28)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cohorts.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield engine, session
+    session.close()
+    engine.dispose()
+
+
+def add_user(engine, user_id, activity=(), transactions=()):
+    """A user who signed up at SIGNUP, with activity as (action_type, days after signup)."""
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), {
+            "id": user_id, "email": f"user{user_id}@example.com", "full_name": f"User {user_id}",
+            "created_at": SIGNUP
+        })
+        conn.execute(ActivityLog.__table__.insert(), [
+            {"user_id": user_id, "action_type": action, "description": action,
+             "created_at": SIGNUP + timedelta(days=days)}
+            for action, days in [("signup", 0), *activity]
+        ])
+        if transactions:
+            conn.execute(Transaction.__table__.insert(), [
+                {"user_id": user_id, "amount": 10.0, "type": "expense", "date": SIGNUP + timedelta(days=days),
+                 "created_at": SIGNUP + timedelta(days=days)}
+                for days in transactions
+            ])
+
+
+def test_signup_only_user_is_not_retained(db):
+    engine, session = db
+    add_user(engine, 1)
+
+    result = cohort_analysis(session, now=NOW, cache=CohortCache())
+
+    cohort, = result["cohorts"]
+    assert cohort["size"] == 1
+    assert len(cohort["retention"]) == RETENTION_WEEKS
+    assert cohort["retention"] == [0.0] * RETENTION_WEEKS
+    assert result["summary"]["avg_retention_week_1"] == 0.0
+
+
+def test_summary_weeks_match_their_labels(db):
+    engine, session = db
+    add_user(engine, 1)
+    # Day 2 is week 0, day 8 week 1, day 30 week 4 and day 86 week 12
+    add_user(engine, 2, activity=[("login", 2), ("login", 30)], transactions=[8])
+    add_user(engine, 3, transactions=[86])
+
+    result = cohort_analysis(session, now=NOW, cache=CohortCache())
+
+    summary = result["summary"]
+    assert summary["avg_retention_week_1"] == 33.3
+    assert summary["avg_retention_week_4"] == 33.3
+    assert summary["avg_retention_week_12"] == 33.3
+    assert summary["best_cohort"] == "2024-03"
+    retention = result["cohorts"][0]["retention"]
+    assert retention[0] == retention[3] == retention[11] == 33.3
+    assert retention[1] == 0.0
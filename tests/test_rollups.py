@@ -0,0 +1,110 @@
+"""
+The before_flush hook must keep user_category_monthly, user_stats,
+user_daily_activity and daily_stats equal to a rebuild from the source tables
+through ORM inserts, updates and deletes.
+
+Usage (from project root):
+    python -m pytest tests
+"""
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Backend.app.database import Base
+from Backend.app.services.daily_stats import rebuild_daily_stats, reconcile_daily_stats
+from Backend.app.services.rollups import rebuild_rollups
+from Backend.app.sql_models import (
+    Category, DailyStats, Subscription, Transaction, User, UserCategoryMonthly, UserDailyActivity, UserStats
+)
+
+# Rollup table -> (key columns, value columns). user_stats.last_activity_at is
+# the latest date ever seen, so deletes do not move it back; it is not compared.
+SNAPSHOTS = {
+    UserCategoryMonthly: (("user_id", "month", "type", "category_id"), ("total_amount", "transaction_count")),
+    UserStats: (("user_id",), ("transaction_count", "total_spent", "active_subscriptions", "subscription_cost")),
+    UserDailyActivity: (("user_id", "day"), ("transaction_count", "total_spent")),
+    DailyStats: (("day",), ("signups", "premium_signups", "transaction_count", "expense_volume",
+                            "new_subscriptions")),
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def snapshot(db):
+    """
+    Rows of every rollup table, floats rounded and all-zero rows dropped: the
+    hook leaves a zeroed row behind where a rebuild writes none.
+    """
+    tables = {}
+    for model, (keys, values) in SNAPSHOTS.items():
+        rows = db.query(*[getattr(model, column) for column in keys + values]).all()
+        tables[model.__tablename__] = {
+            tuple(row[:len(keys)]) + tuple(round(value or 0, 6) for value in row[len(keys):])
+            for row in rows
+            if any(row[len(keys):])
+        }
+    return tables
+
+
+def assert_matches_rebuild(db):
+    db.commit()
+    assert reconcile_daily_stats(db) == []
+    incremental = snapshot(db)
+    rebuild_rollups(db)
+    rebuild_daily_stats(db)
+    rebuilt = snapshot(db)
+    db.rollback()
+    assert incremental == rebuilt
+
+
+def test_hook_matches_rebuild(db):
+    db.add_all([
+        Category(id=1, name="Food", type="expense"),
+        Category(id=2, name="Travel", type="expense"),
+        User(id=1, email="a@example.com", full_name="A", created_at=datetime(2024, 1, 5, 10, 0)),
+        User(id=2, email="b@example.com", full_name="B", is_premium_member=True,
+             created_at=datetime(2024, 1, 6, 12, 0)),
+    ])
+    db.flush()
+    transactions = [
+        Transaction(user_id=1, amount=12.5, category_id=1, type="expense", date=datetime(2024, 1, 31, 23, 0)),
+        Transaction(user_id=1, amount=40.0, category_id=2, type="expense", date=datetime(2024, 2, 1, 8, 0)),
+        Transaction(user_id=1, amount=900.0, category_id=None, type="income", date=datetime(2024, 2, 1, 9, 0)),
+        Transaction(user_id=2, amount=7.25, category_id=1, type="expense", date=datetime(2024, 2, 3, 18, 30)),
+    ]
+    subscriptions = [
+        Subscription(user_id=1, name="Music", amount=9.99, created_at=datetime(2024, 1, 10)),
+        Subscription(user_id=2, name="Video", amount=15.0, created_at=datetime(2024, 2, 2)),
+    ]
+    db.add_all(transactions + subscriptions)
+    assert_matches_rebuild(db)
+
+    # Move a transaction across user, month, category and type; cancel a subscription; upgrade a user
+    transactions[0].amount = 20.0
+    transactions[1].date = datetime(2024, 3, 15, 12, 0)
+    transactions[1].category_id = 1
+    transactions[2].type = "expense"
+    transactions[3].user_id = 1
+    subscriptions[0].status = "cancelled"
+    subscriptions[1].amount = 12.0
+    db.get(User, 1).is_premium_member = True
+    assert_matches_rebuild(db)
+
+    db.delete(transactions[1])
+    db.delete(transactions[3])
+    db.delete(subscriptions[1])
+    assert_matches_rebuild(db)
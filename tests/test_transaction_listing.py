@@ -0,0 +1,94 @@
+"""
+The admin transaction listing must stay one SQL statement per request, however
+many categories and payment methods the page touches (no lazy loads).
+
+Usage (from project root):
+    python -m pytest tests
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Backend.app.database import Base, get_db
+from Backend.app.routers import admin
+from Backend.app.sql_models import Category, PaymentMethod, Transaction
+
+ROWS = 300
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'listing.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(Category.__table__.insert(), [
+            {"id": i, "name": f"Category {i}", "type": "expense", "color": "#CCCCCC"} for i in range(1, 101)
+        ])
+        conn.execute(PaymentMethod.__table__.insert(), [
+            {"id": i, "user_id": 1, "type": "card", "name": f"Card {i}"} for i in range(1, 21)
+        ])
+        conn.execute(Transaction.__table__.insert(), [
+            {
+                "user_id": i % 10 + 1,
+                "amount": float(i % 90 + 10),
+                "category_id": i % 100 + 1,
+                "payment_method_id": i % 20 + 1,
+                "merchant_name": f"Merchant {i % 30}",
+                "date": start + timedelta(minutes=i),
+                "type": "expense"
+            }
+            for i in range(ROWS)
+        ])
+    session_factory = sessionmaker(bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(admin.router)
+    app.dependency_overrides[get_db] = override_get_db
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    yield TestClient(app), statements
+    engine.dispose()
+
+
+def test_offset_listing_is_one_statement(client):
+    http, statements = client
+    response = http.get("/admin/transactions", params={"limit": ROWS})
+
+    assert response.status_code == 200
+    rows = response.json()
+    assert len(rows) == ROWS
+    assert {row["category"] for row in rows} >= {"Category 1", "Category 100"}
+    assert all(row["payment_method"] == "card" for row in rows)
+    assert len(statements) == 1, statements
+
+
+def test_cursor_listing_is_one_statement_per_page(client):
+    http, statements = client
+    response = http.get("/admin/transactions", params={"cursor": "", "limit": 100})
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page["items"]) == 100
+    assert len(statements) == 1, statements
+
+    del statements[:]
+    response = http.get("/admin/transactions", params={"cursor": page["next_cursor"], "limit": 100})
+    assert response.status_code == 200
+    assert response.json()["items"][0]["id"] < page["items"][-1]["id"]
+    assert len(statements) == 1, statements